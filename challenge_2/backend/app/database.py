@@ -1,4 +1,14 @@
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional
+import time
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
@@ -16,19 +26,276 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
 
-# Dependency to get DB session
+
+class QueryStats:
+    """Statement count, total DB time and slowest statement for one unit of work"""
+
+    def __init__(self, keep_statements: bool = False):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements: Optional[List[str]] = [] if keep_statements else None
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed >= self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+        if self.statements is not None:
+            self.statements.append(statement)
+
+
+# Stats of the request currently being served (set by the HTTP middleware)
+_current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Extra collectors that see every statement regardless of context (used by assert_max_queries)
+_query_observers: List[QueryStats] = []
+
+# Connection pool counters, exported through /metrics
+pool_stats = {"checkouts": 0, "checkins": 0, "connects": 0}
+
+
+def start_query_stats() -> QueryStats:
+    """Begin collecting query stats for the current request"""
+    stats = QueryStats()
+    _current_query_stats.set(stats)
+    return stats
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """Get the query stats of the current request, if any"""
+    return _current_query_stats.get()
+
+
+def instrument_engine(target: Engine):
+    """Attach query timing and pool checkout listeners to an engine"""
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats = _current_query_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        for observer in list(_query_observers):
+            observer.record(statement, elapsed)
+
+    @event.listens_for(target, "connect")
+    def _connect(dbapi_connection, connection_record):
+        pool_stats["connects"] += 1
+
+    @event.listens_for(target, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_stats["checkouts"] += 1
+
+    @event.listens_for(target, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        pool_stats["checkins"] += 1
+
+
+instrument_engine(engine)
+
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        """SQLite ignores ON DELETE CASCADE unless foreign keys are switched on per connection"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+# Read replicas (DATABASE_REPLICA_URLS); sessions bind to one of them only through ReplicaRouter
+replica_engines: List[Engine] = []
+for _replica_url in settings.DATABASE_REPLICA_URLS:
+    _replica = create_engine(_replica_url, pool_pre_ping=True, echo=settings.DEBUG)
+    instrument_engine(_replica)
+    replica_engines.append(_replica)
+
+# Engine the sessions of the current request bind to (set by the HTTP middleware)
+_request_engine: ContextVar[Optional[Engine]] = ContextVar("request_engine", default=None)
+
+_REPLICATION_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+class ReplicaRouter:
+    """
+    Sends reads to healthy replicas round-robin and everything else to the primary.
+    A user who just wrote is pinned to the primary for READ_YOUR_WRITES_SECONDS so
+    they see their own change despite replication lag. Pins are per process.
+    """
+
+    def __init__(self, primary: Engine, replicas: List[Engine]):
+        self.primary = primary
+        self.replicas = replicas
+        self.healthy = [True] * len(replicas)
+        self.lag: List[Optional[float]] = [None] * len(replicas)
+        self._counter = itertools.count()
+        self._last_write: Dict[str, float] = {}
+        self._lock = Lock()
+
+    def is_pinned(self, uid: str) -> bool:
+        written_at = self._last_write.get(uid)
+        return written_at is not None and time.monotonic() - written_at < settings.READ_YOUR_WRITES_SECONDS
+
+    def record_write(self, uid: str):
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[uid] = now
+            if len(self._last_write) > 10000:
+                cutoff = now - settings.READ_YOUR_WRITES_SECONDS
+                self._last_write = {u: t for u, t in self._last_write.items() if t >= cutoff}
+
+    def engine_for(self, read_only: bool, uid: Optional[str] = None) -> Engine:
+        if not read_only or not self.replicas or (uid and self.is_pinned(uid)):
+            return self.primary
+        candidates = [replica for replica, ok in zip(self.replicas, self.healthy) if ok]
+        if not candidates:
+            return self.primary
+        return candidates[next(self._counter) % len(candidates)]
+
+    def check_health(self):
+        """Probe every replica; unreachable or lagging ones stop receiving reads until they recover"""
+        for i, replica in enumerate(self.replicas):
+            try:
+                with replica.connect() as conn:
+                    if conn.dialect.name == "postgresql":
+                        lag = float(conn.execute(_REPLICATION_LAG_SQL).scalar())
+                    else:
+                        conn.execute(text("SELECT 1"))
+                        lag = 0.0
+            except Exception as e:
+                if self.healthy[i]:
+                    print(f"⚠️  Replica {i} unavailable, reading from the primary: {e}")
+                self.healthy[i] = False
+                self.lag[i] = None
+                continue
+            self.lag[i] = lag
+            self.healthy[i] = lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+    def status(self) -> List[dict]:
+        return [
+            {"replica": str(i), "healthy": self.healthy[i], "lag_seconds": self.lag[i]}
+            for i in range(len(self.replicas))
+        ]
+
+
+replica_router = ReplicaRouter(engine, replica_engines)
+
+
+def route_request(read_only: bool, uid: Optional[str] = None) -> Engine:
+    """Choose the engine for the current request's sessions"""
+    target = replica_router.engine_for(read_only, uid)
+    _request_engine.set(target)
+    return target
+
+
+def current_engine() -> Engine:
+    """Engine chosen for the current request (the primary outside requests)"""
+    return _request_engine.get() or engine
+
+
+async def replica_health_worker():
+    """Background task: keep replica health and lag up to date"""
+    while True:
+        await asyncio.to_thread(replica_router.check_health)
+        await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+
+def get_pool_status() -> dict:
+    """Get current connection pool usage"""
+    pool = engine.pool
+    status = {
+        "checkouts_total": pool_stats["checkouts"],
+        "checkins_total": pool_stats["checkins"],
+        "connects_total": pool_stats["connects"],
+    }
+    # SQLite uses pools without size accounting
+    if hasattr(pool, "checkedout"):
+        status["checked_out"] = pool.checkedout()
+        status["size"] = pool.size()
+        status["overflow"] = pool.overflow()
+    return status
+
+
+@contextmanager
+def assert_max_queries(max_queries: int):
+    """
+    Fail if the wrapped block issues more than `max_queries` statements.
+    Intended for tests, e.g. to guard an endpoint against N+1 regressions:
+
+        with assert_max_queries(6):
+            client.get("/api/v1/documents")
+    """
+    stats = QueryStats(keep_statements=True)
+    _query_observers.append(stats)
+    try:
+        yield stats
+    finally:
+        _query_observers.remove(stats)
+    if stats.count > max_queries:
+        statements = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(stats.statements))
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, got {stats.count}:\n{statements}"
+        )
+
+
+def dialect_insert(db):
+    """INSERT construct supporting ON CONFLICT for the session's database (PostgreSQL or SQLite)"""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert
+    return postgresql.insert
+
+
+# Dependency to get DB session (on a replica for read-only requests, see ReplicaRouter)
 def get_db():
-    db = SessionLocal()
+    db = SessionLocal(bind=current_engine())
     try:
         yield db
     finally:
         db.close()
 
 
+def run_migrations(revision: str = "head"):
+    """Apply versioned schema migrations (app/migrations) up to `revision`"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    command.upgrade(config, revision)
+
+
 # Initialize database - create all tables
 def init_db():
     """Create all tables in the database"""
-    from app.models import user, document, comment, starred_document, category, hashtag, role
+    from app.models import user, document, comment, starred_document, category, hashtag, role, blob, stats, permission, file_processing
+    from app.services.permission_service import PermissionService
+    from app.services.search_service import SearchService
+    from app.services.stats_service import StatsService
     Base.metadata.create_all(bind=engine)
+    run_migrations()
+    db = SessionLocal()
+    try:
+        SearchService.ensure_schema(db)
+        # First start with rollups: compute them from existing rows
+        if StatsService.is_empty(db):
+            StatsService.rebuild(db)
+        # Cheap set-based recompute; also picks up role changes made outside the API
+        PermissionService.rebuild(db)
+    finally:
+        db.close()
     print("✅ Database tables created successfully!")
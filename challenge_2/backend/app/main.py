@@ -1,8 +1,16 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config import settings
-from app.database import init_db
-from app.routers import auth, users, documents, comments, admin_roles, admin_categories, admin_users, approvals, stats
+from app.database import init_db, replica_engines, replica_health_worker, replica_router, route_request, start_query_stats
+from app.services.blob_service import blob_gc_worker, file_cleanup_worker
+from app.services.processing_service import file_processing_worker
+from app.utils.auth import verify_token
+from app.utils.metrics import metrics, record_request
+from app.utils.password_pool import PasswordPoolBusy, password_pool
+from app.routers import auth, users, documents, comments, admin_roles, admin_categories, admin_users, approvals, stats, events
 
 # Create FastAPI app
 app = FastAPI(
@@ -18,8 +26,65 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Query-Count", "Server-Timing", "X-Next-Cursor"],
 )
 
+
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    """Expose per-request DB cost as response headers and aggregate it into /metrics"""
+    stats = start_query_stats()
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+
+    response.headers["X-Query-Count"] = str(stats.count)
+    response.headers["Server-Timing"] = (
+        f'db;dur={stats.total_time * 1000:.2f};desc="{stats.count} queries", '
+        f'db-slowest;dur={stats.slowest_time * 1000:.2f}, '
+        f'total;dur={elapsed * 1000:.2f}'
+    )
+
+    # Label by route template so /documents/{did} is one series, not one per id
+    route = request.scope.get("route")
+    endpoint = route.path if route is not None else "unmatched"
+    record_request(endpoint, request.method, elapsed, stats)
+    return response
+
+
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@app.middleware("http")
+async def replica_routing_middleware(request: Request, call_next):
+    """Serve read-only requests from a replica unless the user wrote moments ago"""
+    if not replica_engines:
+        return await call_next(request)
+
+    uid = None
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        uid = verify_token(token)
+    read_only = request.method in READ_ONLY_METHODS
+    target = route_request(read_only, uid)
+    metrics.inc("dochub_db_routed_requests_total", target="primary" if target is replica_router.primary else "replica")
+
+    response = await call_next(request)
+    if not read_only and uid and response.status_code < 400:
+        replica_router.record_write(uid)
+    return response
+
+
+@app.exception_handler(PasswordPoolBusy)
+async def password_pool_busy_handler(request: Request, exc: PasswordPoolBusy):
+    """Shed load instead of queueing when password hashing is saturated"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(users.router, prefix=settings.API_V1_PREFIX)
@@ -27,6 +92,7 @@ app.include_router(documents.router, prefix=settings.API_V1_PREFIX)
 app.include_router(comments.router, prefix=settings.API_V1_PREFIX)
 app.include_router(approvals.router, prefix=settings.API_V1_PREFIX)
 app.include_router(stats.router, prefix=settings.API_V1_PREFIX)
+app.include_router(events.router, prefix=settings.API_V1_PREFIX)
 
 # Admin routers
 app.include_router(admin_roles.router, prefix=f"{settings.API_V1_PREFIX}/admin")
@@ -40,9 +106,21 @@ async def startup_event():
     print("🚀 Starting DocHub API...")
     print("📊 Initializing database...")
     init_db()
+    asyncio.create_task(blob_gc_worker())
+    asyncio.create_task(file_cleanup_worker())
+    if replica_engines:
+        asyncio.create_task(replica_health_worker())
+    if settings.PROCESSING_WORKERS > 0:
+        asyncio.create_task(file_processing_worker())
     print("✅ Application started successfully!")
 
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """Stop the password hashing workers"""
+    password_pool.shutdown()
+
+
 @app.get("/")
 def root():
     """Root endpoint"""
@@ -59,6 +137,12 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus metrics: per-endpoint request/query counters and pool stats"""
+    return metrics.render()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
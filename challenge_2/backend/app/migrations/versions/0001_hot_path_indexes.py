@@ -0,0 +1,52 @@
+"""hot path indexes
+
+Secondary indexes for the predicates the API runs on every request. Tables
+themselves are still created by init_db (create_all), which also builds these
+indexes on a fresh database; this migration adds them to databases created
+before they were declared on the models.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (name, table, columns) - keep in sync with the models' __table_args__
+INDEXES = [
+    ("ix_documents_status_updated_at", "documents", ["status", "updated_at"]),
+    ("ix_documents_uid", "documents", ["uid"]),
+    ("ix_documents_approved_at", "documents", ["approved_at"]),
+    ("ix_hashtag_oid", "hashtag", ["oid"]),
+    ("ix_comments_did_created_at", "comments", ["did", "created_at"]),
+    ("ix_starred_documents_did", "starred_documents", ["did"]),
+]
+
+
+def _concurrently() -> bool:
+    # Build without blocking writes on PostgreSQL; this needs to run outside a transaction
+    return op.get_context().dialect.name == "postgresql"
+
+
+def upgrade():
+    if _concurrently():
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    if _concurrently():
+        with op.get_context().autocommit_block():
+            for name, table, _columns in INDEXES:
+                op.drop_index(name, table, if_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, _columns in INDEXES:
+            op.drop_index(name, table, if_exists=True)
@@ -5,6 +5,10 @@ from app.models.starred_document import StarredDocument
 from app.models.category import Category
 from app.models.hashtag import Hashtag
 from app.models.role import Role
+from app.models.blob import Blob
+from app.models.stats import StatsCounter, StatsDaily, StatsCategoryUsage
+from app.models.permission import UserCategoryAccess
+from app.models.file_processing import FileProcessing
 
 __all__ = [
     "User",
@@ -13,5 +17,11 @@ __all__ = [
     "StarredDocument",
     "Category",
     "Hashtag",
-    "Role"
+    "Role",
+    "Blob",
+    "StatsCounter",
+    "StatsDaily",
+    "StatsCategoryUsage",
+    "UserCategoryAccess",
+    "FileProcessing"
 ]
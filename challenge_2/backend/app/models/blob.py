@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger
+from datetime import datetime
+from app.database import Base
+
+
+class Blob(Base):
+    __tablename__ = "blobs"
+    
+    hash = Column(String, primary_key=True)  # SHA-256 of the content
+    path = Column(String, unique=True, nullable=False)  # Stored file path, used as Document.link
+    size = Column(BigInteger, nullable=False)  # File size in bytes
+    ref_count = Column(Integer, default=0, nullable=False)  # Number of documents linking to this blob
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -12,5 +12,5 @@ class Category(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    hashtags = relationship("Hashtag", back_populates="category", cascade="all, delete-orphan")
-    authorized_roles = relationship("Role", secondary="access_permission", back_populates="accessible_categories")
+    hashtags = relationship("Hashtag", back_populates="category", cascade="all, delete-orphan", passive_deletes=True)
+    authorized_roles = relationship("Role", secondary="access_permission", back_populates="accessible_categories", passive_deletes=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, PrimaryKeyConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, PrimaryKeyConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -15,6 +15,8 @@ class Comment(Base):
     # Composite primary key
     __table_args__ = (
         PrimaryKeyConstraint('uid', 'did', 'created_at'),
+        # Thread of a document, newest first (and per-document counts)
+        Index("ix_comments_did_created_at", "did", "created_at"),
     )
     
     # Relationships
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, DateTime, Double, Integer, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, Double, Integer, ForeignKey, Text, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from app.database import Base
 
@@ -18,10 +19,21 @@ class Document(Base):
     approved_at = Column(DateTime, nullable=True)  # Approval timestamp
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Full-text search over title, description and tag names (maintained by SearchService)
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
     
-    # Relationships
+    __table_args__ = (
+        Index("ix_documents_search_vector", "search_vector", postgresql_using="gin"),
+        # Listing: WHERE status = ? ORDER BY updated_at DESC
+        Index("ix_documents_status_updated_at", "status", "updated_at"),
+        Index("ix_documents_uid", "uid"),
+        # Stats: approvals per day / in a time window
+        Index("ix_documents_approved_at", "approved_at"),
+    )
+    
+    # Relationships (child rows are removed by ON DELETE CASCADE; passive_deletes stops the ORM loading them)
     author = relationship("User", back_populates="documents", foreign_keys=[uid])
     approver = relationship("User", foreign_keys=[approved_by])
-    comments = relationship("Comment", back_populates="document", cascade="all, delete-orphan")
-    starred_by = relationship("StarredDocument", back_populates="document", cascade="all, delete-orphan")
-    hashtags = relationship("Hashtag", back_populates="document", cascade="all, delete-orphan")
+    comments = relationship("Comment", back_populates="document", cascade="all, delete-orphan", passive_deletes=True)
+    starred_by = relationship("StarredDocument", back_populates="document", cascade="all, delete-orphan", passive_deletes=True)
+    hashtags = relationship("Hashtag", back_populates="document", cascade="all, delete-orphan", passive_deletes=True)
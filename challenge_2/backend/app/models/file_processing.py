@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, Index
+from sqlalchemy.orm import deferred
+from datetime import datetime
+from app.database import Base
+
+
+class FileProcessing(Base):
+    """
+    Post-upload processing of one stored blob: the job's state plus what it derived.
+    Keyed by content hash, so a file shared by several documents is processed once.
+    """
+    __tablename__ = "file_processing"
+
+    hash = Column(String, ForeignKey("blobs.hash", ondelete="CASCADE"), primary_key=True)
+    status = Column(Integer, default=0, nullable=False)  # 0=queued, 1=running, 2=done, 3=failed
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)  # Last failure, kept for inspection
+    page_count = Column(Integer, nullable=True)
+    text_content = deferred(Column(Text, nullable=True))  # Extracted plain text (truncated)
+    thumbnail_path = Column(String, nullable=True)  # PNG of the first page, when it could be rendered
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Workers claim the oldest queued jobs
+        Index("ix_file_processing_status_created_at", "status", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy import Column, String, ForeignKey, PrimaryKeyConstraint, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -12,6 +12,8 @@ class Hashtag(Base):
     # Composite primary key
     __table_args__ = (
         PrimaryKeyConstraint('did', 'oid'),
+        # Documents of a category (the primary key only serves lookups by did)
+        Index("ix_hashtag_oid", "oid"),
     )
     
     # Relationships
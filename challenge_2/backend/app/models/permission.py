@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, ForeignKey, PrimaryKeyConstraint
+from app.database import Base
+
+
+class UserCategoryAccess(Base):
+    """
+    Materialized user -> category access (user_role joined with access_permission).
+    Maintained by PermissionService; never written directly.
+    """
+    __tablename__ = "user_category_access"
+    
+    uid = Column(String, ForeignKey("users.uid", ondelete="CASCADE"), nullable=False)
+    oid = Column(String, ForeignKey("categories.oid", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # Composite primary key
+    __table_args__ = (
+        PrimaryKeyConstraint('uid', 'oid'),
+    )
@@ -30,5 +30,5 @@ class Role(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
-    users = relationship("User", secondary=user_role, back_populates="roles")
-    accessible_categories = relationship("Category", secondary=access_permission, back_populates="authorized_roles")
+    users = relationship("User", secondary=user_role, back_populates="roles", passive_deletes=True)
+    accessible_categories = relationship("Category", secondary=access_permission, back_populates="authorized_roles", passive_deletes=True)
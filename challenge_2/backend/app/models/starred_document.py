@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, PrimaryKeyConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -14,6 +14,8 @@ class StarredDocument(Base):
     # Composite primary key
     __table_args__ = (
         PrimaryKeyConstraint('uid', 'did'),
+        # Star counts per document
+        Index("ix_starred_documents_did", "did"),
     )
     
     # Relationships
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, Integer, Date, ForeignKey, PrimaryKeyConstraint
+from app.database import Base
+
+
+class StatsCounter(Base):
+    """Named running totals, e.g. `users_total` or `documents_status_1`"""
+    __tablename__ = "stats_counters"
+    
+    name = Column(String, primary_key=True)
+    value = Column(Integer, default=0, nullable=False)
+
+
+class StatsDaily(Base):
+    """Per-day counters: documents_created, users_registered, documents_approved"""
+    __tablename__ = "stats_daily"
+    
+    day = Column(Date, nullable=False)
+    metric = Column(String, nullable=False)
+    count = Column(Integer, default=0, nullable=False)
+    
+    # Composite primary key
+    __table_args__ = (
+        PrimaryKeyConstraint('metric', 'day'),
+    )
+
+
+class StatsCategoryUsage(Base):
+    """Number of documents tagged with each category"""
+    __tablename__ = "stats_category_usage"
+    
+    oid = Column(String, ForeignKey("categories.oid", ondelete="CASCADE"), primary_key=True)
+    count = Column(Integer, default=0, nullable=False, index=True)
@@ -13,8 +13,8 @@ class User(Base):
     password = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    # Relationships
-    roles = relationship("Role", secondary="user_role", back_populates="users")
-    documents = relationship("Document", back_populates="author", foreign_keys="[Document.uid]", cascade="all, delete-orphan")
-    comments = relationship("Comment", back_populates="user", cascade="all, delete-orphan")
-    starred_documents = relationship("StarredDocument", back_populates="user", cascade="all, delete-orphan")
+    # Relationships (child rows are removed by ON DELETE CASCADE; passive_deletes stops the ORM loading them)
+    roles = relationship("Role", secondary="user_role", back_populates="users", passive_deletes=True)
+    documents = relationship("Document", back_populates="author", foreign_keys="[Document.uid]", cascade="all, delete-orphan", passive_deletes=True)
+    comments = relationship("Comment", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    starred_documents = relationship("StarredDocument", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
@@ -1,58 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import FrozenSet, List
 from datetime import datetime
 from app.database import get_db
-from app.schemas.document import Document
-from app.services.document_service import DocumentService
-from app.utils.dependencies import require_approver
+from app.schemas.document import Document, DocumentFields, BulkDocumentIds, BulkResult
+from app.services.document_service import DocumentService, VIEWER_DOCUMENT_FIELDS
+from app.services.stats_service import StatsService
+from app.utils.cache import invalidate_document
+from app.utils.events import document_events, event_bus
+from app.utils.dependencies import document_fields, require_approver
 from app.models.user import User
 from app.models.document import Document as DocumentModel
 
 router = APIRouter(prefix="/approvals", tags=["Approvals"])
 
 
-@router.get("/pending", response_model=List[Document])
+@router.get("/pending", response_model=List[DocumentFields], response_model_exclude_unset=True)
 def get_pending_documents(
     skip: int = 0,
     limit: int = 100,
+    fields: FrozenSet[str] = Depends(document_fields(VIEWER_DOCUMENT_FIELDS)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_approver)
 ):
     """Get all pending approval documents (Approver role required)"""
     # Get documents with status=0 (pending approval)
-    documents = db.query(DocumentModel).filter(
+    documents = db.query(*DocumentService.list_columns(fields)).filter(
         DocumentModel.status == 0
     ).offset(skip).limit(limit).all()
     
-    # Enrich with additional data
-    from app.services.starred_service import StarredDocumentService
-    from app.services.comment_service import CommentService
-    
-    result = []
-    for doc in documents:
-        doc_dict = {
-            "did": doc.did,
-            "uid": doc.uid,
-            "title": doc.title,
-            "description": doc.description,
-            "link": doc.link,
-            "size": doc.size,
-            "status": doc.status,
-            "approved_by": doc.approved_by,
-            "approved_at": doc.approved_at,
-            "created_at": doc.created_at,
-            "updated_at": doc.updated_at,
-            "author_name": doc.author.name if doc.author else None,
-            "approver_name": None,
-            "tags": DocumentService.get_tags(db, doc.did),
-            "stars_count": StarredDocumentService.get_star_count(db, doc.did),
-            "comments_count": CommentService.get_count(db, doc.did),
-            "is_starred": StarredDocumentService.is_starred(db, current_user.uid, doc.did)
-        }
-        result.append(doc_dict)
-    
-    return result
+    return ORJSONResponse(DocumentService.enrich(db, documents, fields, current_user.uid))
 
 
 @router.post("/{did}/approve", response_model=Document)
@@ -76,10 +54,14 @@ def approve_document(
         )
     
     # Update document status to approved (1)
+    old_approved_at = document.approved_at
     document.status = 1
     document.approved_by = current_user.uid
     document.approved_at = datetime.utcnow()
+    StatsService.on_document_changed(db, 0, old_approved_at, document.status, document.approved_at)
     db.commit()
+    invalidate_document(did)
+    event_bus.publish(document_events(db, "document.approved", [did]))
     db.refresh(document)
     
     from app.services.starred_service import StarredDocumentService
@@ -117,10 +99,14 @@ def reject_document(
         )
     
     # Update document status to rejected (2)
+    old_approved_at = document.approved_at
     document.status = 2
     document.approved_by = current_user.uid
     document.approved_at = datetime.utcnow()
+    StatsService.on_document_changed(db, 0, old_approved_at, document.status, document.approved_at)
     db.commit()
+    invalidate_document(did)
+    event_bus.publish(document_events(db, "document.rejected", [did]))
     db.refresh(document)
     
     from app.services.starred_service import StarredDocumentService
@@ -135,3 +121,31 @@ def reject_document(
         "comments_count": CommentService.get_count(db, did),
         "is_starred": StarredDocumentService.is_starred(db, current_user.uid, did)
     }
+
+
+@router.post("/bulk-approve", response_model=BulkResult)
+def bulk_approve_documents(
+    payload: BulkDocumentIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_approver)
+):
+    """Approve many pending documents in one transaction (Approver role required)"""
+    outcomes = DocumentService.bulk_review(db, payload.document_ids, 1, current_user.uid)
+    return {
+        "processed": sum(1 for result in outcomes.values() if result == "approved"),
+        "results": [{"did": did, "result": result} for did, result in outcomes.items()]
+    }
+
+
+@router.post("/bulk-reject", response_model=BulkResult)
+def bulk_reject_documents(
+    payload: BulkDocumentIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_approver)
+):
+    """Reject many pending documents in one transaction (Approver role required)"""
+    outcomes = DocumentService.bulk_review(db, payload.document_ids, 2, current_user.uid)
+    return {
+        "processed": sum(1 for result in outcomes.values() if result == "rejected"),
+        "results": [{"did": did, "result": result} for did, result in outcomes.items()]
+    }
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.database import SessionLocal, current_engine, get_db
 from app.schemas.comment import Comment, CommentCreate
 from app.services.comment_service import CommentService
 from app.services.document_service import DocumentService
@@ -14,10 +16,15 @@ router = APIRouter(prefix="/comments", tags=["Comments"])
 @router.get("/document/{did}", response_model=List[Comment])
 def get_document_comments(
     did: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_reader)
 ):
-    """Get all comments for a document (Reader or Creator role required)"""
+    """
+    Get comments for a document, newest first (Reader or Creator role required).
+    When more comments exist, the X-Next-Cursor header holds the `cursor` for the next page.
+    """
     # Check if document exists
     if not DocumentService.get_by_id(db, did):
         raise HTTPException(
@@ -25,17 +32,47 @@ def get_document_comments(
             detail="Document not found"
         )
     
-    comments = CommentService.get_by_document(db, did)
+    try:
+        comments, next_cursor = CommentService.get_page(db, did, limit, cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return ORJSONResponse(comments, headers=headers)
+
+
+@router.get("/document/{did}/export")
+def export_document_comments(
+    did: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_reader)
+):
+    """Stream a whole comment thread as NDJSON, one comment per line (Reader or Creator role required)"""
+    if not DocumentService.get_by_id(db, did):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    bind = current_engine()
     
-    # Enrich with user names
-    result = []
-    for comment in comments:
-        result.append({
-            **comment.__dict__,
-            "user_name": comment.user.name if comment.user else None
-        })
+    def lines():
+        # The request session is closed before the body is sent, so stream from our own
+        stream_db = SessionLocal(bind=bind)
+        try:
+            for comment in CommentService.stream(stream_db, did):
+                yield orjson.dumps(comment) + b"\n"
+        finally:
+            stream_db.close()
     
-    return result
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="comments-{did}.ndjson"'}
+    )
 
 
 @router.post("", response_model=Comment, status_code=status.HTTP_201_CREATED)
@@ -55,7 +92,10 @@ def create_comment(
     comment = CommentService.create(db, current_user.uid, comment_create)
     
     return {
-        **comment.__dict__,
+        "uid": comment.uid,
+        "did": comment.did,
+        "content": comment.content,
+        "created_at": comment.created_at,
         "user_name": current_user.name
     }
 
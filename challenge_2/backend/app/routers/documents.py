@@ -1,69 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Query
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
+from app.config import settings
 from app.database import get_db
-from app.schemas.document import Document, DocumentCreate, DocumentUpdate
-from app.services.document_service import DocumentService
+from app.schemas.document import Document, DocumentFields, DocumentCreate, DocumentUpdate, DocumentPreview, DocumentSearchPage, BulkDocumentIds, BulkResult
+from app.services.document_service import DocumentService, DEFAULT_DOCUMENT_FIELDS, VIEWER_DOCUMENT_FIELDS
 from app.services.starred_service import StarredDocumentService
 from app.services.comment_service import CommentService
-from app.utils.dependencies import get_current_user, require_creator, require_reader
+from app.services.blob_service import BlobService
+from app.services.processing_service import ProcessingService, STATUS_NAMES, DONE
+from app.services.search_service import SearchService
+from app.utils.dependencies import document_fields, get_current_user, get_document_fields, require_creator, require_reader
 from app.utils.role_checker import is_creator
+from app.utils.uploads import stream_upload_to_disk, FileTooLargeError
+from app.utils.file_responses import conditional_file_response
+from app.utils.file_extract import excerpt
+from app.utils.cache import response_cache, viewer_class, document_scope, LISTS_SCOPE
+from app.utils.singleflight import single_flight
 from app.models.user import User
 from app.models.document import Document as DocumentModel
 import os
-import shutil
 from pathlib import Path
-from uuid import uuid4
 from datetime import datetime
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
 
-@router.get("/starred", response_model=List[Document])
+@router.get("/starred", response_model=List[DocumentFields], response_model_exclude_unset=True)
 def get_starred_documents(
+    fields: FrozenSet[str] = Depends(document_fields(VIEWER_DOCUMENT_FIELDS)),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_reader)
 ):
     """Get all documents starred by the current user"""
-    documents = StarredDocumentService.get_user_starred(db, current_user.uid)
-    
-    # Filter out None values (in case document was deleted)
-    documents = [doc for doc in documents if doc is not None]
-    
-    # Enrich with additional data
-    result = []
-    for doc in documents:
-        doc_dict = {
-            "did": doc.did,
-            "uid": doc.uid,
-            "title": doc.title,
-            "description": doc.description,
-            "link": doc.link,
-            "size": doc.size,
-            "status": doc.status,
-            "approved_by": doc.approved_by,
-            "approved_at": doc.approved_at,
-            "created_at": doc.created_at,
-            "updated_at": doc.updated_at,
-            "author_name": doc.author.name if doc.author else None,
-            "approver_name": doc.approver.name if doc.approver else None,
-            "tags": DocumentService.get_tags(db, doc.did),
-            "stars_count": StarredDocumentService.get_star_count(db, doc.did),
-            "comments_count": CommentService.get_count(db, doc.did),
-            "is_starred": True  # All documents in this list are starred by user
-        }
-        result.append(doc_dict)
-    
-    return result
+    documents = StarredDocumentService.get_user_starred(db, current_user.uid, DocumentService.list_columns(fields))
+    return ORJSONResponse(DocumentService.enrich(db, documents, fields, current_user.uid))
 
 
-@router.get("", response_model=List[Document])
+@router.get("", response_model=List[DocumentFields], response_model_exclude_unset=True)
 def get_documents(
     skip: int = 0,
     limit: int = 100,
     status: Optional[int] = None,
     uid: Optional[str] = None,
+    fields: FrozenSet[str] = Depends(get_document_fields),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_reader)
 ):
@@ -71,57 +53,76 @@ def get_documents(
     Get documents based on user role:
     - READER: Only approved documents (status=1)
     - CREATOR: Own documents (all status) + approved documents from others (status=1)
+    
+    `fields` narrows each item to the listed fields; enrichment that isn't requested is skipped.
     """
     # Check if user is creator
     user_is_creator = is_creator(db, current_user.uid)
+    columns = DocumentService.list_columns(fields)
     
-    if user_is_creator:
-        # Creators see: their own documents (all status) + others' approved documents
-        if uid and uid == current_user.uid:
-            # Own documents - all status
-            documents = DocumentService.get_all(db, skip, limit, status, uid)
+    def load_documents():
+        if user_is_creator:
+            # Creators see: their own documents (all status) + others' approved documents
+            if uid and uid == current_user.uid:
+                # Own documents - all status
+                documents = DocumentService.get_all(db, skip, limit, status, uid, columns)
+            else:
+                # Mix: own documents + others' approved
+                query = db.query(*columns)
+                if uid:
+                    query = query.filter(DocumentModel.uid == uid, DocumentService.approved_filter(current_user.uid))
+                else:
+                    # Own docs OR approved docs
+                    query = query.filter(DocumentService.visibility_filter(current_user.uid, True))
+                documents = query.offset(skip).limit(limit).all()
         else:
-            # Mix: own documents + others' approved
-            query = db.query(DocumentModel)
+            # Readers see: only approved documents (status=1)
+            query = db.query(*columns).filter(DocumentService.visibility_filter(current_user.uid, False))
             if uid:
-                query = query.filter(DocumentModel.uid == uid, DocumentModel.status == 1)
-            else:
-                # Own docs OR approved docs
-                query = query.filter(
-                    (DocumentModel.uid == current_user.uid) | (DocumentModel.status == 1)
-                )
+                query = query.filter(DocumentModel.uid == uid)
             documents = query.offset(skip).limit(limit).all()
-    else:
-        # Readers see: only approved documents (status=1)
-        query = db.query(DocumentModel).filter(DocumentModel.status == 1)
-        if uid:
-            query = query.filter(DocumentModel.uid == uid)
-        documents = query.offset(skip).limit(limit).all()
+        
+        return DocumentService.enrich(db, documents, fields, current_user.uid)
     
-    # Enrich with additional data
-    result = []
-    for doc in documents:
-        doc_dict = {
-            "did": doc.did,
-            "uid": doc.uid,
-            "title": doc.title,
-            "description": doc.description,
-            "link": doc.link,
-            "size": doc.size,
-            "status": doc.status,
-            "approved_by": doc.approved_by,
-            "approved_at": doc.approved_at,
-            "created_at": doc.created_at,
-            "updated_at": doc.updated_at,
-            "author_name": doc.author.name if doc.author else None,
-            "approver_name": doc.approver.name if doc.approver else None,
-            "tags": DocumentService.get_tags(db, doc.did),
-            "stars_count": StarredDocumentService.get_star_count(db, doc.did),
-            "comments_count": len(CommentService.get_by_document(db, doc.did))
-        }
-        result.append(doc_dict)
+    # The first page is by far the hottest; serve it from the response cache.
+    # is_starred is per user, so only field sets without it are shared.
+    if skip == 0 and "is_starred" not in fields:
+        documents = response_cache.get_or_set(
+            "document_list",
+            (viewer_class(db, current_user.uid, user_is_creator), limit, status, uid, ",".join(sorted(fields))),
+            [LISTS_SCOPE],
+            load_documents
+        )
+    else:
+        documents = load_documents()
+    # Items are built from SQL result rows already; encode them directly instead of
+    # re-validating against response_model (which still documents the shape)
+    return ORJSONResponse(documents)
+
+
+@router.get("/search", response_model=DocumentSearchPage)
+def search_documents(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_reader)
+):
+    """
+    Full-text search over title, description and tags, best matches first.
+    Follows the same visibility rules as listing; paginate with `next_cursor`.
+    """
+    visibility = DocumentService.visibility_filter(current_user.uid, is_creator(db, current_user.uid))
+    try:
+        rows, next_cursor = SearchService.search(db, q, visibility, limit, cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     
-    return result
+    items = DocumentService.enrich(db, [doc for doc, _rank in rows], DEFAULT_DOCUMENT_FIELDS)
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
 
 
 @router.get("/{did}", response_model=Document)
@@ -131,30 +132,42 @@ def get_document(
     current_user: User = Depends(require_reader)
 ):
     """Get document by ID (Reader or Creator role required)"""
-    document = DocumentService.get_by_id(db, did)
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
-        )
+    def load_document():
+        document = DocumentService.get_by_id(db, did)
+        if not document:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document not found"
+            )
+        
+        return {
+            "did": document.did,
+            "uid": document.uid,
+            "title": document.title,
+            "description": document.description,
+            "link": document.link,
+            "size": document.size,
+            "status": document.status,
+            "approved_by": document.approved_by,
+            "approved_at": document.approved_at,
+            "created_at": document.created_at,
+            "updated_at": document.updated_at,
+            "author_name": document.author.name if document.author else None,
+            "approver_name": document.approver.name if document.approver else None,
+            "tags": DocumentService.get_tags(db, did),
+            "stars_count": StarredDocumentService.get_star_count(db, did),
+            "comments_count": CommentService.get_count(db, did)
+        }
     
+    # Shared part is cached per visibility class; is_starred is per user
+    document = response_cache.get_or_set(
+        "document",
+        (did, viewer_class(db, current_user.uid, is_creator(db, current_user.uid))),
+        [document_scope(did)],
+        load_document
+    )
     return {
-        "did": document.did,
-        "uid": document.uid,
-        "title": document.title,
-        "description": document.description,
-        "link": document.link,
-        "size": document.size,
-        "status": document.status,
-        "approved_by": document.approved_by,
-        "approved_at": document.approved_at,
-        "created_at": document.created_at,
-        "updated_at": document.updated_at,
-        "author_name": document.author.name if document.author else None,
-        "approver_name": document.approver.name if document.approver else None,
-        "tags": DocumentService.get_tags(db, did),
-        "stars_count": StarredDocumentService.get_star_count(db, did),
-        "comments_count": len(CommentService.get_by_document(db, did)),
+        **document,
         "is_starred": StarredDocumentService.is_starred(db, current_user.uid, did)
     }
 
@@ -229,7 +242,7 @@ def update_document(
         "approver_name": document.approver.name if document.approver else None,
         "tags": DocumentService.get_tags(db, did),
         "stars_count": StarredDocumentService.get_star_count(db, did),
-        "comments_count": len(CommentService.get_by_document(db, did))
+        "comments_count": CommentService.get_count(db, did)
     }
 
 
@@ -258,15 +271,28 @@ def delete_document(
 
 
 # File upload/download endpoints
-UPLOAD_DIR = Path("uploads")
+UPLOAD_DIR = Path(settings.UPLOAD_DIR)
 UPLOAD_DIR.mkdir(exist_ok=True)
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".doc"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
 
+def _upload_response(filename: str, blob, deduplicated: bool) -> dict:
+    return {
+        "filename": filename,
+        "stored_filename": Path(blob.path).name,
+        "file_path": blob.path,
+        "size": blob.size,
+        "sha256": blob.hash,
+        "deduplicated": deduplicated,
+        "message": "File uploaded successfully"
+    }
+
+
 @router.post("/upload")
 async def upload_document_file(
     file: UploadFile = File(...),
+    db: Session = Depends(get_db),
     current_user: User = Depends(require_creator)
 ):
     """Upload a document file (Creator role required)"""
@@ -278,44 +304,60 @@ async def upload_document_file(
             detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Generate unique filename
-    unique_filename = f"{uuid4()}{file_ext}"
-    file_path = UPLOAD_DIR / unique_filename
+    # Stream to a temp file first; its final name is the content hash
+    tmp_path = BlobService.temp_path()
     
-    # Save file
+    # Stream file to disk, enforcing the size limit while copying
     try:
-        with open(file_path, "wb") as buffer:
-            file_content = await file.read()
-            # Check file size
-            if len(file_content) > MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE / (1024*1024)}MB"
-                )
-            buffer.write(file_content)
+        file_size, sha256 = await stream_upload_to_disk(file, tmp_path, MAX_FILE_SIZE)
+        blob, created = await run_in_threadpool(
+            BlobService.register_upload, db, tmp_path, sha256, file_size, file_ext
+        )
+        # Text extraction and thumbnails happen in the background; see GET /documents/{did}/preview
+        await run_in_threadpool(ProcessingService.enqueue, db, blob.hash)
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE / (1024*1024)}MB"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}"
         )
     
-    return {
-        "filename": file.filename,
-        "stored_filename": unique_filename,
-        "file_path": str(file_path),
-        "size": len(file_content),
-        "message": "File uploaded successfully"
-    }
+    return _upload_response(file.filename, blob, deduplicated=not created)
 
 
-@router.get("/{did}/file")
-async def preview_document_file(
-    did: str,
-    download: bool = False,
+@router.get("/upload/{sha256}")
+def get_uploaded_blob(
+    sha256: str,
+    filename: str = "",
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_reader)
+    current_user: User = Depends(require_creator)
 ):
-    """Preview or download document file (Reader or Creator role required)"""
+    """
+    Check whether content is already stored (Creator role required).
+    Clients can hash a file locally and skip the upload entirely on a hit.
+    """
+    blob = BlobService.get_by_hash(db, sha256.lower())
+    if not blob or not Path(blob.path).exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found"
+        )
+    return _upload_response(filename, blob, deduplicated=True)
+
+
+MEDIA_TYPES = {
+    '.pdf': 'application/pdf',
+    '.doc': 'application/msword',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+
+def _resolve_document_file(db: Session, did: str) -> tuple:
+    """(path, media type, original filename, stat result) of a document's file"""
     document = DocumentService.get_by_id(db, did)
     if not document:
         raise HTTPException(
@@ -325,23 +367,39 @@ async def preview_document_file(
     
     # Check if file exists
     file_path = Path(document.link)
-    if not file_path.exists():
+    try:
+        stat_result = os.stat(file_path)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found on server"
         )
     
-    # Determine media type based on file extension
+    # Determine media type based on file extension; the original filename comes from the title
     file_ext = file_path.suffix.lower()
-    media_type_map = {
-        '.pdf': 'application/pdf',
-        '.doc': 'application/msword',
-        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-    }
-    media_type = media_type_map.get(file_ext, 'application/octet-stream')
-    
-    # Get original filename from document title
-    original_filename = f"{document.title}{file_ext}"
+    media_type = MEDIA_TYPES.get(file_ext, 'application/octet-stream')
+    return file_path, media_type, f"{document.title}{file_ext}", stat_result
+
+
+@router.get("/{did}/file")
+def preview_document_file(
+    did: str,
+    request: Request,
+    download: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_reader)
+):
+    """
+    Preview or download document file (Reader or Creator role required).
+    Supports conditional GET (ETag / Last-Modified) and single byte ranges.
+    """
+    # Concurrent requests for a popular file share one lookup and stat; the result is
+    # the same for every viewer, so the key is the document alone
+    file_path, media_type, original_filename, stat_result = single_flight.do(
+        "document_file",
+        did,
+        lambda: _resolve_document_file(db, did)
+    )
     
     # If download=True, set Content-Disposition to attachment
     # Otherwise, set to inline for preview
@@ -351,10 +409,69 @@ async def preview_document_file(
     else:
         headers['Content-Disposition'] = f'inline; filename="{original_filename}"'
     
-    return FileResponse(
-        path=file_path,
-        media_type=media_type,
-        headers=headers
+    # Validators + Range let PDF viewers revalidate with a 304 and fetch pages progressively
+    return conditional_file_response(
+        request,
+        file_path,
+        media_type,
+        headers,
+        cache_control=f"private, max-age={settings.FILE_CACHE_MAX_AGE}, must-revalidate",
+        stat_result=stat_result
+    )
+
+
+@router.get("/{did}/preview", response_model=DocumentPreview)
+def get_document_preview(
+    did: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_reader)
+):
+    """
+    Page count, text excerpt and thumbnail of a document's file (Reader or Creator role required).
+    Filled in by background processing after upload; poll while status is queued or running.
+    """
+    document = DocumentService.get_by_id(db, did)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    job = ProcessingService.get_for_link(db, document.link)
+    if job is None:
+        return {"did": did, "status": "unavailable"}
+    
+    preview = {"did": did, "status": STATUS_NAMES[job.status]}
+    if job.status == DONE:
+        preview["page_count"] = job.page_count
+        preview["excerpt"] = excerpt(job.text_content)
+        if job.thumbnail_path:
+            preview["thumbnail_url"] = f"{settings.API_V1_PREFIX}/documents/{did}/thumbnail"
+    return preview
+
+
+@router.get("/{did}/thumbnail")
+def get_document_thumbnail(
+    did: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_reader)
+):
+    """First-page thumbnail (PNG) of a document's file (Reader or Creator role required)"""
+    document = DocumentService.get_by_id(db, did)
+    job = ProcessingService.get_for_link(db, document.link) if document else None
+    if not job or not job.thumbnail_path or not Path(job.thumbnail_path).exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thumbnail not available"
+        )
+    
+    return conditional_file_response(
+        request,
+        Path(job.thumbnail_path),
+        "image/png",
+        {},
+        cache_control=f"private, max-age={settings.FILE_CACHE_MAX_AGE}, must-revalidate"
     )
 
 
@@ -390,3 +507,31 @@ def unstar_document(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Star not found"
         )
+
+
+@router.post("/bulk-star", response_model=BulkResult)
+def bulk_star_documents(
+    payload: BulkDocumentIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_reader)
+):
+    """Star many documents at once (Reader or Creator role required)"""
+    outcomes = StarredDocumentService.star_many(db, current_user.uid, payload.document_ids)
+    return {
+        "processed": sum(1 for result in outcomes.values() if result == "starred"),
+        "results": [{"did": did, "result": result} for did, result in outcomes.items()]
+    }
+
+
+@router.post("/bulk-unstar", response_model=BulkResult)
+def bulk_unstar_documents(
+    payload: BulkDocumentIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_reader)
+):
+    """Unstar many documents at once (Reader or Creator role required)"""
+    outcomes = StarredDocumentService.unstar_many(db, current_user.uid, payload.document_ids)
+    return {
+        "processed": sum(1 for result in outcomes.values() if result == "unstarred"),
+        "results": [{"did": did, "result": result} for did, result in outcomes.items()]
+    }
@@ -0,0 +1,69 @@
+import asyncio
+import orjson
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.config import settings
+from app.database import get_db
+from app.services.permission_service import PermissionService
+from app.utils.dependencies import require_reader
+from app.utils.events import Audience, event_bus
+from app.utils.role_checker import is_approver
+from app.models.user import User
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+def _format(event_id: Optional[int], event_type: str, payload: dict) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event_type}\n".encode() + b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+@router.get("")
+def stream_events(
+    last_event_id: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_reader)
+):
+    """
+    Server-sent events for document changes visible to the current user (Reader, Creator or Approver role required).
+
+    Event types: document.created, document.updated, document.deleted, document.approved,
+    document.rejected, document.starred, document.unstarred, document.commented and
+    document.comment_deleted, each with `{"did", "status", ...}` as data; approvers receive
+    changes to pending documents too. A `resync` event means changes may have been missed and
+    the client should reload its lists. Send the Authorization header (read the stream with
+    fetch, EventSource cannot set headers) and Last-Event-ID when reconnecting.
+    """
+    audience = Audience(
+        uid=current_user.uid,
+        sees_all=is_approver(db, current_user.uid),
+        oids=PermissionService.accessible_category_ids(db, current_user.uid)
+        if settings.CATEGORY_ACCESS_CONTROL else None
+    )
+    try:
+        resume_from = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        resume_from = -1  # Unusable id: start over with a resync
+
+    async def events():
+        # No database work in here: a stream can stay open for hours
+        subscription = event_bus.subscribe(audience, resume_from)
+        try:
+            yield f"retry: {settings.EVENT_KEEPALIVE_SECONDS * 1000}\n\n".encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), settings.EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                yield _format(*event)
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -49,3 +49,55 @@ class Document(DocumentInDB):
     
     class Config:
         from_attributes = True
+
+
+class DocumentFields(BaseModel):
+    """Document list item narrowed with `?fields=`; only requested fields (and did) are present"""
+    did: str
+    uid: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    link: Optional[str] = None
+    size: Optional[float] = None
+    status: Optional[int] = None
+    approved_by: Optional[str] = None
+    approved_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    author_name: Optional[str] = None
+    approver_name: Optional[str] = None
+    tags: Optional[List[str]] = None
+    stars_count: Optional[int] = None
+    comments_count: Optional[int] = None
+    is_starred: Optional[bool] = None
+
+
+class DocumentPreview(BaseModel):
+    did: str
+    status: str  # queued, running, done, failed, or unavailable (file not in the blob store)
+    page_count: Optional[int] = None
+    excerpt: Optional[str] = None  # Start of the extracted text
+    thumbnail_url: Optional[str] = None
+
+
+class DocumentSearchPage(BaseModel):
+    items: List[Document] = []
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to get the next page
+
+
+# Bulk operation Schemas
+MAX_BULK_IDS = 500
+
+
+class BulkDocumentIds(BaseModel):
+    document_ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+
+
+class BulkResultItem(BaseModel):
+    did: str
+    result: str  # e.g. approved, rejected, starred, not_found, not_pending
+
+
+class BulkResult(BaseModel):
+    processed: int  # Number of documents actually changed
+    results: List[BulkResultItem] = []
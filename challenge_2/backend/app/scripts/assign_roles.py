@@ -12,6 +12,7 @@ from sqlalchemy import select, insert
 from app.database import SessionLocal
 from app.models.user import User
 from app.models.role import Role, user_role
+from app.services.permission_service import PermissionService
 
 def assign_role(email: str, role_name: str):
     """Assign a role to a user"""
@@ -45,6 +46,7 @@ def assign_role(email: str, role_name: str):
         db.execute(
             insert(user_role).values(uid=user.uid, rid=role.rid)
         )
+        PermissionService.refresh_users(db, [user.uid])
         db.commit()
         
         print(f"✅ Assigned role '{role_name}' to user '{email}'")
@@ -0,0 +1,263 @@
+"""
+Replay a realistic request mix against the API and report latency per endpoint.
+
+Logs in as users created by bench_seed, then runs `--concurrency` workers for
+`--requests` requests drawn from the weighted mix (list, detail, star, comment,
+approve, stats). Latency percentiles, throughput and the per-request SQL
+statement count (X-Query-Count header) are written to JSON, so every change
+can be measured against the same workload.
+
+Without --base-url the app is driven in-process (no server needed, no network
+overhead in the numbers); with it, a running server is load-tested over HTTP.
+
+Usage:
+    python -m app.scripts.bench_load
+    python -m app.scripts.bench_load --requests 5000 --concurrency 16 --output after.json
+    python -m app.scripts.bench_load --base-url http://localhost:8000 --mix list=50,detail=50
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import httpx
+from app.config import settings
+from app.scripts.bench_seed import BENCH_PASSWORD, bench_email
+
+API = settings.API_V1_PREFIX
+DEFAULT_MIX = "list=40,detail=30,star=10,comment=8,approve=5,stats=7"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, weight = part.split("=")
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation '{name}', expected one of: {', '.join(OPERATIONS)}")
+        mix[name] = int(weight)
+    return mix
+
+
+class Workload:
+    def __init__(self, client: httpx.Client, users: int, seed: int):
+        self.client = client
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = {role: self._login_many(role, users) for role in ("READER", "CREATOR", "APPROVER", "MANAGER")}
+        reader = self.tokens["READER"][0]
+        self.approved = [d["did"] for d in self._get_json("/documents?fields=did&limit=1000", reader)]
+        approver = self.tokens["APPROVER"][0]
+        self.pending = [d["did"] for d in self._get_json("/approvals/pending?fields=did&limit=1000", approver)]
+        if not self.approved:
+            raise SystemExit("❌ No approved documents visible - run python -m app.scripts.bench_seed first")
+
+    def _login_many(self, role: str, count: int) -> List[dict]:
+        tokens = []
+        for n in range(count):
+            response = self.client.post(
+                f"{API}/auth/login",
+                data={"username": bench_email(role, n), "password": BENCH_PASSWORD}
+            )
+            if response.status_code != 200:
+                break
+            tokens.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+        if not tokens:
+            raise SystemExit(f"❌ Could not log in as {bench_email(role, 0)} - run python -m app.scripts.bench_seed first")
+        return tokens
+
+    def _get_json(self, path: str, headers: dict):
+        response = self.client.get(f"{API}{path}", headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    def pick(self, values: list):
+        with self.lock:
+            return self.rng.choice(values)
+
+    def take_pending(self) -> Optional[str]:
+        with self.lock:
+            return self.pending.pop() if self.pending else None
+
+
+def op_list(w: Workload):
+    page = w.pick([0, 0, 0, 1, 2])
+    return "GET /documents", w.client.get(
+        f"{API}/documents", params={"skip": page * 20, "limit": 20}, headers=w.pick(w.tokens["READER"])
+    )
+
+
+def op_detail(w: Workload):
+    return "GET /documents/{did}", w.client.get(
+        f"{API}/documents/{w.pick(w.approved)}", headers=w.pick(w.tokens["READER"])
+    )
+
+
+def op_star(w: Workload):
+    return "POST /documents/{did}/star", w.client.post(
+        f"{API}/documents/{w.pick(w.approved)}/star", headers=w.pick(w.tokens["READER"])
+    )
+
+
+def op_comment(w: Workload):
+    return "POST /comments", w.client.post(
+        f"{API}/comments",
+        json={"did": w.pick(w.approved), "content": "Benchmark comment"},
+        headers=w.pick(w.tokens["READER"])
+    )
+
+
+def op_approve(w: Workload):
+    did = w.take_pending()
+    if did is None:
+        # Nothing left to approve - keep the mix going with a pending-queue read
+        return "GET /approvals/pending", w.client.get(
+            f"{API}/approvals/pending", params={"limit": 20}, headers=w.pick(w.tokens["APPROVER"])
+        )
+    return "POST /approvals/{did}/approve", w.client.post(
+        f"{API}/approvals/{did}/approve", headers=w.pick(w.tokens["APPROVER"])
+    )
+
+
+def op_stats(w: Workload):
+    return "GET /stats/overview", w.client.get(f"{API}/stats/overview", headers=w.pick(w.tokens["MANAGER"]))
+
+
+OPERATIONS = {
+    "list": op_list,
+    "detail": op_detail,
+    "star": op_star,
+    "comment": op_comment,
+    "approve": op_approve,
+    "stats": op_stats,
+}
+
+
+def summarize(samples: Dict[str, List[tuple]], elapsed: float) -> dict:
+    endpoints = {}
+    for endpoint, rows in sorted(samples.items()):
+        latencies = sorted(latency for latency, _, _ in rows)
+        queries = [count for _, count, _ in rows if count is not None]
+        errors = sum(1 for _, _, status in rows if status >= 400)
+        endpoints[endpoint] = {
+            "requests": len(rows),
+            "errors": errors,
+            "throughput_rps": round(len(rows) / elapsed, 2),
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 2),
+                "p50": round(percentile(latencies, 50) * 1000, 2),
+                "p95": round(percentile(latencies, 95) * 1000, 2),
+                "p99": round(percentile(latencies, 99) * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2),
+            },
+            "queries": {
+                "mean": round(sum(queries) / len(queries), 2) if queries else None,
+                "max": max(queries) if queries else None,
+            },
+        }
+    total = sum(len(rows) for rows in samples.values())
+    all_latencies = sorted(latency for rows in samples.values() for latency, _, _ in rows)
+    return {
+        "total": {
+            "requests": total,
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "elapsed_s": round(elapsed, 2),
+            "throughput_rps": round(total / elapsed, 2),
+            "p50_ms": round(percentile(all_latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(all_latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(all_latencies, 99) * 1000, 2),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def run(client: httpx.Client, args) -> dict:
+    mix = parse_mix(args.mix)
+    workload = Workload(client, args.users, args.seed)
+    print(f"🔑 Logged in; {len(workload.approved)} approved and {len(workload.pending)} pending documents")
+
+    rng = random.Random(args.seed)
+    plan = rng.choices(list(mix), weights=list(mix.values()), k=args.requests)
+    samples: Dict[str, List[tuple]] = defaultdict(list)
+    samples_lock = threading.Lock()
+
+    def execute(operation: str):
+        started = time.perf_counter()
+        endpoint, response = OPERATIONS[operation](workload)
+        latency = time.perf_counter() - started
+        query_count = response.headers.get("x-query-count")
+        with samples_lock:
+            samples[endpoint].append((latency, int(query_count) if query_count else None, response.status_code))
+
+    print(f"🚀 {args.requests} requests, concurrency {args.concurrency}, mix {mix}")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(execute, plan))
+    report = summarize(samples, time.perf_counter() - started)
+    report["config"] = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "mix": mix,
+        "seed": args.seed,
+        "target": args.base_url or "in-process",
+        "database": settings.DATABASE_URL.split("://")[0],
+    }
+    return report
+
+
+def print_report(report: dict):
+    print(f"\n{'endpoint':<32} {'reqs':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}")
+    for endpoint, row in report["endpoints"].items():
+        latency = row["latency_ms"]
+        print(
+            f"{endpoint:<32} {row['requests']:>6} {row['errors']:>4} {row['throughput_rps']:>8} "
+            f"{latency['p50']:>8} {latency['p95']:>8} {latency['p99']:>8} {row['queries']['mean'] or '-':>8}"
+        )
+    total = report["total"]
+    print(
+        f"\n✅ {total['requests']} requests in {total['elapsed_s']}s: {total['throughput_rps']} req/s, "
+        f"p50 {total['p50_ms']}ms, p95 {total['p95_ms']}ms, p99 {total['p99_ms']}ms, {total['errors']} errors"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the DocHub API")
+    parser.add_argument("--base-url", help="Test a running server instead of the app in-process")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted operations (default {DEFAULT_MIX})")
+    parser.add_argument("--users", type=int, default=20, help="Distinct users to log in per role")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench-results.json")
+    args = parser.parse_args()
+
+    if args.base_url:
+        with httpx.Client(base_url=args.base_url, timeout=60) as client:
+            report = run(client, args)
+    else:
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        with TestClient(app) as client:
+            report = run(client, args)
+
+    print_report(report)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Seed a reproducible data set for load testing (see bench_load).
+
+Creates the four default roles (reusing any that exist, e.g. from init_admin),
+users for each of them, categories, documents with tags, comments and stars in
+bulk. Everything derives from `--seed`, so two runs with the same arguments
+produce the same shape of data. Every user's
+password is BENCH_PASSWORD; emails are bench-<role>-<n>@bench.local.
+
+Usage:
+    python -m app.scripts.bench_seed --reset
+    python -m app.scripts.bench_seed --reset --users 2000 --documents 50000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+from uuid import UUID
+from sqlalchemy import insert
+from app.database import Base, SessionLocal, engine, init_db
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.document import Document
+from app.models.hashtag import Hashtag
+from app.models.role import Role, user_role
+from app.models.starred_document import StarredDocument
+from app.models.user import User
+from app.services.permission_service import PermissionService
+from app.services.search_service import SearchService
+from app.services.stats_service import StatsService
+from app.utils.auth import get_password_hash
+
+BENCH_PASSWORD = "benchmark"
+BENCH_ROLES = ("MANAGER", "CREATOR", "APPROVER", "READER")
+BATCH_SIZE = 5000
+WORDS = (
+    "report budget policy design review guide draft meeting research lecture "
+    "thesis manual contract invoice plan summary analysis proposal notes slides"
+).split()
+
+
+def bench_email(role: str, n: int) -> str:
+    return f"bench-{role.lower()}-{n}@bench.local"
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(UUID(int=rng.getrandbits(128), version=4))
+
+
+def _insert(db, model, rows: List[dict]):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+def seed(users: int, documents: int, categories: int, comments: int, stars: int, seed_value: int):
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    db = SessionLocal()
+
+    try:
+        started = time.perf_counter()
+
+        # Role names are unique: keep the rids of roles that already exist
+        role_ids = {name: _uuid(rng) for name in BENCH_ROLES}
+        existing = dict(db.query(Role.name, Role.rid).filter(Role.name.in_(BENCH_ROLES)))
+        _insert(db, Role, [{"rid": rid, "name": name} for name, rid in role_ids.items() if name not in existing])
+        role_ids.update(existing)
+
+        # One hash for everyone keeps seeding fast; logins still run full bcrypt checks
+        password = get_password_hash(BENCH_PASSWORD)
+        # A few managers and approvers, a fifth creators, the rest readers
+        counts = {
+            "MANAGER": max(1, users // 100),
+            "APPROVER": max(1, users // 20),
+            "CREATOR": max(1, users // 5),
+        }
+        counts["READER"] = max(1, users - sum(counts.values()))
+        uids: Dict[str, List[str]] = {role: [] for role in BENCH_ROLES}
+        user_rows, membership_rows = [], []
+        for role, count in counts.items():
+            for n in range(count):
+                uid = _uuid(rng)
+                uids[role].append(uid)
+                user_rows.append({
+                    "uid": uid,
+                    "name": f"Bench {role.title()} {n}",
+                    "email": bench_email(role, n),
+                    "password": password,
+                    "created_at": now - timedelta(days=rng.randint(0, 365)),
+                })
+                membership_rows.append({"uid": uid, "rid": role_ids[role]})
+        _insert(db, User, user_rows)
+        _insert(db, user_role, membership_rows)
+        print(f"✅ {len(user_rows)} users: {counts}")
+
+        oids = [_uuid(rng) for _ in range(categories)]
+        _insert(db, Category, [{"oid": oid, "name": f"bench-topic-{i}"} for i, oid in enumerate(oids)])
+
+        readers = uids["READER"]
+        document_rows, tag_rows, comment_rows, star_rows = [], [], [], []
+        for n in range(documents):
+            did = _uuid(rng)
+            created_at = now - timedelta(days=rng.randint(0, 180), seconds=rng.randint(0, 86400))
+            # 70% approved, 20% pending, 10% rejected
+            status = rng.choices((1, 0, 2), weights=(70, 20, 10))[0]
+            reviewed = status != 0
+            document_rows.append({
+                "did": did,
+                "uid": rng.choice(uids["CREATOR"]),
+                "title": " ".join(rng.choices(WORDS, k=3)).title() + f" {n}",
+                "description": " ".join(rng.choices(WORDS, k=rng.randint(20, 80))),
+                "link": f"uploads/bench/{did}.pdf",
+                "size": float(rng.randint(10_000, 20_000_000)),
+                "status": status,
+                "approved_by": rng.choice(uids["APPROVER"]) if reviewed else None,
+                "approved_at": created_at + timedelta(hours=rng.randint(1, 72)) if reviewed else None,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            for oid in rng.sample(oids, k=min(len(oids), rng.randint(1, 4))):
+                tag_rows.append({"did": did, "oid": oid})
+            if status == 1:
+                for i, uid in enumerate(rng.sample(readers, k=min(len(readers), rng.randint(0, comments * 2)))):
+                    comment_rows.append({
+                        "uid": uid,
+                        "did": did,
+                        "content": " ".join(rng.choices(WORDS, k=rng.randint(3, 30))),
+                        "created_at": created_at + timedelta(hours=1 + i),
+                    })
+                for uid in rng.sample(readers, k=min(len(readers), rng.randint(0, stars * 2))):
+                    star_rows.append({"uid": uid, "did": did, "created_at": created_at})
+        _insert(db, Document, document_rows)
+        _insert(db, Hashtag, tag_rows)
+        _insert(db, Comment, comment_rows)
+        _insert(db, StarredDocument, star_rows)
+        db.commit()
+        print(f"✅ {len(document_rows)} documents, {len(tag_rows)} tags, "
+              f"{len(comment_rows)} comments, {len(star_rows)} stars")
+
+        print("Rebuilding rollups, permissions and search index...")
+        StatsService.rebuild(db)
+        PermissionService.rebuild(db)
+        SearchService.reindex_all(db)
+
+        print(f"\n🎉 Seeded in {time.perf_counter() - started:.1f}s (password: {BENCH_PASSWORD})")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a load-test data set")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--comments", type=int, default=3, help="Average comments per approved document")
+    parser.add_argument("--stars", type=int, default=5, help="Average stars per approved document")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    args = parser.parse_args()
+
+    if args.reset:
+        print("Dropping all tables...")
+        Base.metadata.drop_all(bind=engine)
+    init_db()
+    seed(args.users, args.documents, args.categories, args.comments, args.stars, args.seed)
+
+
+if __name__ == "__main__":
+    main()
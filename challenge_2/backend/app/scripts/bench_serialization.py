@@ -0,0 +1,107 @@
+"""
+Benchmark the serialization cost of document list responses.
+
+Compares the previous path (hand-built dicts validated against the
+`Document` response model, then encoded with the standard json module, as
+FastAPI does for `response_model`) with the current one (rows built from SQL
+result tuples and encoded with orjson). No database is needed; rows are
+synthetic but shaped like real list items.
+
+Usage:
+    python -m app.scripts.bench_serialization
+    python -m app.scripts.bench_serialization --rows 100 1000 10000 --repeat 5
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+from uuid import uuid4
+import orjson
+from pydantic import TypeAdapter
+from app.schemas.document import Document
+from app.services.document_service import DOCUMENT_COLUMNS
+
+_documents_adapter = TypeAdapter(List[Document])
+
+
+def make_rows(count: int) -> List[tuple]:
+    """Result tuples as returned for DOCUMENT_COLUMNS, plus enrichment values"""
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        rows.append((
+            str(uuid4()), str(uuid4()), f"Document {i}", "Lorem ipsum dolor sit amet " * 8,
+            f"uploads/blobs/{i:064x}.pdf", 1024.0 * i, 1, str(uuid4()),
+            now - timedelta(hours=i), now - timedelta(days=1), now,
+            "Author Name", "Approver Name", ["python", "fastapi", "docs"], i % 17, i % 5,
+        ))
+    return rows
+
+
+def serialize_before(rows: List[tuple]) -> bytes:
+    items = []
+    for row in rows:
+        (did, uid, title, description, link, size, status, approved_by, approved_at,
+         created_at, updated_at, author_name, approver_name, tags, stars, comments) = row
+        items.append({
+            "did": did,
+            "uid": uid,
+            "title": title,
+            "description": description,
+            "link": link,
+            "size": size,
+            "status": status,
+            "approved_by": approved_by,
+            "approved_at": approved_at,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "author_name": author_name,
+            "approver_name": approver_name,
+            "tags": tags,
+            "stars_count": stars,
+            "comments_count": comments
+        })
+    validated = _documents_adapter.validate_python(items)
+    content = _documents_adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+_ENRICHED = ("author_name", "approver_name", "tags", "stars_count", "comments_count")
+_KEYS = DOCUMENT_COLUMNS + _ENRICHED
+
+
+def serialize_after(rows: List[tuple]) -> bytes:
+    return orjson.dumps([dict(zip(_KEYS, row)) for row in rows])
+
+
+def measure(fn: Callable[[List[tuple]], bytes], rows: List[tuple], repeat: int) -> float:
+    """Best-of-`repeat` wall time in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document list serialization")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sample = make_rows(3)
+    assert json.loads(serialize_before(sample)) == json.loads(serialize_after(sample)), "Outputs differ"
+
+    print(f"{'rows':>8} {'before µs/row':>14} {'after µs/row':>13} {'speedup':>8}")
+    for count in args.rows:
+        rows = make_rows(count)
+        before = measure(serialize_before, rows, args.repeat)
+        after = measure(serialize_after, rows, args.repeat)
+        print(f"{count:>8} {before / count * 1e6:>14.2f} {after / count * 1e6:>13.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Bulk-import users and their roles from a CSV or JSON lines file.
+
+Each record has `email`, `name`, `password` and optional `roles`
+(a list in JSON lines, `;`-separated in CSV). Passwords are hashed in
+parallel worker processes and every batch is inserted in one transaction
+(COPY on PostgreSQL, executemany elsewhere). After each batch the number of
+consumed records is written to a checkpoint file, so an interrupted import
+resumes where it stopped; emails that already exist are skipped.
+
+Usage:
+    python -m app.scripts.import_users users.csv
+    python -m app.scripts.import_users users.jsonl --batch-size 2000 --workers 8
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal, init_db
+from app.models.role import Role, user_role
+from app.models.user import User
+from app.services.permission_service import PermissionService
+from app.services.stats_service import StatsService
+from app.utils.auth import get_password_hash
+
+
+def read_records(path: Path, file_format: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """Stream (line number, record) pairs; record is None for unparsable lines"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                roles = record.get("roles") or ""
+                record["roles"] = [r for r in roles.split(";") if r.strip()]
+                yield reader.line_num, record
+        else:
+            for line_num, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_num, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_num, None
+
+
+def load_checkpoint(path: Path) -> int:
+    if not path.exists():
+        return 0
+    return json.loads(path.read_text())["records_done"]
+
+
+def save_checkpoint(path: Path, records_done: int):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"records_done": records_done, "updated_at": datetime.utcnow().isoformat()}))
+    os.replace(tmp, path)
+
+
+class RoleResolver:
+    """Role name -> rid, creating roles that don't exist yet"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.rids: Dict[str, str] = {name.upper(): rid for rid, name in db.query(Role.rid, Role.name)}
+
+    def resolve(self, name: str) -> str:
+        key = name.strip().upper()
+        if key not in self.rids:
+            rid = str(uuid4())
+            self.db.execute(insert(Role).values(rid=rid, name=key))
+            self.rids[key] = rid
+            print(f"✅ Created role: {key}")
+        return self.rids[key]
+
+
+def _copy_rows(db: Session, table: str, columns: List[str], rows: List[tuple]):
+    """COPY rows into a table on the session's own connection (same transaction)"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def insert_batch(db: Session, users: List[dict], memberships: List[dict]):
+    if db.get_bind().dialect.driver == "psycopg2":
+        _copy_rows(db, "users", ["uid", "name", "email", "password", "created_at"], [
+            (u["uid"], u["name"], u["email"], u["password"], u["created_at"].isoformat()) for u in users
+        ])
+        if memberships:
+            _copy_rows(db, "user_role", ["uid", "rid"], [(m["uid"], m["rid"]) for m in memberships])
+    else:
+        db.execute(insert(User), users)
+        if memberships:
+            db.execute(insert(user_role), memberships)
+
+
+class Importer:
+    def __init__(self, db: Session, executor: ProcessPoolExecutor, workers: int):
+        self.db = db
+        self.executor = executor
+        self.workers = workers
+        self.roles = RoleResolver(db)
+        self.imported = 0
+        self.skipped = 0
+        self.invalid = 0
+
+    def _validate(self, line_num: int, record: Optional[dict]) -> Optional[dict]:
+        if not isinstance(record, dict):
+            print(f"⚠️  Line {line_num}: not a valid record")
+            return None
+        email = (record.get("email") or "").strip()
+        password = record.get("password") or ""
+        if "@" not in email or not password:
+            print(f"⚠️  Line {line_num}: email and password are required")
+            return None
+        roles = record.get("roles") or []
+        if isinstance(roles, str):
+            roles = roles.split(";")
+        return {
+            "email": email,
+            "name": (record.get("name") or email.split("@")[0]).strip(),
+            "password": password,
+            "roles": [r for r in roles if r.strip()],
+        }
+
+    def import_batch(self, batch: List[Tuple[int, Optional[dict]]]):
+        records = []
+        seen = set()
+        for line_num, raw in batch:
+            record = self._validate(line_num, raw)
+            if record is None:
+                self.invalid += 1
+            elif record["email"] in seen:
+                self.skipped += 1
+            else:
+                seen.add(record["email"])
+                records.append(record)
+
+        existing = {email for (email,) in self.db.query(User.email).filter(User.email.in_(seen))}
+        records = [r for r in records if r["email"] not in existing]
+        self.skipped += len(existing)
+        if not records:
+            return
+
+        chunksize = max(1, len(records) // (self.workers * 4))
+        hashes = self.executor.map(
+            get_password_hash,
+            [r["password"] for r in records],
+            [settings.BCRYPT_ROUNDS] * len(records),
+            chunksize=chunksize
+        )
+
+        now = datetime.utcnow()
+        users, memberships = [], []
+        granted = set()
+        for record, hashed in zip(records, hashes):
+            uid = str(uuid4())
+            users.append({
+                "uid": uid,
+                "name": record["name"],
+                "email": record["email"],
+                "password": hashed,
+                "created_at": now,
+            })
+            rids = {self.roles.resolve(name) for name in record["roles"]}
+            memberships.extend({"uid": uid, "rid": rid} for rid in rids)
+            if rids:
+                granted.add(uid)
+
+        insert_batch(self.db, users, memberships)
+        PermissionService.refresh_users(self.db, [u["uid"] for u in users if u["uid"] in granted])
+        StatsService.on_users_registered(self.db, now, len(users))
+        self.db.commit()
+        self.imported += len(users)
+
+
+def import_users(path: Path, file_format: str, batch_size: int, workers: int, checkpoint: Path):
+    db = SessionLocal()
+    started = time.perf_counter()
+
+    try:
+        init_db()
+
+        records_done = load_checkpoint(checkpoint)
+        if records_done:
+            print(f"🔄 Resuming after {records_done} records (checkpoint {checkpoint})")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            importer = Importer(db, executor, workers)
+            batch = []
+            position = 0
+
+            def flush():
+                importer.import_batch(batch)
+                save_checkpoint(checkpoint, position)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"📦 {position} records read, {importer.imported} imported "
+                    f"({importer.imported / elapsed:.0f} users/s)"
+                )
+                batch.clear()
+
+            for line_num, record in read_records(path, file_format):
+                position += 1
+                if position <= records_done:
+                    continue
+                batch.append((line_num, record))
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+
+        elapsed = time.perf_counter() - started
+        print(f"\n✅ Imported: {importer.imported}")
+        print(f"✅ Skipped (already present): {importer.skipped}")
+        print(f"⚠️  Invalid: {importer.invalid}")
+        print(f"⏱️  {elapsed:.1f}s, {importer.imported / elapsed:.0f} users/s")
+        print("\n🎉 Import complete!")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        print("   Re-run the same command to resume from the last checkpoint")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import users and roles")
+    parser.add_argument("file", type=Path, help="CSV (header: email,name,password,roles) or JSON lines file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Password hashing processes")
+    parser.add_argument("--checkpoint", type=Path, help="Defaults to <file>.checkpoint")
+    args = parser.parse_args()
+
+    file_format = args.format or ("csv" if args.file.suffix.lower() == ".csv" else "jsonl")
+    checkpoint = args.checkpoint or args.file.with_name(args.file.name + ".checkpoint")
+    import_users(args.file, file_format, args.batch_size, args.workers, checkpoint)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Run post-upload processing (text extraction, page counts, thumbnails) outside the API.
+
+Useful with PROCESSING_WORKERS=0 to keep the API processes free of parsing
+work, or on a separate host sharing the database and upload directory. Several
+instances can run side by side on PostgreSQL; each job is claimed by one.
+Thumbnails need PyMuPDF (pip install pymupdf); without it only text and page
+counts are extracted.
+
+Usage:
+    python -m app.scripts.process_uploads
+    python -m app.scripts.process_uploads --workers 8 --backfill
+"""
+
+import argparse
+import asyncio
+import os
+from app.database import SessionLocal, init_db
+from app.services.processing_service import ProcessingService, file_processing_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process uploaded files in the background")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel processing jobs")
+    parser.add_argument("--backfill", action="store_true", help="Queue files uploaded before processing existed")
+    parser.add_argument("--retry-failed", action="store_true", help="Queue failed jobs again")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.backfill:
+            print(f"✅ Queued {ProcessingService.enqueue_missing(db)} unprocessed file(s)")
+        if args.retry_failed:
+            print(f"✅ Re-queued {ProcessingService.retry_failed(db)} failed job(s)")
+    finally:
+        db.close()
+
+    print(f"🚀 Processing uploads with {args.workers} worker(s), Ctrl+C to stop")
+    try:
+        asyncio.run(file_processing_worker(args.workers))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+
+
+if __name__ == "__main__":
+    main()
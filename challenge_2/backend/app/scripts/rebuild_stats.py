@@ -0,0 +1,35 @@
+"""
+Recompute the dashboard statistics rollups from the source tables.
+Run this after restoring a backup or editing data outside the API.
+
+Usage:
+    python -m app.scripts.rebuild_stats
+"""
+
+from app.database import SessionLocal, init_db
+from app.services.stats_service import StatsService
+
+
+def rebuild_stats():
+    """Rebuild stats_counters, stats_daily and stats_category_usage"""
+    db = SessionLocal()
+    
+    try:
+        init_db()
+        
+        print("Rebuilding statistics rollups...")
+        StatsService.rebuild(db)
+        overview = StatsService.get_overview(db)
+        print(f"✅ Users: {overview['users_total']}")
+        print(f"✅ Documents by status: {overview['status_counts']}")
+        print("\n🎉 Rollups rebuilt successfully!")
+        
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_stats()
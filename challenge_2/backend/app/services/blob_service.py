@@ -0,0 +1,225 @@
+import asyncio
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from typing import Iterable, List, Optional, Tuple
+from uuid import uuid4
+from sqlalchemy import bindparam, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.models.blob import Blob
+from app.models.document import Document
+
+BLOB_DIR = Path(settings.UPLOAD_DIR) / "blobs"
+TMP_DIR = Path(settings.UPLOAD_DIR) / "tmp"
+THUMBNAIL_DIR = Path(settings.UPLOAD_DIR) / "thumbnails"
+FILE_CLEANUP_INTERVAL_SECONDS = 5
+
+# Plain upload files of deleted documents, removed by file_cleanup_worker
+_pending_removals: "SimpleQueue[Path]" = SimpleQueue()
+
+
+class BlobService:
+    """Content-addressed, reference-counted storage for uploaded files"""
+
+    @staticmethod
+    def blob_path(sha256: str, ext: str) -> Path:
+        """Sharded location of a blob: blobs/ab/cd/abcd...{ext}"""
+        return BLOB_DIR / sha256[:2] / sha256[2:4] / f"{sha256}{ext}"
+
+    @staticmethod
+    def thumbnail_path(sha256: str) -> Path:
+        """Where the first-page thumbnail of a blob is rendered"""
+        return THUMBNAIL_DIR / sha256[:2] / f"{sha256}.png"
+
+    @staticmethod
+    def temp_path() -> Path:
+        """Fresh path to stream an upload into before its hash is known"""
+        TMP_DIR.mkdir(parents=True, exist_ok=True)
+        return TMP_DIR / f"{uuid4()}.part"
+
+    @staticmethod
+    def get_by_hash(db: Session, sha256: str) -> Optional[Blob]:
+        """Get blob by content hash"""
+        return db.query(Blob).filter(Blob.hash == sha256).first()
+
+    @staticmethod
+    def register_upload(db: Session, tmp_path: Path, sha256: str, size: int, ext: str) -> Tuple[Blob, bool]:
+        """
+        Move a streamed upload into the blob store.
+        If the content is already stored the temp file is discarded instead.
+        Returns (blob, created).
+        """
+        existing = BlobService.get_by_hash(db, sha256)
+        if existing and Path(existing.path).exists():
+            os.remove(tmp_path)
+            # Refresh so the GC grace period restarts for re-uploaded content
+            existing.updated_at = datetime.utcnow()
+            db.commit()
+            return existing, False
+
+        path = BlobService.blob_path(sha256, ext)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, path)
+
+        if existing:
+            # Row survived but the file was lost - restore it in place
+            existing.path = str(path)
+            existing.updated_at = datetime.utcnow()
+            db.commit()
+            return existing, True
+
+        blob = Blob(hash=sha256, path=str(path), size=size, ref_count=0)
+        db.add(blob)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent upload of the same content won the race
+            db.rollback()
+            return BlobService.get_by_hash(db, sha256), False
+        db.refresh(blob)
+        return blob, True
+
+    @staticmethod
+    def add_reference(db: Session, link: str):
+        """Count one more document linking to `link` (no-op for non-blob links). Caller commits."""
+        db.query(Blob).filter(Blob.path == link).update(
+            {Blob.ref_count: Blob.ref_count + 1, Blob.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+
+    @staticmethod
+    def release_references(db: Session, links: Iterable[str]):
+        """Drop one reference per link (no-op for non-blob links) in one executemany. Caller commits."""
+        counts = Counter(links)
+        if not counts:
+            return
+        blobs = Blob.__table__
+        released = bindparam("released")
+        db.execute(
+            blobs.update().where(blobs.c.path == bindparam("link")).values(
+                ref_count=case((blobs.c.ref_count > released, blobs.c.ref_count - released), else_=0),
+                updated_at=bindparam("released_at")
+            ),
+            [
+                {"link": link, "released": n, "released_at": datetime.utcnow()}
+                for link, n in counts.items()
+            ]
+        )
+    
+    @staticmethod
+    def _plain_upload(link: str) -> Optional[Path]:
+        """File under UPLOAD_DIR a link points to, unless it is managed by the blob store"""
+        upload_dir = Path(settings.UPLOAD_DIR).resolve()
+        try:
+            path = Path(link).resolve()
+        except (OSError, ValueError):
+            return None
+        if path == upload_dir or not path.is_relative_to(upload_dir):
+            return None
+        if any(path.is_relative_to(managed.resolve()) for managed in (BLOB_DIR, TMP_DIR, THUMBNAIL_DIR)):
+            return None
+        return path
+    
+    @staticmethod
+    def schedule_file_cleanup(db: Session, links: Iterable[str]):
+        """
+        Queue plain upload files (pre blob store) that no remaining document links to
+        for removal in the background. Blob files are reclaimed by the blob GC instead.
+        Call after the documents were deleted and committed.
+        """
+        candidates = {link for link in links if BlobService._plain_upload(link)}
+        if not candidates:
+            return
+        still_linked = {link for (link,) in db.query(Document.link).filter(Document.link.in_(candidates))}
+        for link in candidates - still_linked:
+            _pending_removals.put(BlobService._plain_upload(link))
+
+    @staticmethod
+    def collect_garbage(db: Session, grace_seconds: int) -> int:
+        """Delete blobs that have been unreferenced for longer than the grace period"""
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        orphans = db.query(Blob.hash, Blob.path).filter(
+            Blob.ref_count == 0,
+            Blob.updated_at < cutoff
+        ).all()
+
+        removed = 0
+        for sha256, path in orphans:
+            # Re-check both conditions so a reference taken or a re-upload since the SELECT wins
+            deleted = db.query(Blob).filter(
+                Blob.hash == sha256,
+                Blob.ref_count == 0,
+                Blob.updated_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                BlobService.thumbnail_path(sha256).unlink(missing_ok=True)
+                removed += 1
+
+        # Leftovers of interrupted uploads
+        if TMP_DIR.exists():
+            for tmp_file in TMP_DIR.iterdir():
+                if datetime.utcfromtimestamp(tmp_file.stat().st_mtime) < cutoff:
+                    tmp_file.unlink(missing_ok=True)
+
+        return removed
+
+
+def _sweep_once() -> int:
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return BlobService.collect_garbage(db, settings.BLOB_GC_GRACE_SECONDS)
+    finally:
+        db.close()
+
+
+def _drain_removals() -> int:
+    paths: List[Path] = []
+    while True:
+        try:
+            paths.append(_pending_removals.get_nowait())
+        except Empty:
+            break
+    removed = 0
+    for path in paths:
+        if path.is_file():
+            path.unlink()
+            removed += 1
+    return removed
+
+
+async def file_cleanup_worker():
+    """Background task: remove files of deleted documents shortly after the delete"""
+    while True:
+        await asyncio.sleep(FILE_CLEANUP_INTERVAL_SECONDS)
+        if _pending_removals.empty():
+            continue
+        try:
+            removed = await run_in_threadpool(_drain_removals)
+            if removed:
+                print(f"🧹 Removed {removed} file(s) of deleted documents")
+        except Exception as e:
+            print(f"❌ File cleanup failed: {e}")
+
+
+async def blob_gc_worker():
+    """Background task: periodically garbage-collect orphaned blobs"""
+    while True:
+        await asyncio.sleep(settings.BLOB_GC_INTERVAL_SECONDS)
+        try:
+            removed = await run_in_threadpool(_sweep_once)
+            if removed:
+                print(f"🧹 Removed {removed} orphaned blob(s)")
+        except Exception as e:
+            print(f"❌ Blob GC failed: {e}")
@@ -1,8 +1,26 @@
 from sqlalchemy.orm import Session
+from app.database import dialect_insert
 from app.models.category import Category
-from typing import List, Optional
+from app.services.permission_service import PermissionService, invalidate_permission_cache
+from app.services.stats_service import StatsService
+from app.utils.cache import invalidate_all
+from threading import Lock
+from typing import Dict, List, Optional
 from uuid import uuid4
 
+# In-process name -> oid cache, kept in sync by CategoryService.create/delete
+_oid_cache: Dict[str, str] = {}
+_oid_cache_lock = Lock()
+
+
+def invalidate_category_cache(name: Optional[str] = None):
+    """Forget one cached category name, or the whole cache"""
+    with _oid_cache_lock:
+        if name is None:
+            _oid_cache.clear()
+        else:
+            _oid_cache.pop(name, None)
+
 
 class CategoryService:
     @staticmethod
@@ -30,6 +48,8 @@ class CategoryService:
         db.add(category)
         db.commit()
         db.refresh(category)
+        with _oid_cache_lock:
+            _oid_cache[category.name] = category.oid
         return category
 
     @staticmethod
@@ -38,20 +58,61 @@ class CategoryService:
         category = db.query(Category).filter(Category.oid == oid).first()
         if not category:
             return False
+        name = category.name
+        StatsService.on_category_deleted(db, oid)
         db.delete(category)
         db.commit()
+        invalidate_category_cache(name)
+        # Access rows for it went with the ON DELETE CASCADE
+        invalidate_permission_cache()
+        # Documents tagged with it lose the tag
+        invalidate_all()
         return True
 
+    @staticmethod
+    def get_or_create_oids(db: Session, names: List[str]) -> Dict[str, str]:
+        """
+        Resolve category names to oids, creating missing categories.
+        Uses the in-process cache, one SELECT for unknown names and one bulk
+        INSERT ... ON CONFLICT DO NOTHING RETURNING for new ones. Caller commits.
+        Only names read back from the database are cached: categories created
+        here are not committed yet and would outlive a rollback in the cache.
+        """
+        with _oid_cache_lock:
+            resolved = {name: _oid_cache[name] for name in names if name in _oid_cache}
+        missing = [name for name in names if name not in resolved]
+        found: Dict[str, str] = {}
+
+        if missing:
+            for oid, name in db.query(Category.oid, Category.name).filter(Category.name.in_(missing)):
+                found[name] = oid
+            missing = [name for name in missing if name not in found]
+
+        if missing:
+            rows = [{"oid": str(uuid4()), "name": name} for name in missing]
+            stmt = (
+                dialect_insert(db)(Category)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["name"])
+                .returning(Category.oid, Category.name)
+            )
+            for oid, name in db.execute(stmt):
+                resolved[name] = oid
+            # Names inserted concurrently by another transaction
+            still_missing = [name for name in missing if name not in resolved]
+            if still_missing:
+                for oid, name in db.query(Category.oid, Category.name).filter(Category.name.in_(still_missing)):
+                    found[name] = oid
+
+        with _oid_cache_lock:
+            _oid_cache.update(found)
+        resolved.update(found)
+        return resolved
+
     @staticmethod
     def get_accessible_categories_for_user(db: Session, user_id: str) -> List[Category]:
         """Get all categories accessible by a user through their roles"""
-        from app.services.role_service import RoleService
-        
-        user_roles = RoleService.get_user_roles(db, user_id)
-        accessible_categories = set()
-        
-        for role in user_roles:
-            cats = RoleService.get_accessible_categories(db, role.rid)
-            accessible_categories.update(cat.oid for cat in cats)
-        
-        return db.query(Category).filter(Category.oid.in_(accessible_categories)).all()
+        oids = PermissionService.accessible_category_ids(db, user_id)
+        if not oids:
+            return []
+        return db.query(Category).filter(Category.oid.in_(oids)).all()
@@ -1,14 +1,75 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 from app.models.comment import Comment
+from app.models.user import User
 from app.schemas.comment import CommentCreate
+from app.utils.cache import invalidate_document
+from app.utils.events import document_events, event_bus
+
+# Newest first; uid breaks ties between comments posted in the same instant
+COMMENT_ORDER = (Comment.created_at.desc(), Comment.uid.desc())
+COMMENT_FIELDS = ("uid", "did", "content", "created_at", "user_name")
+
+
+def encode_comment_cursor(created_at: datetime, uid: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at.isoformat(), uid]).encode()).decode()
+
+
+def decode_comment_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, uid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), str(uid)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def thread_query(did: str):
+    """Comments of a document with the author name joined in, newest first"""
+    return (
+        select(Comment.uid, Comment.did, Comment.content, Comment.created_at, User.name)
+        .outerjoin(User, User.uid == Comment.uid)
+        .where(Comment.did == did)
+        .order_by(*COMMENT_ORDER)
+    )
 
 
 class CommentService:
     @staticmethod
-    def get_by_document(db: Session, did: str) -> List[Comment]:
-        """Get all comments for a document"""
-        return db.query(Comment).filter(Comment.did == did).order_by(Comment.created_at.desc()).all()
+    def get_page(
+        db: Session,
+        did: str,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        One page of a comment thread as plain dicts (author name included).
+        Keyset-paginated on (created_at desc, uid desc); returns (items, next_cursor).
+        """
+        query = thread_query(did)
+        if cursor:
+            created_at, uid = decode_comment_cursor(cursor)
+            query = query.where(tuple_(Comment.created_at, Comment.uid) < tuple_(created_at, uid))
+        rows = db.execute(query.limit(limit + 1)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_comment_cursor(rows[-1].created_at, rows[-1].uid)
+        return [dict(zip(COMMENT_FIELDS, row)) for row in rows], next_cursor
+    
+    @staticmethod
+    def stream(db: Session, did: str, batch_size: int = 500) -> Iterator[dict]:
+        """
+        Yield a whole thread without materializing it. Rows are fetched `batch_size`
+        at a time (a server-side cursor on PostgreSQL), so memory stays bounded.
+        """
+        result = db.execute(thread_query(did).execution_options(yield_per=batch_size))
+        for row in result:
+            yield dict(zip(COMMENT_FIELDS, row))
     
     @staticmethod
     def get_count(db: Session, did: str) -> int:
@@ -25,6 +86,8 @@ class CommentService:
         )
         db.add(db_comment)
         db.commit()
+        invalidate_document(db_comment.did)
+        event_bus.publish(document_events(db, "document.commented", [db_comment.did]))
         db.refresh(db_comment)
         return db_comment
     
@@ -42,4 +105,6 @@ class CommentService:
         
         db.delete(db_comment)
         db.commit()
+        invalidate_document(did)
+        event_bus.publish(document_events(db, "document.comment_deleted", [did]))
         return True
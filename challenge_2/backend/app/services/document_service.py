@@ -1,13 +1,60 @@
+from collections import defaultdict
+from sqlalchemy import insert, delete, update, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Dict, FrozenSet, Iterable
+from datetime import datetime
 import uuid
 from app.models.document import Document
 from app.models.category import Category
 from app.models.hashtag import Hashtag
+from app.models.comment import Comment
+from app.models.starred_document import StarredDocument
+from app.models.user import User
 from app.schemas.document import DocumentCreate, DocumentUpdate
+from app.config import settings
+from app.services.blob_service import BlobService
+from app.services.permission_service import PermissionService
+from app.services.search_service import SearchService
+from app.services.stats_service import StatsService
+from app.utils.cache import invalidate_document, invalidate_documents, invalidate_lists
+from app.utils.events import document_events, event_bus
+
+# Fields a document list response can be narrowed to with `?fields=`
+DOCUMENT_COLUMNS = (
+    "did", "uid", "title", "description", "link", "size", "status",
+    "approved_by", "approved_at", "created_at", "updated_at"
+)
+DOCUMENT_ENRICHED_FIELDS = ("author_name", "approver_name", "tags", "stars_count", "comments_count", "is_starred")
+DOCUMENT_FIELDS = DOCUMENT_COLUMNS + DOCUMENT_ENRICHED_FIELDS
+# Everything in the Document schema; is_starred is per-viewer and must be asked for,
+# except on the lists that always returned it (starred documents, approval queue)
+DEFAULT_DOCUMENT_FIELDS = frozenset(DOCUMENT_FIELDS) - {"is_starred"}
+VIEWER_DOCUMENT_FIELDS = frozenset(DOCUMENT_FIELDS)
 
 
 class DocumentService:
+    @staticmethod
+    def visibility_filter(uid: str, user_is_creator: bool):
+        """
+        Filter clause for documents a user may see:
+        - READER: only approved documents (status=1)
+        - CREATOR: own documents (all status) + approved documents from others
+        With CATEGORY_ACCESS_CONTROL, approved documents are further limited to
+        untagged ones and those in a category the user's roles can access.
+        """
+        approved = DocumentService.approved_filter(uid)
+        if user_is_creator:
+            return (Document.uid == uid) | approved
+        return approved
+    
+    @staticmethod
+    def approved_filter(uid: str):
+        """Approved documents of others that a user may see"""
+        if settings.CATEGORY_ACCESS_CONTROL:
+            return (Document.status == 1) & PermissionService.category_filter(uid)
+        return Document.status == 1
+    
     @staticmethod
     def get_by_id(db: Session, did: str) -> Optional[Document]:
         """Get document by ID"""
@@ -19,10 +66,11 @@ class DocumentService:
         skip: int = 0,
         limit: int = 100,
         status: Optional[int] = None,
-        uid: Optional[str] = None
+        uid: Optional[str] = None,
+        columns: Optional[list] = None
     ):
-        """Get all documents with filters"""
-        query = db.query(Document)
+        """Get all documents with filters (only `columns` when given)"""
+        query = db.query(*columns) if columns else db.query(Document)
         
         if status is not None:
             query = query.filter(Document.status == status)
@@ -45,6 +93,8 @@ class DocumentService:
             status=0  # Default to draft
         )
         db.add(db_document)
+        BlobService.add_reference(db, db_document.link)
+        StatsService.on_document_created(db, db_document)
         db.commit()
         db.refresh(db_document)
         
@@ -65,6 +115,11 @@ class DocumentService:
         if all_tags:
             DocumentService._update_tags(db, db_document.did, all_tags)
         
+        SearchService.index_document(db, db_document.did)
+        db.commit()
+        invalidate_lists()
+        event_bus.publish(document_events(db, "document.created", [db_document.did]))
+        
         return db_document
     
     @staticmethod
@@ -75,14 +130,27 @@ class DocumentService:
             return None
         
         update_data = document_update.dict(exclude_unset=True, exclude={'tags'})
+        
+        # Move the blob reference when the file is replaced
+        if update_data.get('link') and update_data['link'] != db_document.link:
+            BlobService.release_references(db, [db_document.link])
+            BlobService.add_reference(db, update_data['link'])
+        
+        old_status, old_approved_at = db_document.status, db_document.approved_at
         for field, value in update_data.items():
             setattr(db_document, field, value)
+        StatsService.on_document_changed(
+            db, old_status, old_approved_at, db_document.status, db_document.approved_at
+        )
         
         # Handle tags update
         if document_update.tags is not None:
             DocumentService._update_tags(db, did, document_update.tags)
         
+        SearchService.index_document(db, did)
         db.commit()
+        invalidate_document(did)
+        event_bus.publish(document_events(db, "document.updated", [did]))
         db.refresh(db_document)
         return db_document
     
@@ -93,41 +161,171 @@ class DocumentService:
         if not db_document:
             return False
         
+        link = db_document.link
+        events = document_events(db, "document.deleted", [did])
+        BlobService.release_references(db, [link])
+        StatsService.on_document_deleted(db, db_document)
+        # Comments, stars and tags go with it through ON DELETE CASCADE
         db.delete(db_document)
         db.commit()
+        BlobService.schedule_file_cleanup(db, [link])
+        SearchService.remove_document(did)
+        invalidate_document(did)
+        event_bus.publish(events)
         return True
     
+    @staticmethod
+    def bulk_review(db: Session, dids: List[str], new_status: int, approver_uid: str) -> Dict[str, str]:
+        """
+        Approve (1) or reject (2) many pending documents with one set-based UPDATE and one commit.
+        Returns did -> "approved" | "rejected" | "not_pending" | "not_found".
+        """
+        dids = list(dict.fromkeys(dids))
+        reviewed_at = datetime.utcnow()
+        updated = {
+            did for (did,) in db.execute(
+                update(Document)
+                .where(Document.did.in_(dids), Document.status == 0)
+                .values(status=new_status, approved_by=approver_uid, approved_at=reviewed_at, updated_at=reviewed_at)
+                .returning(Document.did)
+                .execution_options(synchronize_session=False)
+            )
+        }
+        
+        existing = set()
+        if len(updated) < len(dids):
+            remaining = [did for did in dids if did not in updated]
+            existing = {did for (did,) in db.query(Document.did).filter(Document.did.in_(remaining))}
+        
+        if updated:
+            StatsService.on_document_changed(db, 0, None, new_status, reviewed_at, count=len(updated))
+        db.commit()
+        invalidate_documents(updated)
+        
+        outcome = "approved" if new_status == 1 else "rejected"
+        event_bus.publish(document_events(db, f"document.{outcome}", updated))
+        return {
+            did: outcome if did in updated else ("not_pending" if did in existing else "not_found")
+            for did in dids
+        }
+    
     @staticmethod
     def _update_tags(db: Session, did: str, tags: List[str]):
         """Update document tags"""
+        from app.services.category_service import CategoryService, invalidate_category_cache
+        
         # Remove existing tags
-        db.query(Hashtag).filter(Hashtag.did == did).delete()
-        
-        # Add new tags
-        for tag_name in tags:
-            # Get or create category
-            category = db.query(Category).filter(Category.name == tag_name).first()
-            if not category:
-                category = Category(
-                    oid=str(uuid.uuid4()),
-                    name=tag_name
-                )
-                db.add(category)
-                db.flush()
-            
-            # Create hashtag relationship
-            hashtag = Hashtag(did=did, oid=category.oid)
-            db.add(hashtag)
+        removed_oids = [oid for (oid,) in db.execute(delete(Hashtag).where(Hashtag.did == did).returning(Hashtag.oid))]
         
+        # Duplicate names would collide on the (did, oid) primary key
+        names = list(dict.fromkeys(tags))
+        added_oids = []
+        if names:
+            for attempt in range(2):
+                oids = CategoryService.get_or_create_oids(db, names)
+                added_oids = [oids[name] for name in names]
+                try:
+                    # Savepoint: a failed insert must not undo the caller's pending changes
+                    with db.begin_nested():
+                        db.execute(insert(Hashtag), [{"did": did, "oid": oid} for oid in added_oids])
+                    break
+                except IntegrityError:
+                    # A cached category was deleted by another process: forget the names and resolve them again
+                    for name in names:
+                        invalidate_category_cache(name)
+                    if attempt:
+                        raise
+        
+        StatsService.on_tags_changed(db, removed_oids, added_oids)
         db.commit()
     
     @staticmethod
     def get_tags(db: Session, did: str) -> List[str]:
         """Get document tags"""
-        hashtags = db.query(Hashtag).filter(Hashtag.did == did).all()
-        tags = []
-        for hashtag in hashtags:
-            category = db.query(Category).filter(Category.oid == hashtag.oid).first()
-            if category:
-                tags.append(category.name)
-        return tags
+        rows = db.query(Category.name).join(Hashtag, Hashtag.oid == Category.oid).filter(Hashtag.did == did).all()
+        return [name for (name,) in rows]
+    
+    @staticmethod
+    def parse_fields(fields: Optional[str], default: FrozenSet[str] = DEFAULT_DOCUMENT_FIELDS) -> FrozenSet[str]:
+        """Parse a comma-separated `fields` parameter (`default` when absent); raises ValueError on unknown names"""
+        if not fields:
+            return default
+        requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+        unknown = requested - set(DOCUMENT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return requested
+    
+    @staticmethod
+    def list_columns(fields: Iterable[str]) -> list:
+        """Columns to SELECT for `fields`, plus the keys enrichment needs"""
+        names = {"did"} | set(fields)
+        if "author_name" in names:
+            names.add("uid")
+        if "approver_name" in names:
+            names.add("approved_by")
+        return [getattr(Document, name) for name in DOCUMENT_COLUMNS if name in names]
+    
+    @staticmethod
+    def enrich(db: Session, rows: list, fields: FrozenSet[str], viewer_uid: Optional[str] = None) -> List[dict]:
+        """
+        Build response dicts holding `did` and the requested `fields` for rows
+        selected with list_columns(). Each enrichment costs one query for the
+        whole page and is skipped when not requested.
+        """
+        dids = [row.did for row in rows]
+        if not dids:
+            return []
+        
+        user_names = {}
+        user_ids = set()
+        if "author_name" in fields:
+            user_ids.update(row.uid for row in rows)
+        if "approver_name" in fields:
+            user_ids.update(row.approved_by for row in rows if row.approved_by)
+        if user_ids:
+            user_names = dict(db.query(User.uid, User.name).filter(User.uid.in_(user_ids)))
+        
+        tags = defaultdict(list)
+        if "tags" in fields:
+            for did, name in db.query(Hashtag.did, Category.name).join(
+                Category, Category.oid == Hashtag.oid
+            ).filter(Hashtag.did.in_(dids)):
+                tags[did].append(name)
+        
+        stars_counts = {}
+        if "stars_count" in fields:
+            stars_counts = dict(db.query(StarredDocument.did, func.count()).filter(
+                StarredDocument.did.in_(dids)
+            ).group_by(StarredDocument.did))
+        
+        comments_counts = {}
+        if "comments_count" in fields:
+            comments_counts = dict(db.query(Comment.did, func.count()).filter(
+                Comment.did.in_(dids)
+            ).group_by(Comment.did))
+        
+        starred = set()
+        if "is_starred" in fields and viewer_uid:
+            starred = {did for (did,) in db.query(StarredDocument.did).filter(
+                StarredDocument.uid == viewer_uid,
+                StarredDocument.did.in_(dids)
+            )}
+        
+        result = []
+        for row in rows:
+            item = {name: getattr(row, name) for name in DOCUMENT_COLUMNS if name == "did" or name in fields}
+            if "author_name" in fields:
+                item["author_name"] = user_names.get(row.uid)
+            if "approver_name" in fields:
+                item["approver_name"] = user_names.get(row.approved_by)
+            if "tags" in fields:
+                item["tags"] = tags[row.did]
+            if "stars_count" in fields:
+                item["stars_count"] = stars_counts.get(row.did, 0)
+            if "comments_count" in fields:
+                item["comments_count"] = comments_counts.get(row.did, 0)
+            if "is_starred" in fields:
+                item["is_starred"] = row.did in starred
+            result.append(item)
+        return result
@@ -0,0 +1,119 @@
+import hashlib
+import time
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.document import Document
+from app.models.hashtag import Hashtag
+from app.models.permission import UserCategoryAccess
+from app.models.role import user_role, access_permission
+
+# uid -> (version, loaded_at, oids). Bumping the version drops every entry at once;
+# the TTL bounds how long other worker processes can serve a stale set.
+_access_cache: Dict[str, Tuple[int, float, FrozenSet[str]]] = {}
+_access_cache_lock = Lock()
+_access_version = 0
+
+
+def invalidate_permission_cache(uids: Optional[Iterable[str]] = None):
+    """Forget cached access sets of some users, or of everyone"""
+    global _access_version
+    with _access_cache_lock:
+        if uids is None:
+            _access_version += 1
+            _access_cache.clear()
+        else:
+            for uid in uids:
+                _access_cache.pop(uid, None)
+
+
+class PermissionService:
+    """
+    Per-user accessible categories, materialized in user_category_access from
+    user_role x access_permission so reads are one indexed lookup (or a cache hit).
+    """
+
+    @staticmethod
+    def _grants(uid_filter=None):
+        """SELECT of (uid, oid) pairs granted through roles"""
+        query = (
+            select(user_role.c.uid, access_permission.c.oid)
+            .join(access_permission, access_permission.c.rid == user_role.c.rid)
+            .distinct()
+        )
+        if uid_filter is not None:
+            query = query.where(uid_filter)
+        return query
+
+    @staticmethod
+    def _refresh(db: Session, uids):
+        """Replace the access rows of `uids` (a list or a SELECT of uids)"""
+        db.execute(delete(UserCategoryAccess).where(UserCategoryAccess.uid.in_(uids)))
+        db.execute(insert(UserCategoryAccess).from_select(
+            ["uid", "oid"], PermissionService._grants(user_role.c.uid.in_(uids))
+        ))
+
+    @staticmethod
+    def refresh_users(db: Session, uids: Iterable[str]):
+        """Recompute the access rows of some users after their roles changed. Caller commits."""
+        uids = list(uids)
+        if uids:
+            PermissionService._refresh(db, uids)
+
+    @staticmethod
+    def refresh_role(db: Session, rid: str):
+        """Recompute the access rows of every holder of a role after its permissions changed. Caller commits."""
+        holders = user_role.alias()
+        PermissionService._refresh(db, select(holders.c.uid).where(holders.c.rid == rid))
+
+    @staticmethod
+    def rebuild(db: Session):
+        """Recompute the whole matrix"""
+        db.execute(delete(UserCategoryAccess))
+        db.execute(insert(UserCategoryAccess).from_select(["uid", "oid"], PermissionService._grants()))
+        db.commit()
+        invalidate_permission_cache()
+
+    @staticmethod
+    def accessible_category_ids(db: Session, uid: str) -> FrozenSet[str]:
+        """Categories a user can access through any of their roles"""
+        now = time.monotonic()
+        with _access_cache_lock:
+            version = _access_version
+            entry = _access_cache.get(uid)
+        if entry and entry[0] == version and now - entry[1] < settings.PERMISSION_CACHE_TTL_SECONDS:
+            return entry[2]
+
+        oids = frozenset(
+            oid for (oid,) in db.query(UserCategoryAccess.oid).filter(UserCategoryAccess.uid == uid)
+        )
+        with _access_cache_lock:
+            # Skip storing if an invalidation happened while we were reading
+            if _access_version == version:
+                _access_cache[uid] = (version, now, oids)
+        return oids
+
+    @staticmethod
+    def can_access(db: Session, uid: str, oid: str) -> bool:
+        return oid in PermissionService.accessible_category_ids(db, uid)
+
+    @staticmethod
+    def access_key(db: Session, uid: str) -> str:
+        """Short fingerprint of a user's access set; users with equal sets share cached listings"""
+        oids = PermissionService.accessible_category_ids(db, uid)
+        return hashlib.sha1(",".join(sorted(oids)).encode()).hexdigest()[:12]
+
+    @staticmethod
+    def category_filter(uid: str):
+        """
+        Filter clause keeping documents that are untagged or carry at least one category
+        the user can access - a semi-join through hashtag against the materialized matrix.
+        """
+        tagged = select(Hashtag.did).where(Hashtag.did == Document.did)
+        accessible = tagged.join(
+            UserCategoryAccess,
+            (UserCategoryAccess.oid == Hashtag.oid) & (UserCategoryAccess.uid == uid)
+        )
+        return ~exists(tagged) | exists(accessible)
@@ -0,0 +1,265 @@
+"""
+Post-upload processing: text extraction, page counts and first-page thumbnails.
+
+Uploads only enqueue a job (a file_processing row) and return. A dispatcher
+claims queued jobs from the database and runs them on a process pool, at most
+`workers` at a time; results are written back to the same row and the extracted
+text is folded into the search index of every document linking to the file.
+The dispatcher runs inside the API (PROCESSING_WORKERS > 0) or standalone
+(python -m app.scripts.process_uploads). A job that runs longer than
+PROCESSING_JOB_TIMEOUT_SECONDS (e.g. a parser hung on a malformed PDF) is
+killed together with its pool and counts as a failed attempt; jobs left
+`running` by a crashed dispatcher are picked up again after that long. Either
+way a job is given up after PROCESSING_MAX_ATTEMPTS.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Collection, Dict, List, Optional, Tuple
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import SessionLocal, dialect_insert
+from app.models.blob import Blob
+from app.models.document import Document
+from app.models.file_processing import FileProcessing
+from app.services.blob_service import BlobService
+from app.services.search_service import SearchService
+from app.utils.file_extract import process_file
+from app.utils.metrics import metrics
+
+QUEUED, RUNNING, DONE, FAILED = 0, 1, 2, 3
+STATUS_NAMES = {QUEUED: "queued", RUNNING: "running", DONE: "done", FAILED: "failed"}
+
+metrics.describe("dochub_processing_jobs_total", "counter", "Post-upload processing jobs finished, by result")
+metrics.describe("dochub_processing_seconds_total", "counter", "Time spent in post-upload processing jobs")
+
+
+class ProcessingService:
+    @staticmethod
+    def enqueue(db: Session, sha256: str):
+        """Queue processing of a stored blob (no-op if it already has a job)"""
+        db.execute(
+            dialect_insert(db)(FileProcessing)
+            .values(hash=sha256, status=QUEUED, attempts=0, created_at=datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=["hash"])
+        )
+        db.commit()
+
+    @staticmethod
+    def enqueue_missing(db: Session) -> int:
+        """Queue every blob that has never been processed (backfill)"""
+        missing = select(Blob.hash, literal(datetime.utcnow())).where(
+            ~select(FileProcessing.hash).where(FileProcessing.hash == Blob.hash).exists()
+        )
+        result = db.execute(insert(FileProcessing).from_select(["hash", "created_at"], missing))
+        db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def retry_failed(db: Session) -> int:
+        """Put failed jobs back in the queue with a fresh attempt budget"""
+        count = db.query(FileProcessing).filter(FileProcessing.status == FAILED).update(
+            {FileProcessing.status: QUEUED, FileProcessing.attempts: 0}, synchronize_session=False
+        )
+        db.commit()
+        return count
+
+    @staticmethod
+    def get_for_link(db: Session, link: str) -> Optional[FileProcessing]:
+        """Processing state of the blob a document links to"""
+        return db.query(FileProcessing).join(Blob, Blob.hash == FileProcessing.hash).filter(Blob.path == link).first()
+
+    @staticmethod
+    def claim(db: Session, limit: int, exclude: Collection[str] = ()) -> List[Tuple[str, str]]:
+        """
+        Mark up to `limit` of the oldest runnable jobs as running; returns (hash, path) pairs.
+        `exclude` lists jobs the caller is still running, which are never reclaimed as stale.
+        """
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.PROCESSING_JOB_TIMEOUT_SECONDS)
+        lost = (FileProcessing.status == RUNNING) & (FileProcessing.started_at < stale)
+        if exclude:
+            lost &= FileProcessing.hash.not_in(exclude)
+        # Lost jobs out of attempts are given up instead of being retried forever
+        db.query(FileProcessing).filter(lost, FileProcessing.attempts >= settings.PROCESSING_MAX_ATTEMPTS).update(
+            {
+                FileProcessing.status: FAILED,
+                FileProcessing.error: "Lost or timed out on every attempt",
+                FileProcessing.finished_at: now,
+            },
+            synchronize_session=False
+        )
+        query = db.query(FileProcessing.hash, Blob.path).join(Blob, Blob.hash == FileProcessing.hash).filter(
+            (FileProcessing.status == QUEUED)
+            | (lost & (FileProcessing.attempts < settings.PROCESSING_MAX_ATTEMPTS))
+        ).order_by(FileProcessing.created_at).limit(limit)
+        if db.get_bind().dialect.name == "postgresql":
+            # Several dispatchers can poll the same queue without taking the same job
+            query = query.with_for_update(of=FileProcessing, skip_locked=True)
+        jobs = [(sha256, path) for sha256, path in query]
+        if jobs:
+            db.query(FileProcessing).filter(FileProcessing.hash.in_([sha256 for sha256, _ in jobs])).update(
+                {
+                    FileProcessing.status: RUNNING,
+                    FileProcessing.started_at: now,
+                    FileProcessing.attempts: FileProcessing.attempts + 1,
+                },
+                synchronize_session=False
+            )
+        db.commit()
+        return jobs
+
+    @staticmethod
+    def complete(db: Session, sha256: str, result: dict):
+        """Store a job's results and reindex the documents that link to the file"""
+        db.query(FileProcessing).filter(FileProcessing.hash == sha256).update(
+            {
+                FileProcessing.status: DONE,
+                FileProcessing.page_count: result["page_count"],
+                FileProcessing.text_content: result["text"],
+                FileProcessing.thumbnail_path: result["thumbnail"],
+                FileProcessing.error: None,
+                FileProcessing.finished_at: datetime.utcnow(),
+            },
+            synchronize_session=False
+        )
+        linked = db.query(Document.did).join(Blob, Blob.path == Document.link).filter(Blob.hash == sha256)
+        for (did,) in linked.all():
+            SearchService.index_document(db, did)
+        db.commit()
+
+    @staticmethod
+    def fail(db: Session, sha256: str, error: str):
+        """Record a failed attempt; the job is retried until PROCESSING_MAX_ATTEMPTS"""
+        job = db.query(FileProcessing).filter(FileProcessing.hash == sha256).first()
+        if job is None:
+            return
+        job.status = QUEUED if job.attempts < settings.PROCESSING_MAX_ATTEMPTS else FAILED
+        job.error = error[:2000]
+        job.finished_at = datetime.utcnow()
+        db.commit()
+
+    @staticmethod
+    def release(db: Session, hashes: List[str]):
+        """Queue running jobs again without using up an attempt (interrupted through no fault of their own)"""
+        if not hashes:
+            return
+        db.query(FileProcessing).filter(FileProcessing.hash.in_(hashes), FileProcessing.status == RUNNING).update(
+            {FileProcessing.status: QUEUED, FileProcessing.attempts: FileProcessing.attempts - 1},
+            synchronize_session=False
+        )
+        db.commit()
+
+
+def _claim(limit: int, exclude: Collection[str]) -> List[Tuple[str, str]]:
+    db = SessionLocal()
+    try:
+        return ProcessingService.claim(db, limit, exclude)
+    finally:
+        db.close()
+
+
+def _record(sha256: str, future: Future):
+    db = SessionLocal()
+    try:
+        error = future.exception()
+        if error is None:
+            ProcessingService.complete(db, sha256, future.result())
+            metrics.inc("dochub_processing_jobs_total", result="done")
+        else:
+            ProcessingService.fail(db, sha256, f"{type(error).__name__}: {error}")
+            metrics.inc("dochub_processing_jobs_total", result="error")
+            print(f"❌ Processing {sha256[:12]} failed: {error}")
+    finally:
+        db.close()
+
+
+def _abort(timed_out: List[str], interrupted: List[str]):
+    db = SessionLocal()
+    try:
+        for sha256 in timed_out:
+            ProcessingService.fail(db, sha256, f"TimeoutError: no result after {settings.PROCESSING_JOB_TIMEOUT_SECONDS}s")
+            metrics.inc("dochub_processing_jobs_total", result="timeout")
+            print(f"❌ Processing {sha256[:12]} timed out")
+        ProcessingService.release(db, interrupted)
+    finally:
+        db.close()
+
+
+def _new_executor(workers: int) -> ProcessPoolExecutor:
+    # spawn: forking a process that already runs server threads is unsafe
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _kill_executor(executor: ProcessPoolExecutor):
+    """Shut a pool down and terminate its processes, stopping tasks that would never return"""
+    # The executor has no public way to stop a running task; _processes holds its workers
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+async def file_processing_worker(workers: int = settings.PROCESSING_WORKERS):
+    """Background task: keep up to `workers` processing jobs running on a process pool"""
+    loop = asyncio.get_running_loop()
+    executor = _new_executor(workers)
+    in_flight: Dict[asyncio.Future, Tuple[str, float]] = {}
+    try:
+        while True:
+            free = workers - len(in_flight)
+            if free > 0:
+                running = [sha256 for sha256, _ in in_flight.values()]
+                try:
+                    jobs = await run_in_threadpool(_claim, free, running)
+                except Exception as e:
+                    print(f"❌ Claiming processing jobs failed: {e}")
+                    jobs = []
+                for sha256, path in jobs:
+                    thumbnail = str(BlobService.thumbnail_path(sha256))
+                    future = loop.run_in_executor(executor, process_file, path, thumbnail)
+                    in_flight[future] = (sha256, loop.time())
+
+            if not in_flight:
+                await asyncio.sleep(settings.PROCESSING_POLL_SECONDS)
+                continue
+
+            done, _ = await asyncio.wait(
+                in_flight, timeout=settings.PROCESSING_POLL_SECONDS, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                sha256, started_at = in_flight.pop(future)
+                metrics.inc("dochub_processing_seconds_total", loop.time() - started_at)
+                try:
+                    await run_in_threadpool(_record, sha256, future)
+                except Exception as e:
+                    print(f"❌ Saving processing result of {sha256[:12]} failed: {e}")
+                if isinstance(future.exception(), BrokenProcessPool):
+                    # A worker died (e.g. a parser crashed on a malformed file); start a fresh pool
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = _new_executor(workers)
+
+            now = loop.time()
+            timed_out = [
+                sha256 for sha256, started_at in in_flight.values()
+                if now - started_at > settings.PROCESSING_JOB_TIMEOUT_SECONDS
+            ]
+            if timed_out:
+                # A hung parser only stops with its process: recycle the pool, requeueing the
+                # jobs that were running next to it without charging them an attempt
+                interrupted = [sha256 for sha256, _ in in_flight.values() if sha256 not in timed_out]
+                for future in in_flight:
+                    future.cancel()
+                in_flight.clear()
+                _kill_executor(executor)
+                executor = _new_executor(workers)
+                try:
+                    await run_in_threadpool(_abort, timed_out, interrupted)
+                except Exception as e:
+                    print(f"❌ Saving timed out processing jobs failed: {e}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
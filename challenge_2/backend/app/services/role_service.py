@@ -4,6 +4,8 @@ from app.models.user import User
 from app.models.category import Category
 from typing import List, Optional
 from uuid import uuid4
+from app.services.permission_service import PermissionService, invalidate_permission_cache
+from app.utils.cache import invalidate_all
 
 
 class RoleService:
@@ -40,8 +42,15 @@ class RoleService:
         role = db.query(Role).filter(Role.rid == rid).first()
         if not role:
             return False
+        holders = [uid for (uid,) in db.query(user_role.c.uid).filter(user_role.c.rid == rid)]
         db.delete(role)
+        # The session does not autoflush: the role and its memberships/grants must be
+        # gone (ON DELETE CASCADE) before the access rows are recomputed from them
+        db.flush()
+        PermissionService.refresh_users(db, holders)
         db.commit()
+        invalidate_permission_cache(holders)
+        invalidate_all()
         return True
 
     @staticmethod
@@ -60,7 +69,10 @@ class RoleService:
             if role:
                 db.execute(user_role.insert().values(uid=user_id, rid=rid))
         
+        PermissionService.refresh_users(db, [user_id])
         db.commit()
+        invalidate_permission_cache([user_id])
+        invalidate_all()
         return True
 
     @staticmethod
@@ -84,7 +96,10 @@ class RoleService:
             if category:
                 db.execute(access_permission.insert().values(rid=role_id, oid=oid))
         
+        PermissionService.refresh_role(db, role_id)
         db.commit()
+        invalidate_permission_cache()
+        invalidate_all()
         return True
 
     @staticmethod
@@ -95,12 +110,7 @@ class RoleService:
     @staticmethod
     def check_user_access_to_category(db: Session, user_id: str, category_id: str) -> bool:
         """Check if user has access to a specific category through any of their roles"""
-        user_roles = RoleService.get_user_roles(db, user_id)
-        for role in user_roles:
-            accessible_cats = RoleService.get_accessible_categories(db, role.rid)
-            if any(cat.oid == category_id for cat in accessible_cats):
-                return True
-        return False
+        return PermissionService.can_access(db, user_id, category_id)
 
     @staticmethod
     def is_admin(db: Session, user_id: str) -> bool:
@@ -0,0 +1,244 @@
+import base64
+import json
+import re
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import REAL, cast, func, literal, select, text, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.blob import Blob
+from app.models.document import Document
+from app.models.category import Category
+from app.models.file_processing import FileProcessing
+from app.models.hashtag import Hashtag
+
+# Field weights, mirroring setweight() A/B/D on PostgreSQL
+TITLE_WEIGHT = 1.0
+TAG_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+CONTENT_WEIGHT = 0.1
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value: str) -> List[str]:
+    """Lowercase word tokens (unicode aware, so Vietnamese text splits correctly)"""
+    return _TOKEN_RE.findall((value or "").lower())
+
+
+def encode_cursor(rank: float, did: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, did]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        rank, did = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), str(did)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+class InvertedIndex:
+    """
+    In-process fallback for databases without full-text search (SQLite in tests).
+    Each process keeps its own copy, so it is not meant for multi-worker deployments.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)  # token -> did -> score
+        self._doc_tokens: Dict[str, List[str]] = {}
+        self.built = False
+
+    def index(self, did: str, title: str, description: str, tags: List[str], content: Optional[str] = None):
+        scores: Dict[str, float] = defaultdict(float)
+        for token in tokenize(title):
+            scores[token] += TITLE_WEIGHT
+        for token in tokenize(" ".join(tags)):
+            scores[token] += TAG_WEIGHT
+        for token in tokenize(description):
+            scores[token] += DESCRIPTION_WEIGHT
+        for token in set(tokenize(content)):
+            scores[token] += CONTENT_WEIGHT
+
+        with self._lock:
+            self._remove_locked(did)
+            for token, score in scores.items():
+                self._postings[token][did] = score
+            self._doc_tokens[did] = list(scores)
+
+    def remove(self, did: str):
+        with self._lock:
+            self._remove_locked(did)
+
+    def _remove_locked(self, did: str):
+        for token in self._doc_tokens.pop(did, []):
+            self._postings[token].pop(did, None)
+            if not self._postings[token]:
+                del self._postings[token]
+
+    def search(self, q: str) -> Dict[str, float]:
+        """All query terms must match; rank is the summed weighted term frequency"""
+        terms = set(tokenize(q))
+        if not terms:
+            return {}
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            matches = set.intersection(*(set(p) for p in postings))
+            return {did: sum(p[did] for p in postings) for did in matches}
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._doc_tokens.clear()
+            self.built = False
+
+
+fallback_index = InvertedIndex()
+
+
+class SearchService:
+    @staticmethod
+    def is_native(db: Session) -> bool:
+        """Whether the database provides full-text search (PostgreSQL)"""
+        return db.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def _content():
+        """Text extracted from the document's file by post-upload processing ('' until it ran)"""
+        return (
+            select(func.coalesce(func.max(FileProcessing.text_content), ""))
+            .select_from(FileProcessing)
+            .join(Blob, Blob.hash == FileProcessing.hash)
+            .where(Blob.path == Document.link)
+            .correlate(Document)
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    def _search_vector():
+        """tsvector expression for a row of `documents`: title and tags weigh A, description B, file text D"""
+        config = cast(literal(settings.SEARCH_TEXT_CONFIG), REGCONFIG)
+        tag_names = (
+            select(func.coalesce(func.string_agg(Category.name, " "), ""))
+            .select_from(Hashtag)
+            .join(Category, Category.oid == Hashtag.oid)
+            .where(Hashtag.did == Document.did)
+            .correlate(Document)
+            .scalar_subquery()
+        )
+        return (
+            func.setweight(func.to_tsvector(config, Document.title), "A")
+            .op("||")(func.setweight(func.to_tsvector(config, tag_names), "A"))
+            .op("||")(func.setweight(func.to_tsvector(config, Document.description), "B"))
+            .op("||")(func.setweight(func.to_tsvector(config, SearchService._content()), "D"))
+        )
+
+    @staticmethod
+    def index_document(db: Session, did: str):
+        """Refresh the search entry of a document after it or its tags changed. Caller commits."""
+        db.flush()
+        if SearchService.is_native(db):
+            db.query(Document).filter(Document.did == did).update(
+                {Document.search_vector: SearchService._search_vector()},
+                synchronize_session=False
+            )
+        elif fallback_index.built:
+            document = db.query(
+                Document.title, Document.description, SearchService._content()
+            ).filter(Document.did == did).first()
+            if document:
+                from app.services.document_service import DocumentService
+                title, description, content = document
+                fallback_index.index(did, title, description, DocumentService.get_tags(db, did), content)
+
+    @staticmethod
+    def remove_document(did: str):
+        """Drop a deleted document from the fallback index"""
+        fallback_index.remove(did)
+
+    @staticmethod
+    def reindex_all(db: Session):
+        """Recompute every search entry (PostgreSQL backfill / fallback index build)"""
+        if SearchService.is_native(db):
+            db.query(Document).update(
+                {Document.search_vector: SearchService._search_vector()},
+                synchronize_session=False
+            )
+            db.commit()
+            return
+
+        fallback_index.clear()
+        tags: Dict[str, List[str]] = defaultdict(list)
+        for did, name in db.query(Hashtag.did, Category.name).join(Category, Category.oid == Hashtag.oid):
+            tags[did].append(name)
+        contents = dict(
+            db.query(Blob.path, FileProcessing.text_content)
+            .join(FileProcessing, FileProcessing.hash == Blob.hash)
+            .filter(FileProcessing.text_content.isnot(None))
+        )
+        for did, title, description, link in db.query(Document.did, Document.title, Document.description, Document.link):
+            fallback_index.index(did, title, description, tags[did], contents.get(link))
+        fallback_index.built = True
+
+    @staticmethod
+    def ensure_schema(db: Session):
+        """Add the search column and GIN index to databases created before search existed"""
+        if not SearchService.is_native(db):
+            return
+        db.execute(text("ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+        db.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_documents_search_vector ON documents USING gin (search_vector)"
+        ))
+        db.commit()
+        if db.query(Document.did).filter(Document.search_vector.is_(None)).first():
+            SearchService.reindex_all(db)
+
+    @staticmethod
+    def search(
+        db: Session,
+        q: str,
+        visibility,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Tuple[Document, float]], Optional[str]]:
+        """
+        Ranked search restricted by the `visibility` filter clause.
+        Keyset-paginated on (rank desc, did desc); returns (rows, next_cursor).
+        """
+        after = decode_cursor(cursor) if cursor else None
+
+        if SearchService.is_native(db):
+            tsquery = func.websearch_to_tsquery(cast(literal(settings.SEARCH_TEXT_CONFIG), REGCONFIG), q)
+            rank = func.ts_rank_cd(Document.search_vector, tsquery)
+            query = db.query(Document, rank.label("rank")).filter(
+                Document.search_vector.op("@@")(tsquery),
+                visibility
+            )
+            if after:
+                # ts_rank_cd returns float4; compare as float4 so the cursor value round-trips exactly
+                query = query.filter(tuple_(rank, Document.did) < tuple_(cast(after[0], REAL), after[1]))
+            rows = [(doc, float(r)) for doc, r in query.order_by(rank.desc(), Document.did.desc()).limit(limit + 1)]
+        else:
+            if not fallback_index.built:
+                SearchService.reindex_all(db)
+            ranks = fallback_index.search(q)
+            visible = {}
+            if ranks:
+                visible = {
+                    doc.did: doc
+                    for doc in db.query(Document).filter(Document.did.in_(ranks), visibility)
+                }
+            ordered = sorted(((ranks[did], did) for did in visible), reverse=True)
+            if after:
+                ordered = [key for key in ordered if key < after]
+            rows = [(visible[did], rank) for rank, did in ordered[:limit + 1]]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_doc, last_rank = rows[-1]
+            next_cursor = encode_cursor(last_rank, last_doc.did)
+        return rows, next_cursor
@@ -1,15 +1,22 @@
+from sqlalchemy import select, literal, delete, DateTime, String
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Dict, Optional
+from datetime import datetime
+from app.database import dialect_insert
 from app.models.starred_document import StarredDocument
 from app.models.document import Document
+from app.utils.cache import invalidate_document, invalidate_documents
+from app.utils.events import document_events, event_bus
 
 
 class StarredDocumentService:
     @staticmethod
-    def get_user_starred(db: Session, uid: str) -> List[Document]:
-        """Get all documents starred by a user"""
-        starred = db.query(StarredDocument).filter(StarredDocument.uid == uid).all()
-        return [db.query(Document).filter(Document.did == s.did).first() for s in starred]
+    def get_user_starred(db: Session, uid: str, columns: Optional[list] = None) -> List[Document]:
+        """Get all documents starred by a user (only `columns` when given)"""
+        query = db.query(*columns) if columns else db.query(Document)
+        return query.join(StarredDocument, StarredDocument.did == Document.did).filter(
+            StarredDocument.uid == uid
+        ).order_by(StarredDocument.created_at).all()
     
     @staticmethod
     def is_starred(db: Session, uid: str, did: str) -> bool:
@@ -34,6 +41,8 @@ class StarredDocumentService:
         starred = StarredDocument(uid=uid, did=did)
         db.add(starred)
         db.commit()
+        invalidate_document(did)
+        event_bus.publish(document_events(db, "document.starred", [did]))
         db.refresh(starred)
         return starred
     
@@ -50,8 +59,63 @@ class StarredDocumentService:
         
         db.delete(starred)
         db.commit()
+        invalidate_document(did)
+        event_bus.publish(document_events(db, "document.unstarred", [did]))
         return True
     
+    @staticmethod
+    def star_many(db: Session, uid: str, dids: List[str]) -> Dict[str, str]:
+        """
+        Star many documents with one INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+        Returns did -> "starred" | "already_starred" | "not_found".
+        """
+        dids = list(dict.fromkeys(dids))
+        source = select(
+            literal(uid, String),
+            Document.did,
+            literal(datetime.utcnow(), DateTime)
+        ).where(Document.did.in_(dids))
+        stmt = (
+            dialect_insert(db)(StarredDocument)
+            .from_select(["uid", "did", "created_at"], source)
+            .on_conflict_do_nothing()
+            .returning(StarredDocument.did)
+        )
+        starred = {did for (did,) in db.execute(stmt)}
+        
+        existing = set()
+        if len(starred) < len(dids):
+            remaining = [did for did in dids if did not in starred]
+            existing = {did for (did,) in db.query(Document.did).filter(Document.did.in_(remaining))}
+        db.commit()
+        invalidate_documents(starred)
+        event_bus.publish(document_events(db, "document.starred", starred))
+        
+        return {
+            did: "starred" if did in starred else ("already_starred" if did in existing else "not_found")
+            for did in dids
+        }
+    
+    @staticmethod
+    def unstar_many(db: Session, uid: str, dids: List[str]) -> Dict[str, str]:
+        """
+        Unstar many documents with one DELETE.
+        Returns did -> "unstarred" | "not_starred".
+        """
+        dids = list(dict.fromkeys(dids))
+        removed = {
+            did for (did,) in db.execute(
+                delete(StarredDocument)
+                .where(StarredDocument.uid == uid, StarredDocument.did.in_(dids))
+                .returning(StarredDocument.did)
+                .execution_options(synchronize_session=False)
+            )
+        }
+        db.commit()
+        invalidate_documents(removed)
+        event_bus.publish(document_events(db, "document.unstarred", removed))
+        return {did: "unstarred" if did in removed else "not_starred" for did in dids}
+    
     @staticmethod
     def get_star_count(db: Session, did: str) -> int:
         """Get the number of stars for a document"""
@@ -0,0 +1,255 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database import dialect_insert
+from app.models.category import Category
+from app.models.document import Document
+from app.models.hashtag import Hashtag
+from app.models.stats import StatsCounter, StatsDaily, StatsCategoryUsage
+from app.models.user import User
+
+USERS_TOTAL = "users_total"
+DOCUMENTS_CREATED = "documents_created"
+DOCUMENTS_APPROVED = "documents_approved"
+USERS_REGISTERED = "users_registered"
+
+
+def status_counter(status: int) -> str:
+    return f"documents_status_{status}"
+
+
+def _as_date(value) -> Optional[date]:
+    # func.date() yields a string on SQLite and a date on PostgreSQL
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def _approval_day(status: int, approved_at: Optional[datetime]) -> Optional[date]:
+    """Day a document counts towards the approvals timeline, if any"""
+    if status == 1 and approved_at is not None:
+        return approved_at.date()
+    return None
+
+
+class StatsService:
+    """
+    Incrementally maintained rollups behind /stats/overview.
+    Hooks are called by the services before they commit, so rollups change
+    in the same transaction as the rows they describe.
+    """
+
+    @staticmethod
+    def _bump_counters(db: Session, deltas: Dict[str, int]):
+        rows = [{"name": name, "value": delta} for name, delta in deltas.items() if delta]
+        if not rows:
+            return
+        stmt = dialect_insert(db)(StatsCounter).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"value": StatsCounter.value + stmt.excluded.value}
+        ))
+
+    @staticmethod
+    def _bump_daily(db: Session, deltas: Dict[Tuple[str, date], int]):
+        rows = [{"metric": metric, "day": day, "count": delta} for (metric, day), delta in deltas.items() if delta]
+        if not rows:
+            return
+        stmt = dialect_insert(db)(StatsDaily).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["metric", "day"],
+            set_={"count": StatsDaily.count + stmt.excluded.count}
+        ))
+
+    @staticmethod
+    def _bump_categories(db: Session, deltas: Dict[str, int]):
+        rows = [{"oid": oid, "count": delta} for oid, delta in deltas.items() if delta]
+        if not rows:
+            return
+        stmt = dialect_insert(db)(StatsCategoryUsage).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["oid"],
+            set_={"count": StatsCategoryUsage.count + stmt.excluded.count}
+        ))
+
+    # Hooks
+
+    @staticmethod
+    def on_document_created(db: Session, document: Document):
+        created_day = (document.created_at or datetime.utcnow()).date()
+        StatsService._bump_counters(db, {status_counter(document.status or 0): 1})
+        StatsService._bump_daily(db, {(DOCUMENTS_CREATED, created_day): 1})
+
+    @staticmethod
+    def on_document_changed(
+        db: Session,
+        old_status: int,
+        old_approved_at: Optional[datetime],
+        new_status: int,
+        new_approved_at: Optional[datetime],
+        count: int = 1
+    ):
+        """Status and/or approval time of `count` documents changed (approve, reject, edit)"""
+        if old_status != new_status:
+            StatsService._bump_counters(db, {
+                status_counter(old_status): -count,
+                status_counter(new_status): count
+            })
+        old_day = _approval_day(old_status, old_approved_at)
+        new_day = _approval_day(new_status, new_approved_at)
+        if old_day != new_day:
+            deltas = defaultdict(int)
+            if old_day:
+                deltas[(DOCUMENTS_APPROVED, old_day)] -= count
+            if new_day:
+                deltas[(DOCUMENTS_APPROVED, new_day)] += count
+            StatsService._bump_daily(db, deltas)
+
+    @staticmethod
+    def on_document_deleted(db: Session, document: Document):
+        StatsService._bump_counters(db, {status_counter(document.status): -1})
+        deltas = defaultdict(int)
+        if document.created_at:
+            deltas[(DOCUMENTS_CREATED, document.created_at.date())] -= 1
+        approval_day = _approval_day(document.status, document.approved_at)
+        if approval_day:
+            deltas[(DOCUMENTS_APPROVED, approval_day)] -= 1
+        StatsService._bump_daily(db, deltas)
+        oids = [oid for (oid,) in db.query(Hashtag.oid).filter(Hashtag.did == document.did)]
+        StatsService._bump_categories(db, {oid: -1 for oid in oids})
+
+    @staticmethod
+    def on_documents_deleted(db: Session, criterion):
+        """Set-based variant of on_document_deleted for every document matching `criterion`"""
+        status_rows = db.query(Document.status, func.count()).filter(criterion).group_by(Document.status).all()
+        if not status_rows:
+            return
+        StatsService._bump_counters(db, {status_counter(status): -n for status, n in status_rows})
+
+        deltas = defaultdict(int)
+        created_day = func.date(Document.created_at)
+        for day, n in db.query(created_day, func.count()).filter(criterion).group_by(created_day):
+            if day is not None:
+                deltas[(DOCUMENTS_CREATED, _as_date(day))] -= n
+        approved_day = func.date(Document.approved_at)
+        for day, n in db.query(approved_day, func.count()).filter(
+            criterion, Document.status == 1, Document.approved_at.isnot(None)
+        ).group_by(approved_day):
+            deltas[(DOCUMENTS_APPROVED, _as_date(day))] -= n
+        StatsService._bump_daily(db, deltas)
+
+        category_rows = db.query(Hashtag.oid, func.count()).join(
+            Document, Document.did == Hashtag.did
+        ).filter(criterion).group_by(Hashtag.oid).all()
+        StatsService._bump_categories(db, {oid: -n for oid, n in category_rows})
+
+    @staticmethod
+    def on_tags_changed(db: Session, removed_oids: Iterable[str], added_oids: Iterable[str]):
+        deltas = defaultdict(int)
+        for oid in removed_oids:
+            deltas[oid] -= 1
+        for oid in added_oids:
+            deltas[oid] += 1
+        StatsService._bump_categories(db, deltas)
+
+    @staticmethod
+    def on_category_deleted(db: Session, oid: str):
+        db.query(StatsCategoryUsage).filter(StatsCategoryUsage.oid == oid).delete(synchronize_session=False)
+
+    @staticmethod
+    def on_user_registered(db: Session, user: User):
+        StatsService.on_users_registered(db, user.created_at or datetime.utcnow(), 1)
+
+    @staticmethod
+    def on_users_registered(db: Session, registered_at: datetime, count: int):
+        """`count` users registered at the same time (bulk import)"""
+        StatsService._bump_counters(db, {USERS_TOTAL: count})
+        StatsService._bump_daily(db, {(USERS_REGISTERED, registered_at.date()): count})
+
+    @staticmethod
+    def on_user_deleted(db: Session, user: User):
+        StatsService._bump_counters(db, {USERS_TOTAL: -1})
+        if user.created_at:
+            StatsService._bump_daily(db, {(USERS_REGISTERED, user.created_at.date()): -1})
+        StatsService.on_documents_deleted(db, Document.uid == user.uid)
+
+    # Reads
+
+    @staticmethod
+    def get_counter(db: Session, name: str) -> int:
+        value = db.query(StatsCounter.value).filter(StatsCounter.name == name).scalar()
+        return value or 0
+
+    @staticmethod
+    def get_overview(db: Session, days: int = 30, top_categories: int = 5) -> dict:
+        """Dashboard numbers read straight from the rollup tables"""
+        counters = dict(db.query(StatsCounter.name, StatsCounter.value).all())
+        since = (datetime.utcnow() - timedelta(days=days)).date()
+
+        timelines = defaultdict(list)
+        for metric, day, count in db.query(StatsDaily.metric, StatsDaily.day, StatsDaily.count).filter(
+            StatsDaily.day >= since,
+            StatsDaily.count > 0
+        ).order_by(StatsDaily.day):
+            timelines[metric].append({"date": str(day), "count": count})
+
+        categories = db.query(Category.name, StatsCategoryUsage.count).join(
+            Category, Category.oid == StatsCategoryUsage.oid
+        ).filter(
+            StatsCategoryUsage.count > 0
+        ).order_by(StatsCategoryUsage.count.desc()).limit(top_categories).all()
+
+        return {
+            "users_total": counters.get(USERS_TOTAL, 0),
+            "status_counts": {status: counters.get(status_counter(status), 0) for status in (0, 1, 2)},
+            "documents_over_time": timelines[DOCUMENTS_CREATED],
+            "users_over_time": timelines[USERS_REGISTERED],
+            "approvals_over_time": timelines[DOCUMENTS_APPROVED],
+            "category_distribution": [{"name": name, "count": count} for name, count in categories],
+        }
+
+    # Maintenance
+
+    @staticmethod
+    def is_empty(db: Session) -> bool:
+        return db.query(StatsCounter.name).first() is None
+
+    @staticmethod
+    def rebuild(db: Session):
+        """Recompute every rollup from the source tables"""
+        db.query(StatsCounter).delete(synchronize_session=False)
+        db.query(StatsDaily).delete(synchronize_session=False)
+        db.query(StatsCategoryUsage).delete(synchronize_session=False)
+
+        counters = {USERS_TOTAL: db.query(func.count(User.uid)).scalar()}
+        for status in (0, 1, 2):
+            counters[status_counter(status)] = 0
+        for status, n in db.query(Document.status, func.count()).group_by(Document.status):
+            counters[status_counter(status)] = n
+        db.add_all(StatsCounter(name=name, value=value) for name, value in counters.items())
+
+        daily = []
+        for metric, column, extra in (
+            (DOCUMENTS_CREATED, Document.created_at, None),
+            (USERS_REGISTERED, User.created_at, None),
+            (DOCUMENTS_APPROVED, Document.approved_at, Document.status == 1),
+        ):
+            day = func.date(column)
+            query = db.query(day, func.count()).filter(column.isnot(None))
+            if extra is not None:
+                query = query.filter(extra)
+            for value, n in query.group_by(day):
+                daily.append(StatsDaily(metric=metric, day=_as_date(value), count=n))
+        db.add_all(daily)
+
+        db.add_all(
+            StatsCategoryUsage(oid=oid, count=n)
+            for oid, n in db.query(Hashtag.oid, func.count()).group_by(Hashtag.oid)
+        )
+        db.commit()
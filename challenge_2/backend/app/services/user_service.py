@@ -2,8 +2,14 @@ from sqlalchemy.orm import Session
 from typing import Optional
 import uuid
 from app.models.user import User
+from app.models.document import Document
 from app.schemas.user import UserCreate, UserUpdate
-from app.utils.auth import get_password_hash, verify_password
+from app.services.blob_service import BlobService
+from app.services.search_service import SearchService
+from app.services.stats_service import StatsService
+from app.utils.auth import needs_rehash
+from app.utils.cache import invalidate_all
+from app.utils.password_pool import PasswordPoolBusy, password_pool
 
 
 class UserService:
@@ -25,7 +31,7 @@ class UserService:
     @staticmethod
     def create(db: Session, user_create: UserCreate) -> User:
         """Create a new user"""
-        hashed_password = get_password_hash(user_create.password)
+        hashed_password = password_pool.hash(user_create.password)
         db_user = User(
             uid=str(uuid.uuid4()),
             name=user_create.name,
@@ -33,6 +39,7 @@ class UserService:
             password=hashed_password
         )
         db.add(db_user)
+        StatsService.on_user_registered(db, db_user)
         db.commit()
         db.refresh(db_user)
         return db_user
@@ -49,6 +56,8 @@ class UserService:
             setattr(db_user, field, value)
         
         db.commit()
+        # Author/approver names are embedded in cached document responses
+        invalidate_all()
         db.refresh(db_user)
         return db_user
     
@@ -59,8 +68,19 @@ class UserService:
         if not db_user:
             return False
         
+        # The user's documents go with them, so release their files
+        documents = db.query(Document.did, Document.link).filter(Document.uid == uid).all()
+        links = [link for _, link in documents]
+        BlobService.release_references(db, links)
+        StatsService.on_user_deleted(db, db_user)
+        
+        # One DELETE: documents, comments, stars, tags and role links cascade in the database
         db.delete(db_user)
         db.commit()
+        BlobService.schedule_file_cleanup(db, links)
+        for did, _ in documents:
+            SearchService.remove_document(did)
+        invalidate_all()
         return True
     
     @staticmethod
@@ -69,6 +89,14 @@ class UserService:
         user = UserService.get_by_email(db, email)
         if not user:
             return None
-        if not verify_password(password, user.password):
+        if not password_pool.verify(password, user.password):
             return None
+        
+        if needs_rehash(user.password):
+            # The cost factor changed - upgrade the hash while the plain password is at hand
+            try:
+                user.password = password_pool.hash(password)
+                db.commit()
+            except PasswordPoolBusy:
+                pass
         return user
@@ -0,0 +1,196 @@
+"""
+Read-through response cache with generation-based invalidation.
+
+Entries are never deleted by key. Each key embeds the current generation of
+the scopes it depends on (e.g. `doc:<did>`, `lists`), and invalidating a
+scope bumps its generation, so stale entries simply stop being addressed and
+age out through TTL/LRU. This works the same for the in-process backend and
+for a shared key-value store.
+
+Keys also record whether the value was read from the primary or a replica. A
+replica may still be behind a write that already bumped a generation; its
+values must not be served to the writer, who reads from the primary.
+"""
+import pickle
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Iterable, Tuple
+from app.config import settings
+from app.database import current_engine, replica_router
+from app.utils.metrics import metrics
+from app.utils.singleflight import single_flight
+
+_MISSING = object()
+
+# Scope that every entry depends on - bumped for changes that may touch any response
+GLOBAL_SCOPE = "all"
+LISTS_SCOPE = "lists"
+
+
+def document_scope(did: str) -> str:
+    return f"doc:{did}"
+
+
+def viewer_class(db, uid: str, user_is_creator: bool) -> str:
+    """
+    Visibility class of a viewer: readers all see the same documents,
+    creators additionally see their own drafts so their class is per-user.
+    With category access control, readers are grouped by their access set.
+    """
+    if user_is_creator:
+        return f"creator:{uid}"
+    if settings.CATEGORY_ACCESS_CONTROL:
+        from app.services.permission_service import PermissionService
+        return f"reader:{PermissionService.access_key(db, uid)}"
+    return "reader"
+
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._counters: dict = {}
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counters(self, names: Iterable[str]) -> list:
+        with self._lock:
+            return [self._counters.get(name, 0) for name in names]
+
+    def incr(self, name: str):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class RedisCacheBackend:
+    """Shared backend for multi-worker deployments (requires the `redis` package)"""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any:
+        raw = self._client.get(f"cache:{key}")
+        return _MISSING if raw is None else pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int):
+        self._client.set(f"cache:{key}", pickle.dumps(value), ex=ttl)
+
+    def get_counters(self, names: Iterable[str]) -> list:
+        names = list(names)
+        return [int(v or 0) for v in self._client.mget([f"gen:{n}" for n in names])]
+
+    def incr(self, name: str):
+        self._client.incr(f"gen:{name}")
+
+    def clear(self):
+        for key in self._client.scan_iter("cache:*"):
+            self._client.delete(key)
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    def _key(self, parts: Tuple, scopes: Iterable[str]) -> str:
+        scopes = [GLOBAL_SCOPE, *scopes]
+        generations = self.backend.get_counters(scopes)
+        source = "primary" if current_engine() is replica_router.primary else "replica"
+        return ":".join(str(p) for p in parts) + "@" + ",".join(str(g) for g in generations) + "@" + source
+
+    def get_or_set(self, name: str, parts: Tuple, scopes: Iterable[str], compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value or compute, store and return it. Exceptions are not cached.
+        Concurrent misses of the same key (e.g. right after an invalidation) share one computation.
+        """
+        key = self._key((name, *parts), scopes)
+        value = self.backend.get(key)
+        if value is not _MISSING:
+            metrics.inc("dochub_response_cache_hits_total", cache=name)
+            return value
+        metrics.inc("dochub_response_cache_misses_total", cache=name)
+
+        def compute_and_store():
+            value = compute()
+            self.backend.set(key, value, self.ttl)
+            return value
+
+        return single_flight.do(name, key, compute_and_store)
+
+    def invalidate(self, *scopes: str):
+        for scope in scopes:
+            self.backend.incr(scope)
+
+
+def _create_backend():
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.RESPONSE_CACHE_URL)
+    return MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(_create_backend(), settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+def invalidate_document(did: str):
+    """A document or something shown with it (tags, stars, comments) changed"""
+    response_cache.invalidate(document_scope(did), LISTS_SCOPE)
+
+
+def invalidate_documents(dids: Iterable[str]):
+    response_cache.invalidate(*(document_scope(did) for did in dids), LISTS_SCOPE)
+
+
+def invalidate_lists():
+    """Document set changed (e.g. a new document) without touching existing entries"""
+    response_cache.invalidate(LISTS_SCOPE)
+
+
+def invalidate_all():
+    """Broad change such as a user rename or deletion"""
+    response_cache.invalidate(GLOBAL_SCOPE)
+
+
+metrics.describe("dochub_response_cache_hits_total", "counter", "Response cache hits per cache")
+metrics.describe("dochub_response_cache_misses_total", "counter", "Response cache misses per cache")
+metrics.describe("dochub_response_cache_hit_ratio", "gauge", "Response cache hit ratio per cache")
+
+
+def _collect_hit_ratio(registry):
+    for name in ("document", "document_list"):
+        hits = registry.get("dochub_response_cache_hits_total", cache=name)
+        misses = registry.get("dochub_response_cache_misses_total", cache=name)
+        if hits + misses:
+            registry.set("dochub_response_cache_hit_ratio", hits / (hits + misses), cache=name)
+
+
+metrics.add_collector(_collect_hit_ratio)
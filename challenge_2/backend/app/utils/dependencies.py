@@ -1,8 +1,10 @@
-from fastapi import Depends, HTTPException, status
+from typing import FrozenSet, Optional
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
+from app.services.document_service import DocumentService, DEFAULT_DOCUMENT_FIELDS, DOCUMENT_FIELDS
 from app.utils.auth import verify_token
 from app.utils.role_checker import is_admin, is_creator, is_approver, is_reader
 
@@ -81,3 +83,24 @@ def require_reader(
             detail="Reader access required"
         )
     return current_user
+
+
+def document_fields(default: FrozenSet[str] = DEFAULT_DOCUMENT_FIELDS):
+    """Dependency parsing the sparse fieldset of a document list request, `default` when not given"""
+    def get_document_fields(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Comma-separated subset of: {', '.join(DOCUMENT_FIELDS)}. `did` is always included."
+        )
+    ) -> FrozenSet[str]:
+        try:
+            return DocumentService.parse_fields(fields, default)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    return get_document_fields
+
+
+get_document_fields = document_fields()
@@ -0,0 +1,167 @@
+"""
+In-process pub/sub of document changes, streamed to clients as server-sent events.
+
+Services publish after they commit. Every open event stream is a subscriber
+with a bounded queue on the event loop and only receives the events its user
+may see. Events carry ids, not documents, so clients fetch what changed
+instead of re-polling whole pages. The last EVENT_HISTORY_SIZE events are kept
+so a reconnecting client resumes from its Last-Event-ID; when that is not
+possible (the gap is too old, the server restarted, the client fell behind)
+it gets a `resync` event and should reload its pages once.
+
+The bus lives in one process: with several API processes a client only hears
+about changes handled by the process it is connected to.
+"""
+import asyncio
+from collections import defaultdict, deque
+from threading import Lock
+from typing import Deque, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.document import Document
+from app.models.hashtag import Hashtag
+from app.utils.metrics import metrics
+
+RESYNC = "resync"
+
+metrics.describe("dochub_events_published_total", "counter", "Document change events published, by type")
+metrics.describe("dochub_event_resyncs_total", "counter", "Event streams told to resync, by reason")
+metrics.describe("dochub_event_subscribers", "gauge", "Open event streams")
+
+
+class DocumentEvent(NamedTuple):
+    type: str
+    did: str
+    status: int
+    author: str
+    oids: FrozenSet[str]  # Categories of the document, only loaded with CATEGORY_ACCESS_CONTROL
+    data: dict
+
+    def payload(self) -> dict:
+        return {"did": self.did, "status": self.status, **self.data}
+
+
+class Audience(NamedTuple):
+    """Who is listening; mirrors DocumentService.visibility_filter"""
+    uid: str
+    sees_all: bool  # Approvers follow every document, the approval queue included
+    oids: Optional[FrozenSet[str]]  # Accessible categories with CATEGORY_ACCESS_CONTROL, else None
+
+    def can_see(self, event: DocumentEvent) -> bool:
+        if self.sees_all or event.author == self.uid:
+            return True
+        if event.status != 1:
+            return False
+        return self.oids is None or not event.oids or not event.oids.isdisjoint(self.oids)
+
+
+class Subscription:
+    def __init__(self, audience: Audience, loop: asyncio.AbstractEventLoop):
+        self.audience = audience
+        self.loop = loop
+        self.queue: "asyncio.Queue[Tuple[int, DocumentEvent]]" = asyncio.Queue(settings.EVENT_QUEUE_SIZE)
+        self.resync = False
+
+    def _push(self, item: Tuple[int, DocumentEvent]):
+        # Runs on the subscriber's loop
+        if self.resync:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.resync = True
+            metrics.inc("dochub_event_resyncs_total", reason="overflow")
+
+    async def get(self) -> Tuple[Optional[int], str, dict]:
+        """Next (id, type, payload) for the client; a resync replaces whatever was queued"""
+        if not self.resync:
+            event_id, event = await self.queue.get()
+            if not self.resync:
+                return event_id, event.type, event.payload()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.resync = False
+        return None, RESYNC, {}
+
+
+class EventBus:
+    def __init__(self, history_size: int = settings.EVENT_HISTORY_SIZE):
+        self._lock = Lock()
+        self._last_id = 0
+        self._history: Deque[Tuple[int, DocumentEvent]] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+
+    def publish(self, events: Iterable[DocumentEvent]):
+        """Deliver events to every subscriber allowed to see them (callable from any thread)"""
+        with self._lock:
+            for event in events:
+                self._last_id += 1
+                item = (self._last_id, event)
+                self._history.append(item)
+                metrics.inc("dochub_events_published_total", type=event.type)
+                for subscription in self._subscribers:
+                    if subscription.audience.can_see(event):
+                        try:
+                            subscription.loop.call_soon_threadsafe(subscription._push, item)
+                        except RuntimeError:
+                            pass  # Loop closed during shutdown
+
+    def subscribe(self, audience: Audience, last_event_id: Optional[int] = None) -> Subscription:
+        """Register a stream on the running loop, replaying what it missed since `last_event_id`"""
+        subscription = Subscription(audience, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id is None:
+                return subscription
+            oldest = self._history[0][0] if self._history else self._last_id + 1
+            if last_event_id > self._last_id or last_event_id < oldest - 1:
+                subscription.resync = True
+                metrics.inc("dochub_event_resyncs_total", reason="history")
+                return subscription
+            for item in self._history:
+                if item[0] > last_event_id and audience.can_see(item[1]):
+                    subscription._push(item)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def skip(self):
+        """
+        Record that a change happened without building its event (nobody was listening).
+        Clients resuming from an earlier id get a resync instead of a replay with a hole.
+        """
+        with self._lock:
+            self._last_id += 1
+            self._history.clear()
+
+
+event_bus = EventBus()
+metrics.add_collector(lambda registry: registry.set("dochub_event_subscribers", event_bus.subscriber_count()))
+
+
+def document_events(db: Session, event_type: str, dids: Iterable[str], **data) -> List[DocumentEvent]:
+    """
+    Events for some documents, with what is needed to decide who may see them (call before
+    deleting). Returns nothing without querying while no stream is open.
+    """
+    dids = list(dids)
+    if not dids:
+        return []
+    if not event_bus.subscriber_count():
+        # No open stream: spare the write path the queries
+        event_bus.skip()
+        return []
+    rows = db.query(Document.did, Document.status, Document.uid).filter(Document.did.in_(dids)).all()
+    categories = defaultdict(set)
+    if settings.CATEGORY_ACCESS_CONTROL:
+        for did, oid in db.query(Hashtag.did, Hashtag.oid).filter(Hashtag.did.in_(dids)):
+            categories[did].add(oid)
+    return [
+        DocumentEvent(event_type, did, status, author, frozenset(categories[did]), data)
+        for did, status, author in rows
+    ]
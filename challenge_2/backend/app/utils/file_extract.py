@@ -0,0 +1,99 @@
+"""
+Text, page count and first-page thumbnail extraction for uploaded files.
+
+Runs inside processing worker processes, so it only depends on the standard
+library and the parsing packages: `pypdf` for PDF text and pages, and optionally
+PyMuPDF to render PDF thumbnails. DOCX files are read directly as the
+zip/XML they are. Legacy .doc files are not parsed.
+"""
+import re
+import zipfile
+from pathlib import Path
+from typing import Optional
+from xml.etree import ElementTree
+
+MAX_TEXT_CHARS = 200_000  # Enough for search; keeps rows and tsvectors bounded
+THUMBNAIL_WIDTH = 320
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_WHITESPACE_RE = re.compile(r"[ \t\r\f\v]+")
+
+
+def _clean(text: str) -> str:
+    lines = (_WHITESPACE_RE.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)[:MAX_TEXT_CHARS]
+
+
+def _extract_pdf(path: Path) -> dict:
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(path))
+    parts, length = [], 0
+    for page in reader.pages:
+        if length >= MAX_TEXT_CHARS:
+            break
+        text = page.extract_text() or ""
+        parts.append(text)
+        length += len(text)
+    return {"page_count": len(reader.pages), "text": _clean("\n".join(parts))}
+
+
+def _extract_docx(path: Path) -> dict:
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+        paragraphs = []
+        for paragraph in root.iter(f"{_WORD_NS}p"):
+            paragraphs.append("".join(node.text or "" for node in paragraph.iter(f"{_WORD_NS}t")))
+        # Word stores the page count it last laid out in the extended properties
+        page_count = None
+        if "docProps/app.xml" in archive.namelist():
+            match = re.search(rb"<Pages>(\d+)</Pages>", archive.read("docProps/app.xml"))
+            if match:
+                page_count = int(match.group(1))
+    return {"page_count": page_count, "text": _clean("\n".join(paragraphs))}
+
+
+def render_pdf_thumbnail(path: Path, target: Path) -> bool:
+    """Render the first page as PNG; False when PyMuPDF is not installed"""
+    try:
+        import pymupdf as fitz
+    except ImportError:
+        try:
+            import fitz  # PyMuPDF before 1.24
+        except ImportError:
+            return False
+    with fitz.open(str(path)) as pdf:
+        if pdf.page_count == 0:
+            return False
+        page = pdf[0]
+        zoom = THUMBNAIL_WIDTH / page.rect.width
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".part")
+        pixmap.save(str(tmp), output="png")
+        tmp.replace(target)
+    return True
+
+
+def process_file(path: str, thumbnail_path: str) -> dict:
+    """
+    Derive {"page_count", "text", "thumbnail"} from a stored file.
+    `thumbnail` is `thumbnail_path` when a thumbnail was written, else None.
+    """
+    source = Path(path)
+    suffix = source.suffix.lower()
+    if suffix == ".pdf":
+        result = _extract_pdf(source)
+        result["thumbnail"] = thumbnail_path if render_pdf_thumbnail(source, Path(thumbnail_path)) else None
+    elif suffix == ".docx":
+        result = _extract_docx(source)
+        result["thumbnail"] = None
+    else:
+        result = {"page_count": None, "text": None, "thumbnail": None}
+    return result
+
+
+def excerpt(text: Optional[str], length: int = 500) -> Optional[str]:
+    if text is None:
+        return None
+    return text if len(text) <= length else text[:length].rsplit(" ", 1)[0] + "…"
@@ -0,0 +1,160 @@
+"""
+File responses with validators (ETag / Last-Modified), conditional GET and byte ranges
+"""
+import hashlib
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@lru_cache(maxsize=1024)
+def _hash_file(path: str, mtime_ns: int, size: int) -> str:
+    # mtime/size are part of the cache key so a rewritten file is re-hashed
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_etag(path: Path, stat_result: os.stat_result) -> str:
+    """Strong ETag from the file content. Blob-store files are named by their SHA-256 already."""
+    if _SHA256_RE.match(path.stem):
+        return f'"{path.stem}"'
+    return f'"{_hash_file(str(path), stat_result.st_mtime_ns, stat_result.st_size)}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match comparison (weak comparison, `*` matches anything)"""
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _if_range_matches(header: str, etag: str) -> bool:
+    """
+    If-Range comparison: a single entity tag, compared strongly (a weak `W/` tag never
+    matches). Dates are not honoured, so the full representation is sent instead.
+    """
+    return header.strip() == etag
+
+
+def _not_modified_since(header: str, mtime: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(mtime) <= since
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `bytes=` range into inclusive (start, end).
+    Returns None when the header should be ignored (multiple or malformed ranges),
+    raises ValueError when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        # Suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        if size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+def _iter_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def conditional_file_response(
+    request: Request,
+    path: Path,
+    media_type: str,
+    headers: Dict[str, str],
+    cache_control: str,
+    stat_result: Optional[os.stat_result] = None
+) -> Response:
+    """
+    Serve `path` honouring If-None-Match / If-Modified-Since (304),
+    Range / If-Range (206 / 416) and attaching ETag, Last-Modified and Cache-Control.
+    Pass `stat_result` when the caller already stat'ed the file.
+    """
+    if stat_result is None:
+        stat_result = os.stat(path)
+    size = stat_result.st_size
+    etag = content_etag(path, stat_result)
+    validators = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+
+    # Conditional GET - If-None-Match takes precedence over If-Modified-Since
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=validators)
+    elif "if-modified-since" in request.headers:
+        if _not_modified_since(request.headers["if-modified-since"], stat_result.st_mtime):
+            return Response(status_code=304, headers=validators)
+
+    response_headers = {**headers, **validators}
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or _if_range_matches(if_range, etag)):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={**validators, "Content-Range": f"bytes */{size}"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            response_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response_headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                _iter_range(path, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers=response_headers
+            )
+
+    return FileResponse(
+        path=path,
+        media_type=media_type,
+        headers=response_headers,
+        stat_result=stat_result
+    )
@@ -0,0 +1,128 @@
+"""
+In-process metrics registry rendered in Prometheus text format
+"""
+from collections import defaultdict
+from threading import Lock
+from typing import Callable, Dict, List, Tuple
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = Lock()
+        self._meta: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._values: Dict[str, Dict[Tuple, float]] = defaultdict(dict)
+        self._collectors: List[Callable[["MetricsRegistry"], None]] = []
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        """Declare a metric as `counter` or `gauge`"""
+        self._meta[name] = (metric_type, help_text)
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """Increase a counter"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[name][key] = self._values[name].get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """Set a gauge"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[name][key] = value
+
+    def set_max(self, name: str, value: float, **labels):
+        """Set a gauge if `value` is larger than the current one"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            if value > self._values[name].get(key, 0.0):
+                self._values[name][key] = value
+
+    def get(self, name: str, **labels) -> float:
+        """Get the current value of a metric"""
+        return self._values[name].get(tuple(sorted(labels.items())), 0.0)
+
+    def add_collector(self, collector: Callable[["MetricsRegistry"], None]):
+        """Register a callback that refreshes gauges right before rendering"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format"""
+        for collector in self._collectors:
+            collector(self)
+
+        lines = []
+        with self._lock:
+            for name in sorted(self._values):
+                metric_type, help_text = self._meta.get(name, ("untyped", ""))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for key, value in self._values[name].items():
+                    if key:
+                        label_str = ",".join(
+                            f'{k}="{_escape(str(v))}"' for k, v in key
+                        )
+                        lines.append(f"{name}{{{label_str}}} {value}")
+                    else:
+                        lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+metrics.describe("dochub_http_requests_total", "counter", "HTTP requests served per endpoint")
+metrics.describe("dochub_http_request_seconds_total", "counter", "Total time spent serving requests per endpoint")
+metrics.describe("dochub_db_queries_total", "counter", "SQL statements executed per endpoint")
+metrics.describe("dochub_db_query_seconds_total", "counter", "Total SQL execution time per endpoint")
+metrics.describe("dochub_db_slowest_query_seconds", "gauge", "Slowest single SQL statement seen per endpoint")
+metrics.describe("dochub_db_max_queries_per_request", "gauge", "Highest statement count of a single request per endpoint")
+metrics.describe("dochub_db_pool_checkouts_total", "counter", "Connections checked out from the pool")
+metrics.describe("dochub_db_pool_checkins_total", "counter", "Connections returned to the pool")
+metrics.describe("dochub_db_pool_connects_total", "counter", "New DBAPI connections opened by the pool")
+metrics.describe("dochub_db_pool_checked_out", "gauge", "Connections currently checked out")
+metrics.describe("dochub_db_pool_size", "gauge", "Configured pool size")
+metrics.describe("dochub_db_pool_overflow", "gauge", "Current pool overflow")
+metrics.describe("dochub_db_routed_requests_total", "counter", "Requests whose sessions were bound to the primary or a replica")
+metrics.describe("dochub_db_replica_healthy", "gauge", "1 while a read replica receives traffic")
+metrics.describe("dochub_db_replica_lag_seconds", "gauge", "Replication lag measured by the last health check")
+
+
+def _collect_pool_stats(registry: MetricsRegistry):
+    from app.database import get_pool_status
+
+    status = get_pool_status()
+    registry.set("dochub_db_pool_checkouts_total", status["checkouts_total"])
+    registry.set("dochub_db_pool_checkins_total", status["checkins_total"])
+    registry.set("dochub_db_pool_connects_total", status["connects_total"])
+    if "checked_out" in status:
+        registry.set("dochub_db_pool_checked_out", status["checked_out"])
+        registry.set("dochub_db_pool_size", status["size"])
+        registry.set("dochub_db_pool_overflow", status["overflow"])
+
+
+
+def _collect_replica_stats(registry: MetricsRegistry):
+    from app.database import replica_router
+
+    for replica in replica_router.status():
+        registry.set("dochub_db_replica_healthy", 1 if replica["healthy"] else 0, replica=replica["replica"])
+        if replica["lag_seconds"] is not None:
+            registry.set("dochub_db_replica_lag_seconds", replica["lag_seconds"], replica=replica["replica"])
+
+
+metrics.add_collector(_collect_pool_stats)
+metrics.add_collector(_collect_replica_stats)
+
+
+def record_request(endpoint: str, method: str, elapsed: float, query_stats):
+    """Aggregate one served request into the registry"""
+    labels = {"endpoint": endpoint, "method": method}
+    metrics.inc("dochub_http_requests_total", **labels)
+    metrics.inc("dochub_http_request_seconds_total", elapsed, **labels)
+    if query_stats is not None:
+        metrics.inc("dochub_db_queries_total", query_stats.count, **labels)
+        metrics.inc("dochub_db_query_seconds_total", query_stats.total_time, **labels)
+        metrics.set_max("dochub_db_slowest_query_seconds", query_stats.slowest_time, **labels)
+        metrics.set_max("dochub_db_max_queries_per_request", query_stats.count, **labels)
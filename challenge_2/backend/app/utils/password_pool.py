@@ -0,0 +1,96 @@
+"""
+Bounded process pool for bcrypt work.
+
+Hashing is CPU-bound and deliberately slow, so running it on the request
+threadpool lets a login storm starve every other endpoint. Jobs are sent to a
+small dedicated process pool instead; once `max_pending` jobs are queued or
+running, new ones are rejected with PasswordPoolBusy (served as 503) rather
+than piling up.
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Optional
+from app.config import settings
+from app.utils.auth import get_password_hash, verify_password
+from app.utils.metrics import metrics
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password pool is saturated"""
+
+
+class PasswordPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = Lock()
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs server threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _run(self, operation: str, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                metrics.inc("dochub_password_hash_rejected_total", operation=operation)
+                raise PasswordPoolBusy("Password hashing is saturated, retry shortly")
+            self._pending += 1
+
+        started = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                return fn(*args)
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._pending -= 1
+            metrics.inc("dochub_password_hash_operations_total", operation=operation)
+            metrics.inc("dochub_password_hash_seconds_total", elapsed, operation=operation)
+            metrics.set_max("dochub_password_hash_slowest_seconds", elapsed, operation=operation)
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured cost factor"""
+        return self._run("hash", get_password_hash, password, settings.BCRYPT_ROUNDS)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash"""
+        return self._run("verify", verify_password, password, hashed_password)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+metrics.describe("dochub_password_hash_operations_total", "counter", "Password hash/verify jobs completed")
+metrics.describe("dochub_password_hash_seconds_total", "counter", "Total time of password jobs including queueing")
+metrics.describe("dochub_password_hash_slowest_seconds", "gauge", "Slowest single password job")
+metrics.describe("dochub_password_hash_rejected_total", "counter", "Password jobs rejected because the pool was full")
+metrics.describe("dochub_password_hash_queue_depth", "gauge", "Password jobs currently queued or running")
+metrics.describe("dochub_password_hash_queue_limit", "gauge", "Maximum password jobs queued or running")
+
+
+def _collect_queue_depth(registry):
+    registry.set("dochub_password_hash_queue_depth", password_pool.pending)
+    registry.set("dochub_password_hash_queue_limit", password_pool.max_pending)
+
+
+metrics.add_collector(_collect_queue_depth)
@@ -0,0 +1,60 @@
+"""
+Request coalescing: concurrent calls with the same key share one execution.
+
+The first caller of a key runs the function; callers arriving while it runs
+wait for it and get the same result (or the same exception). Nothing is kept
+once the call returns, so this only flattens bursts of identical work and
+never serves anything older than an in-flight computation. Keys must include
+everything the result depends on (e.g. the viewer's visibility class), and
+results are shared between threads so they must not be ORM objects bound to
+the leader's session.
+"""
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+from app.utils.metrics import metrics
+
+metrics.describe("dochub_coalesced_requests_total", "counter", "Calls that waited for an identical in-flight call instead of running")
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, name: str, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run `fn` unless an identical call (same name and key) is in flight, then share its outcome"""
+        with self._lock:
+            call = self._calls.get((name, key))
+            leader = call is None
+            if leader:
+                call = self._calls[(name, key)] = _Call()
+
+        if not leader:
+            metrics.inc("dochub_coalesced_requests_total", call=name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[(name, key)]
+            call.done.set()
+        return call.value
+
+
+single_flight = SingleFlight()
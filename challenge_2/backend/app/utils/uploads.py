@@ -0,0 +1,60 @@
+"""
+Streaming upload helpers
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Tuple
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class FileTooLargeError(Exception):
+    """Raised when an upload exceeds the allowed size"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"File exceeds maximum allowed size of {max_size} bytes")
+
+
+async def stream_upload_to_disk(
+    upload: UploadFile,
+    destination: Path,
+    max_size: int,
+    chunk_size: int = CHUNK_SIZE
+) -> Tuple[int, str]:
+    """
+    Copy an upload to `destination` chunk by chunk, enforcing `max_size` as
+    bytes arrive and hashing on the fly. Disk writes run in the threadpool so
+    the event loop is never blocked. On any failure the partial file is removed.
+
+    Returns (size in bytes, sha256 hex digest).
+    """
+    digest = hashlib.sha256()
+    size = 0
+    buffer = await run_in_threadpool(open, destination, "wb")
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise FileTooLargeError(max_size)
+            digest.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(_remove_quietly, destination)
+        raise
+    await run_in_threadpool(buffer.close)
+    return size, digest.hexdigest()
+
+
+def _remove_quietly(path: Path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,111 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+# The engine is built from settings at import time: point it at a throwaway SQLite file first,
+# or at TEST_DATABASE_URL (e.g. an empty PostgreSQL database; every table is emptied after each test)
+_db_dir = tempfile.mkdtemp(prefix="dochub-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{os.path.join(_db_dir, 'dochub.db')}"
+os.environ["DEBUG"] = "false"
+os.environ["UPLOAD_DIR"] = os.path.join(_db_dir, "uploads")
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["PROCESSING_WORKERS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+import pytest
+from fastapi.testclient import TestClient
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.config import settings
+from app.database import Base, SessionLocal, engine, replica_router
+from app.main import app as api
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.document import Document
+from app.models.hashtag import Hashtag
+from app.models.starred_document import StarredDocument
+from app.schemas.user import UserCreate
+from app.services.category_service import invalidate_category_cache
+from app.services.permission_service import invalidate_permission_cache
+from app.services.role_service import RoleService
+from app.services.user_service import UserService
+from app.utils.cache import response_cache
+
+API = settings.API_V1_PREFIX
+ROLES = ("MANAGER", "CREATOR", "APPROVER", "READER")
+PASSWORD = "secret123"
+
+
+@pytest.fixture(scope="session")
+def _schema():
+    Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def db(_schema):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        # Empty every table and the in-process caches that remember rows
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+        response_cache.backend.clear()
+        invalidate_category_cache()
+        invalidate_permission_cache()
+        replica_router._last_write.clear()
+
+
+@pytest.fixture(scope="session")
+def _app_client(_schema):
+    with TestClient(api) as client:
+        yield client
+
+
+@pytest.fixture
+def client(_app_client, db):
+    return _app_client
+
+
+@pytest.fixture
+def users(client, db):
+    """One user per default role: role -> {"uid", "headers"} (Authorization header to send)"""
+    result = {}
+    for name in ROLES:
+        role = RoleService.get_by_name(db, name) or RoleService.create(db, name)
+        user = UserService.create(db, UserCreate(email=f"{name.lower()}@example.com", name=name.title(), password=PASSWORD))
+        RoleService.assign_to_user(db, user.uid, [role.rid])
+        response = client.post(f"{API}/auth/login", data={"username": user.email, "password": PASSWORD})
+        result[name] = {"uid": user.uid, "headers": {"Authorization": f"Bearer {response.json()['access_token']}"}}
+    return result
+
+
+@pytest.fixture
+def documents(db, users):
+    """
+    A dozen documents by the creator, two thirds approved: each with tags and three comments,
+    approved ones starred by three users. Returns their ids.
+    """
+    now = datetime.utcnow()
+    categories = [Category(oid=str(uuid4()), name=f"topic-{i}") for i in range(3)]
+    db.add_all(categories)
+    dids = []
+    for n in range(12):
+        did = str(uuid4())
+        dids.append(did)
+        approved = n % 3 != 0
+        db.add(Document(
+            did=did, uid=users["CREATOR"]["uid"], title=f"Document {n}", description="", link=f"uploads/{did}.pdf",
+            size=1.0, status=1 if approved else 0,
+            approved_by=users["APPROVER"]["uid"] if approved else None, approved_at=now if approved else None
+        ))
+        db.flush()
+        db.add_all(Hashtag(did=did, oid=category.oid) for category in categories[:n % 3 + 1])
+        for i, role in enumerate(("READER", "APPROVER", "MANAGER")):
+            db.add(Comment(uid=users[role]["uid"], did=did, content=f"comment {i}", created_at=now + timedelta(seconds=i)))
+            if approved:
+                db.add(StarredDocument(uid=users[role]["uid"], did=did))
+    db.commit()
+    return dids
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import event
+from app.database import SessionLocal
+from app.models.blob import Blob
+from app.services.blob_service import BlobService
+
+SHA256 = "ab" * 32
+
+
+def _stored_blob(db, age: timedelta) -> Path:
+    path = BlobService.blob_path(SHA256, ".pdf")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"%PDF")
+    db.add(Blob(hash=SHA256, path=str(path), size=4, ref_count=0, updated_at=datetime.utcnow() - age))
+    db.commit()
+    return path
+
+
+def test_collect_garbage_removes_old_orphans(db):
+    path = _stored_blob(db, timedelta(hours=2))
+
+    assert BlobService.collect_garbage(db, grace_seconds=3600) == 1
+    assert db.query(Blob).count() == 0
+    assert not path.exists()
+
+
+def test_collect_garbage_keeps_blob_reuploaded_during_the_sweep(db):
+    path = _stored_blob(db, timedelta(hours=2))
+    upload = BlobService.temp_path()
+    upload.write_bytes(b"%PDF")
+
+    reuploaded = []
+
+    @event.listens_for(db, "do_orm_execute")
+    def reupload_before_delete(state):
+        # The same content is uploaded again between the sweep's SELECT and its DELETE
+        if state.is_delete and not reuploaded:
+            reuploaded.append(True)
+            other = SessionLocal()
+            BlobService.register_upload(other, upload, SHA256, 4, ".pdf")
+            other.close()
+
+    assert BlobService.collect_garbage(db, grace_seconds=3600) == 0
+    assert db.query(Blob).count() == 1
+    assert path.exists()
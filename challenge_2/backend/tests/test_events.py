@@ -0,0 +1,32 @@
+import asyncio
+from app.database import assert_max_queries
+from app.utils.events import RESYNC, Audience, document_events, event_bus
+
+APPROVER = Audience(uid="approver", sees_all=True, oids=None)
+
+
+def test_document_events_skip_queries_without_subscribers(db, documents):
+    assert event_bus.subscriber_count() == 0
+    with assert_max_queries(0):
+        assert document_events(db, "document.updated", documents[:3]) == []
+
+
+def test_resuming_past_unheard_changes_resyncs(db, documents):
+    async def scenario():
+        stream = event_bus.subscribe(APPROVER)
+        event_bus.publish(document_events(db, "document.updated", documents[:1]))
+        last_event_id, event_type, _ = await asyncio.wait_for(stream.get(), 1)
+        assert event_type == "document.updated"
+        event_bus.unsubscribe(stream)
+
+        # Changed while the client was reconnecting: no event is built
+        assert document_events(db, "document.updated", documents[:1]) == []
+
+        resumed = event_bus.subscribe(APPROVER, last_event_id)
+        try:
+            return await asyncio.wait_for(resumed.get(), 1)
+        finally:
+            event_bus.unsubscribe(resumed)
+
+    event_id, event_type, _ = asyncio.run(scenario())
+    assert (event_id, event_type) == (None, RESYNC)
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+from app.config import settings
+from app.models.blob import Blob
+from app.models.file_processing import FileProcessing
+from app.services.processing_service import FAILED, QUEUED, RUNNING, ProcessingService
+
+
+def _job(db, sha256, status, attempts=0, started_minutes_ago=None):
+    db.add(Blob(hash=sha256, path=f"uploads/{sha256}.pdf", size=1, ref_count=1))
+    db.flush()
+    started_at = None
+    if started_minutes_ago is not None:
+        started_at = datetime.utcnow() - timedelta(minutes=started_minutes_ago)
+    db.add(FileProcessing(hash=sha256, status=status, attempts=attempts, started_at=started_at))
+    db.commit()
+
+
+def test_claim_reclaims_lost_jobs_within_their_attempt_budget(db):
+    lost_minutes = settings.PROCESSING_JOB_TIMEOUT_SECONDS // 60 + 1
+    _job(db, "queued", QUEUED)
+    _job(db, "lost", RUNNING, attempts=1, started_minutes_ago=lost_minutes)
+    _job(db, "exhausted", RUNNING, attempts=settings.PROCESSING_MAX_ATTEMPTS, started_minutes_ago=lost_minutes)
+    _job(db, "still_mine", RUNNING, attempts=1, started_minutes_ago=lost_minutes)
+    _job(db, "running", RUNNING, attempts=1, started_minutes_ago=0)
+
+    claimed = {sha256 for sha256, _ in ProcessingService.claim(db, 10, exclude=["still_mine"])}
+
+    assert claimed == {"queued", "lost"}
+    jobs = {job.hash: job for job in db.query(FileProcessing)}
+    assert jobs["exhausted"].status == FAILED
+    assert jobs["still_mine"].status == RUNNING
+    assert jobs["lost"].attempts == 2
@@ -0,0 +1,47 @@
+"""
+Query budgets of the hot read endpoints: each request must issue a fixed number
+of statements however many rows it returns, so N+1 regressions fail here.
+"""
+import pytest
+from app.config import settings
+from app.database import assert_max_queries
+
+API = settings.API_V1_PREFIX
+
+
+def _get(client, url, headers, max_queries):
+    with assert_max_queries(max_queries):
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.parametrize("role, max_queries", [("READER", 9), ("CREATOR", 10)])
+def test_document_list(client, users, documents, role, max_queries):
+    response = _get(client, f"{API}/documents", users[role]["headers"], max_queries)
+    assert len(response.json()) == (len(documents) if role == "CREATOR" else len(documents) * 2 // 3)
+
+
+def test_document_list_with_is_starred(client, users, documents):
+    response = _get(client, f"{API}/documents?fields=title,tags,is_starred", users["READER"]["headers"], 7)
+    assert all(item["is_starred"] for item in response.json())
+
+
+def test_starred_documents(client, users, documents):
+    response = _get(client, f"{API}/documents/starred", users["READER"]["headers"], 9)
+    assert len(response.json()) == len(documents) * 2 // 3
+
+
+def test_document_detail(client, users, documents):
+    response = _get(client, f"{API}/documents/{documents[1]}", users["READER"]["headers"], 11)
+    assert response.json()["comments_count"] == 3
+
+
+def test_pending_documents(client, users, documents):
+    response = _get(client, f"{API}/approvals/pending", users["APPROVER"]["headers"], 9)
+    assert len(response.json()) == len(documents) // 3
+
+
+def test_document_comments(client, users, documents):
+    response = _get(client, f"{API}/comments/document/{documents[1]}", users["READER"]["headers"], 5)
+    assert [comment["content"] for comment in response.json()] == ["comment 2", "comment 1", "comment 0"]
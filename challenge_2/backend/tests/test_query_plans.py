@@ -0,0 +1,98 @@
+"""
+The API's hot queries must be served by indexes (PostgreSQL only: run with
+TEST_DATABASE_URL pointing at an empty PostgreSQL database).
+
+Each hot query is EXPLAINed with sequential scans disabled for the session
+(enable_seqscan = off), which makes the planner pick an index whenever one can
+serve the query, so the result does not depend on how much data is loaded: a
+full table scan in the plan means no usable index exists.
+"""
+import json
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app.database import engine
+from app.models.comment import Comment
+from app.models.document import Document
+from app.models.hashtag import Hashtag
+from app.models.starred_document import StarredDocument
+from app.services.comment_service import thread_query
+from app.services.document_service import DocumentService
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="query plans are checked on PostgreSQL")
+
+CHECKED_TABLES = ("documents", "hashtag", "comments", "starred_documents", "users", "user_category_access")
+
+
+def hot_queries(db: Session, uid: str) -> List[Tuple[str, object]]:
+    """(name, statement) for each query the API runs on most requests, with sample values from the data"""
+    author = db.scalar(select(Document.uid).limit(1))
+    did = db.scalar(select(Comment.did).group_by(Comment.did).order_by(func.count().desc()).limit(1))
+    oid = db.scalar(select(Hashtag.oid).limit(1))
+    dids = list(db.scalars(select(Document.did).where(Document.status == 1).limit(20)))
+
+    listing = select(Document.did, Document.title, Document.updated_at)
+    return [
+        ("document list (approved)", listing.where(DocumentService.approved_filter(uid))
+            .order_by(Document.updated_at.desc()).limit(20)),
+        ("approval queue", listing.where(Document.status == 0).order_by(Document.updated_at.desc()).limit(20)),
+        ("documents of an author", listing.where(Document.uid == author).order_by(Document.updated_at.desc()).limit(20)),
+        ("documents of a category", select(Hashtag.did).where(Hashtag.oid == oid)),
+        ("comment thread page", thread_query(did).limit(51)),
+        ("comment counts", select(Comment.did, func.count()).where(Comment.did.in_(dids)).group_by(Comment.did)),
+        ("star counts", select(StarredDocument.did, func.count()).where(StarredDocument.did.in_(dids))
+            .group_by(StarredDocument.did)),
+        ("approvals in the last 30 days", select(func.date(Document.approved_at), func.count())
+            .where(Document.approved_at >= datetime.utcnow() - timedelta(days=30))
+            .group_by(func.date(Document.approved_at))),
+    ]
+
+
+def plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def is_full_scan(node: dict) -> bool:
+    """
+    A sequential scan, or an index scan without an index condition - what the
+    planner falls back to with seqscans disabled when some unrelated index
+    (e.g. a composite primary key) covers the table but not the predicate.
+    """
+    if node.get("Relation Name") not in CHECKED_TABLES:
+        return False
+    if node["Node Type"] == "Seq Scan":
+        return True
+    return node["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in node
+
+
+def explain(db: Session, statement) -> dict:
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def describe(node: dict, depth: int = 0) -> Iterator[str]:
+    target = node.get("Index Name") or node.get("Relation Name") or ""
+    yield f"{'  ' * depth}{node['Node Type']} {target}".rstrip()
+    for child in node.get("Plans", []):
+        yield from describe(child, depth + 1)
+
+
+def test_hot_queries_use_indexes(db, users, documents):
+    db.execute(text(f"ANALYZE {', '.join(CHECKED_TABLES)}"))
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    failures = []
+    for name, statement in hot_queries(db, users["READER"]["uid"]):
+        plan = explain(db, statement)
+        full_scans = sorted({node["Relation Name"] for node in plan_nodes(plan) if is_full_scan(node)})
+        if full_scans:
+            failures.append(f"{name}: full scan of {', '.join(full_scans)}\n" + "\n".join(f"    {line}" for line in describe(plan)))
+    db.rollback()
+    assert not failures, "Hot queries without a usable index:\n" + "\n".join(failures)
@@ -0,0 +1,49 @@
+import shutil
+from uuid import uuid4
+import pytest
+from sqlalchemy import create_engine
+from app.config import settings
+from app.database import engine, replica_engines, replica_router
+from app.models.document import Document
+
+API = settings.API_V1_PREFIX
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "sqlite", reason="the replica is a copy of the SQLite file")
+
+
+@pytest.fixture
+def lagging_replica(tmp_path):
+    """A replica that never catches up: a copy of the primary taken when called"""
+    replicas = []
+
+    def attach():
+        path = tmp_path / "replica.db"
+        shutil.copyfile(engine.url.database, path)
+        replica = create_engine(f"sqlite:///{path}")
+        replicas.append(replica)
+        replica_engines.append(replica)
+        replica_router.healthy.append(True)
+        replica_router.lag.append(0.0)
+
+    yield attach
+    for replica in replicas:
+        replica_engines.remove(replica)
+        replica_router.healthy.pop()
+        replica_router.lag.pop()
+        replica.dispose()
+
+
+def test_writer_does_not_read_replica_data_cached_after_its_write(client, db, users, lagging_replica):
+    did = str(uuid4())
+    db.add(Document(did=did, uid=users["CREATOR"]["uid"], title="Doc", description="", link="x.pdf", size=1.0, status=1))
+    db.commit()
+    lagging_replica()
+
+    writer, other = users["READER"]["headers"], users["APPROVER"]["headers"]
+    response = client.post(f"{API}/comments", json={"did": did, "content": "first"}, headers=writer)
+    assert response.status_code == 201
+
+    # Another user reads from the replica, which has not seen the comment yet
+    assert client.get(f"{API}/documents/{did}", headers=other).json()["comments_count"] == 0
+    # The writer is pinned to the primary and must not get that entry
+    assert client.get(f"{API}/documents/{did}", headers=writer).json()["comments_count"] == 1
@@ -0,0 +1,36 @@
+from uuid import uuid4
+from app.models.category import Category
+from app.models.permission import UserCategoryAccess
+from app.models.role import access_permission, user_role
+from app.models.user import User
+from app.services.permission_service import PermissionService
+from app.services.role_service import RoleService
+
+
+def _user(db, name):
+    user = User(uid=str(uuid4()), name=name, email=f"{name}@example.com", password="x")
+    db.add(user)
+    return user
+
+
+def test_delete_role_revokes_category_access(db):
+    reader = _user(db, "reader")
+    approver = _user(db, "approver")
+    db.add_all([Category(oid="finance", name="Finance"), Category(oid="legal", name="Legal")])
+    db.flush()
+    finance = RoleService.create(db, "FINANCE")
+    legal = RoleService.create(db, "LEGAL")
+    db.execute(access_permission.insert().values(rid=finance.rid, oid="finance"))
+    db.execute(access_permission.insert().values(rid=legal.rid, oid="legal"))
+    db.execute(user_role.insert().values(uid=reader.uid, rid=finance.rid))
+    db.execute(user_role.insert().values(uid=approver.uid, rid=finance.rid))
+    db.execute(user_role.insert().values(uid=approver.uid, rid=legal.rid))
+    PermissionService.refresh_users(db, [reader.uid, approver.uid])
+    db.commit()
+
+    assert RoleService.delete(db, finance.rid)
+
+    rows = {(row.uid, row.oid) for row in db.query(UserCategoryAccess)}
+    assert rows == {(approver.uid, "legal")}
+    assert db.query(user_role).filter(user_role.c.rid == finance.rid).count() == 0
+    assert db.query(access_permission).filter(access_permission.c.rid == finance.rid).count() == 0
@@ -24,6 +24,42 @@ import { documentsApi, commentsApi, approvalsApi, type Document as ApiDocument,
 import { Document, Comment } from '@/types';
 import { useRole } from '@/hooks/use-role';
 
+const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api/v1';
+
+// One page of a document's comments (newest first) and the cursor of the next page, if any
+const fetchCommentsPage = async (
+  did: string,
+  cursor?: string
+): Promise<{ items: ApiComment[]; nextCursor: string | null }> => {
+  const token = localStorage.getItem('access_token');
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  const response = await fetch(`${API_BASE_URL}/comments/document/${did}${query}`, {
+    headers: {
+      Authorization: `Bearer ${token}`,
+    },
+  });
+  if (!response.ok) {
+    throw new Error(`Failed to load comments: ${response.status}`);
+  }
+  return { items: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') };
+};
+
+// Map API comment to component comment
+const mapApiCommentToComment = (c: ApiComment): Comment => ({
+  id: `${c.uid}_${c.did}_${c.created_at}`, // Composite key as unique ID
+  documentId: c.did,
+  author: {
+    id: c.uid,
+    name: c.user_name || 'Unknown',
+    email: '',
+    role: [],
+    createdAt: new Date(),
+  },
+  content: c.content,
+  createdAt: new Date(c.created_at),
+  likes: 0,
+});
+
 // Map API document to component document
 const mapApiDocumentToDocument = (apiDoc: ApiDocument): Document => {
   let status: 'published' | 'pending' | 'draft' | 'rejected';
@@ -78,6 +114,9 @@ export default function DocumentDetailPage() {
   const [document, setDocument] = useState<Document | null>(null);
   const [relatedDocs, setRelatedDocs] = useState<Document[]>([]);
   const [comments, setComments] = useState<Comment[]>([]);
+  const [commentsTotal, setCommentsTotal] = useState(0);
+  const [commentsCursor, setCommentsCursor] = useState<string | null>(null);
+  const [loadingMoreComments, setLoadingMoreComments] = useState(false);
   const [newComment, setNewComment] = useState('');
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
@@ -96,23 +135,11 @@ export default function DocumentDetailPage() {
         setStarCount(apiDoc.stars_count);
         setIsStarred(apiDoc.is_starred || false);
         
-        // Load comments
-        const apiComments = await commentsApi.list(id);
-        const mappedComments = apiComments.map(c => ({
-          id: `${c.uid}_${c.did}_${c.created_at}`, // Composite key as unique ID
-          documentId: c.did,
-          author: {
-            id: c.uid,
-            name: c.user_name || 'Unknown',
-            email: '',
-            role: [],
-            createdAt: new Date(),
-          },
-          content: c.content,
-          createdAt: new Date(c.created_at),
-          likes: 0,
-        }));
-        setComments(mappedComments);
+        // Load the first page of comments; older ones are fetched on demand
+        setCommentsTotal(apiDoc.comments_count || 0);
+        const firstPage = await fetchCommentsPage(id);
+        setComments(firstPage.items.map(mapApiCommentToComment));
+        setCommentsCursor(firstPage.nextCursor);
         
         // Load related documents
         const allDocs = await documentsApi.list();
@@ -162,6 +189,22 @@ export default function DocumentDetailPage() {
     }
   };
 
+  const handleLoadMoreComments = async () => {
+    if (!commentsCursor) return;
+
+    setLoadingMoreComments(true);
+    try {
+      const page = await fetchCommentsPage(id, commentsCursor);
+      setComments(prev => [...prev, ...page.items.map(mapApiCommentToComment)]);
+      setCommentsCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Failed to load comments:', err);
+      alert('Failed to load more comments');
+    } finally {
+      setLoadingMoreComments(false);
+    }
+  };
+
   const handlePostComment = async () => {
     if (!newComment.trim()) return;
     
@@ -183,6 +226,7 @@ export default function DocumentDetailPage() {
         likes: 0,
       };
       setComments([...comments, mappedComment]);
+      setCommentsTotal(prev => prev + 1);
       setNewComment('');
     } catch (err) {
       console.error('Failed to post comment:', err);
@@ -303,7 +347,7 @@ export default function DocumentDetailPage() {
             </Button>
             <Button variant="outline" className="gap-2 border-gray-300 hover:bg-gray-50">
               <MessageCircle className="h-4 w-4" />
-              Comments ({comments.length})
+              Comments ({commentsTotal})
             </Button>
             <Button 
               onClick={handleShare}
@@ -362,7 +406,7 @@ export default function DocumentDetailPage() {
         <Card className="border-gray-200 shadow-lg">
           <CardContent className="p-6 lg:p-8">
             <h3 className="mb-6 text-2xl font-bold text-gray-900">
-              Comments ({comments.length})
+              Comments ({commentsTotal})
             </h3>
             <div className="space-y-6">
               {comments.length === 0 ? (
@@ -401,6 +445,19 @@ export default function DocumentDetailPage() {
                 })
               )}
 
+              {commentsCursor && (
+                <div className="flex justify-center">
+                  <Button
+                    variant="outline"
+                    className="border-gray-300 hover:bg-gray-50"
+                    onClick={handleLoadMoreComments}
+                    disabled={loadingMoreComments}
+                  >
+                    {loadingMoreComments ? 'Loading...' : 'Load more comments'}
+                  </Button>
+                </div>
+              )}
+
               {/* Add Comment */}
               <div className="border-t pt-6">
                 <div className="flex gap-4">
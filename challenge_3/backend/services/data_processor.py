@@ -1,9 +1,53 @@
 import polars as pl
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+COMPLIANT_ANSWERS = ("Always", "Frequently")
+
+def is_compliant(col: str) -> pl.Expr:
+    """Behavior answered Always/Frequently (OR of equalities: several times faster than is_in on strings)"""
+    return pl.any_horizontal([pl.col(col) == answer for answer in COMPLIANT_ANSWERS])
+
+@dataclass(frozen=True)
+class DataFilter:
+    """Survey rows a request asks for; fields left as None do not filter"""
+    regions: Optional[tuple[str, ...]] = None
+    week_start: Optional[int] = None
+    week_end: Optional[int] = None
+    age_min: Optional[int] = None
+    age_max: Optional[int] = None
+    gender: Optional[str] = None
+    
+    def predicate(self) -> Optional[pl.Expr]:
+        """All conditions combined into one expression, None when nothing is filtered"""
+        conditions = []
+        
+        if self.regions:
+            conditions.append(pl.col("region").is_in(list(self.regions)))
+        
+        if self.week_start or self.week_end:
+            # qweek is "week N"; compare N so week 1 does not also match weeks 10-12
+            week = pl.col("qweek").str.extract(r"(\d+)").cast(pl.Int32, strict=False)
+            conditions.append(week.is_between(self.week_start or 1, self.week_end or 12, closed="both"))
+        
+        if self.age_min is not None:
+            conditions.append(pl.col("age") >= self.age_min)
+        
+        if self.age_max is not None:
+            conditions.append(pl.col("age") <= self.age_max)
+        
+        if self.gender:
+            conditions.append(pl.col("gender") == self.gender)
+        
+        return pl.all_horizontal(conditions) if conditions else None
+
 class CovidDataProcessor:
-    """Process COVID-19 data using Polars for high performance"""
+    """
+    Process COVID-19 data using Polars for high performance.
+    The loaded frame is never modified after loading, so getters can serve
+    concurrent requests: each one reads its own filtered view of it.
+    """
     
     def __init__(self, data_path: str):
         self.data_path = Path(data_path)
@@ -27,32 +71,47 @@ class CovidDataProcessor:
             pl.col("endtime").str.strptime(pl.Datetime, "%d/%m/%Y %H:%M", strict=False).alias("datetime")
         ])
     
-    def get_overview_stats(self) -> dict:
+    def _frame(self, filters: Optional[DataFilter]) -> pl.DataFrame:
+        """Rows selected by `filters`: the shared frame itself when nothing is filtered"""
+        predicate = filters.predicate() if filters else None
+        if predicate is None:
+            return self._df
+        return self._df.filter(predicate)
+    
+    def _scan(self, filters: Optional[DataFilter]) -> pl.LazyFrame:
+        """
+        Lazy view of the rows selected by `filters`. Queries built on it run
+        through the lazy engine: the filter is fused into the scan, only the
+        columns used are read and independent aggregations run in parallel.
+        """
+        predicate = filters.predicate() if filters else None
+        lf = self._df.lazy()
+        return lf if predicate is None else lf.filter(predicate)
+    
+    def get_overview_stats(self, filters: Optional[DataFilter] = None) -> dict:
         """Get KPI statistics for dashboard cards"""
-        total_records = len(self._df)
-        
-        # Average health score (cantril_ladder)
-        # Cast to float with strict=False to handle invalid values
-        avg_health_score = self._df.select(
-            pl.col("cantril_ladder").cast(pl.Float64, strict=False).mean()
-        ).item()
+        lf = self._scan(filters)
         
         # Compliance rate - tính TRUNG BÌNH compliance của tất cả 20 behaviors
         # Mỗi behavior: Always/Frequently = compliant
         compliance_cols = [f"i12_health_{i}" for i in range(1, 21)]
         existing_cols = [col for col in compliance_cols if col in self._df.columns]
         
-        if existing_cols:
+        # One pass: row count, average health score (cantril_ladder, cast with
+        # strict=False to handle invalid values) and compliant count per behavior
+        stats = lf.select([
+            pl.len().alias("total"),
+            pl.col("cantril_ladder").cast(pl.Float64, strict=False).mean().alias("avg_health_score"),
+            *[is_compliant(col).sum().alias(col) for col in existing_cols]
+        ]).collect().row(0, named=True)
+        
+        total_records = stats["total"]
+        avg_health_score = stats["avg_health_score"]
+        
+        if existing_cols and total_records > 0:
             # Tính compliance rate cho từng behavior, rồi lấy trung bình
-            total_compliance = 0
-            for col in existing_cols:
-                compliant_count = self._df.filter(
-                    pl.col(col).is_in(["Always", "Frequently"])
-                ).height
-                behavior_rate = (compliant_count / total_records * 100) if total_records > 0 else 0
-                total_compliance += behavior_rate
-            
-            compliance_rate = total_compliance / len(existing_cols) if existing_cols else 0
+            behavior_rates = [stats[col] / total_records * 100 for col in existing_cols]
+            compliance_rate = sum(behavior_rates) / len(existing_cols)
         else:
             compliance_rate = 0
         
@@ -62,17 +121,9 @@ class CovidDataProcessor:
             "compliance_rate": round(compliance_rate, 1)
         }
     
-    def get_timeline_data(self, week_start: Optional[int] = None, week_end: Optional[int] = None) -> dict:
+    def get_timeline_data(self, filters: Optional[DataFilter] = None) -> dict:
         """Get timeline data by week"""
-        df = self._df.clone()
-        
-        # Filter by week if specified
-        if week_start is not None or week_end is not None:
-            start = week_start or 1
-            end = week_end or 12
-            df = df.filter(
-                pl.col("qweek").str.contains(f"week ({start}|{end}|[{start}-{end}])")
-            )
+        df = self._frame(filters)
         
         # Group by week
         timeline = df.group_by("qweek").agg([
@@ -88,9 +139,10 @@ class CovidDataProcessor:
             "avg_mental_health": timeline["avg_mental_health"].fill_nan(None).to_list()
         }
     
-    def get_region_data(self) -> dict:
+    def get_region_data(self, filters: Optional[DataFilter] = None) -> dict:
         """Get data grouped by region"""
-        region_stats = self._df.group_by("region").agg([
+        df = self._frame(filters)
+        region_stats = df.group_by("region").agg([
             pl.count().alias("count"),
             pl.col("i1_health").cast(pl.Float64, strict=False).mean().alias("avg_health"),
             pl.col("cantril_ladder").cast(pl.Float64, strict=False).mean().alias("avg_mental_health")
@@ -103,15 +155,17 @@ class CovidDataProcessor:
             "avg_mental_health": region_stats["avg_mental_health"].fill_nan(None).to_list()
         }
     
-    def get_demographics(self) -> dict:
+    def get_demographics(self, filters: Optional[DataFilter] = None) -> dict:
         """Get demographic distribution"""
+        lf = self._scan(filters)
+        
         # Gender distribution
-        gender_dist = self._df.group_by("gender").agg([
-            pl.count().alias("count")
+        gender_query = lf.group_by("gender").agg([
+            pl.len().alias("count")
         ])
         
         # Age distribution (group into ranges)
-        age_groups = self._df.with_columns([
+        age_query = lf.with_columns([
             pl.when(pl.col("age") < 25).then(pl.lit("18-24"))
             .when(pl.col("age") < 35).then(pl.lit("25-34"))
             .when(pl.col("age") < 50).then(pl.lit("35-49"))
@@ -119,17 +173,22 @@ class CovidDataProcessor:
             .otherwise(pl.lit("65+"))
             .alias("age_group")
         ]).group_by("age_group").agg([
-            pl.count().alias("count")
+            pl.len().alias("count")
         ]).sort("age_group")
         
-        # Employment status
+        # Employment status: "Yes" count of every column in one select
         employment_cols = [f"employment_status_{i}" for i in range(1, 8)]
         existing_emp_cols = [col for col in employment_cols if col in self._df.columns]
+        employment_query = lf.select([
+            (pl.col(col) == "Yes").sum().alias(col) for col in existing_emp_cols
+        ])
+        
+        # The three panels run concurrently, sharing the filtered scan
+        gender_dist, age_groups, employment_counts = pl.collect_all([gender_query, age_query, employment_query])
         
         employment_data = []
         if existing_emp_cols:
-            for col in existing_emp_cols:
-                yes_count = self._df.filter(pl.col(col) == "Yes").height
+            for col, yes_count in employment_counts.row(0, named=True).items():
                 if yes_count > 0:
                     employment_data.append({
                         "status": col.replace("employment_status_", "Status "),
@@ -148,15 +207,17 @@ class CovidDataProcessor:
             "employment": employment_data
         }
     
-    def get_health_mental_data(self) -> dict:
+    def get_health_mental_data(self, filters: Optional[DataFilter] = None) -> dict:
         """Get mental health and PHQ4 scores"""
+        df = self._frame(filters)
+        
         # PHQ4 scores (anxiety and depression)
         phq_cols = [f"PHQ4_{i}" for i in range(1, 5)]
-        existing_phq = [col for col in phq_cols if col in self._df.columns]
+        existing_phq = [col for col in phq_cols if col in df.columns]
         
         phq_data = {}
         for col in existing_phq:
-            score_dist = self._df.group_by(col).agg([
+            score_dist = df.group_by(col).agg([
                 pl.count().alias("count")
             ]).sort(col)
             phq_data[col] = {
@@ -165,7 +226,7 @@ class CovidDataProcessor:
             }
         
         # Cantril ladder distribution
-        cantril_dist = self._df.group_by("cantril_ladder").agg([
+        cantril_dist = df.group_by("cantril_ladder").agg([
             pl.count().alias("count")
         ]).sort("cantril_ladder")
         
@@ -177,30 +238,37 @@ class CovidDataProcessor:
             }
         }
     
-    def get_vaccination_data(self) -> dict:
+    def get_vaccination_data(self, filters: Optional[DataFilter] = None) -> dict:
         """Get vaccination statistics"""
+        lf = self._scan(filters)
+        
         # v1: Have you been vaccinated?
-        v1_dist = self._df.group_by("v1").agg([
-            pl.count().alias("count")
+        v1_query = lf.group_by("v1").agg([
+            pl.len().alias("count")
         ])
         
-        # Count vaccine types (v2_1 to v2_5)
+        # Count vaccine types (v2_1 to v2_5) in one select
         vaccine_type_cols = [f"v2_{i}" for i in range(1, 6)]
         existing_v2 = [col for col in vaccine_type_cols if col in self._df.columns]
+        types_query = lf.select([
+            (pl.col(col) == "Yes").sum().alias(col) for col in existing_v2
+        ])
+        
+        v1_dist, type_counts = pl.collect_all([v1_query, types_query])
         
         vaccine_types = []
-        for col in existing_v2:
-            yes_count = self._df.filter(pl.col(col) == "Yes").height
-            if yes_count > 0:
-                vaccine_types.append({
-                    "type": col.replace("v2_", "Vaccine Type "),
-                    "count": yes_count
-                })
+        if existing_v2:
+            for col, yes_count in type_counts.row(0, named=True).items():
+                if yes_count > 0:
+                    vaccine_types.append({
+                        "type": col.replace("v2_", "Vaccine Type "),
+                        "count": yes_count
+                    })
         
         return {
             "status": {
-                "labels": v1_dist["v1"].to_list() if "v1" in v1_dist.columns else [],
-                "values": v1_dist["count"].to_list() if "v1" in v1_dist.columns else []
+                "labels": v1_dist["v1"].to_list(),
+                "values": v1_dist["count"].to_list()
             },
             "types": vaccine_types
         }
@@ -216,48 +284,47 @@ class CovidDataProcessor:
             }
         }
     
-    def filter_data(
-        self,
-        regions: Optional[list[str]] = None,
-        week_start: Optional[int] = None,
-        week_end: Optional[int] = None,
-        age_min: Optional[int] = None,
-        age_max: Optional[int] = None,
-        gender: Optional[str] = None
-    ):
-        """Apply filters to the dataset"""
-        df = self._df.clone()
-        
-        if regions:
-            df = df.filter(pl.col("region").is_in(regions))
-        
-        if week_start or week_end:
-            start = week_start or 1
-            end = week_end or 12
-            pattern = f"week ({start}|{end}|[{start}-{end}])"
-            df = df.filter(pl.col("qweek").str.contains(pattern))
-        
-        if age_min is not None:
-            df = df.filter(pl.col("age") >= age_min)
-        
-        if age_max is not None:
-            df = df.filter(pl.col("age") <= age_max)
-        
-        if gender:
-            df = df.filter(pl.col("gender") == gender)
-        
-        # Temporarily update the dataframe
-        original_df = self._df
-        self._df = df
-        
-        return original_df
+    @staticmethod
+    def _answer_counts(lf: pl.LazyFrame, cols: list[str]) -> pl.LazyFrame:
+        """
+        Long-format answer counts of a column family: one row per (variable, value, qweek).
+        The family is unpivoted once and counted with a single group_by, so the
+        cost of a panel does not grow with its number of questions.
+        """
+        if not cols:
+            return pl.LazyFrame(schema={"variable": pl.String, "value": pl.String, "qweek": pl.String, "count": pl.UInt32})
+        return (
+            lf.select([pl.col("qweek"), *[pl.col(col).cast(pl.String) for col in cols]])
+            .unpivot(index="qweek", on=cols, variable_name="variable", value_name="value")
+            .group_by(["variable", "value", "qweek"])
+            .agg(pl.len().alias("count"))
+        )
     
-    def restore_data(self, original_df):
-        """Restore original dataframe after filtering"""
-        self._df = original_df
+    @staticmethod
+    def _distributions(counts: pl.DataFrame, sort: bool = False) -> dict:
+        """variable -> [{"level", "count"}] from answer counts, summed over weeks (sorted by level, nulls first)"""
+        dist = counts.group_by(["variable", "value"]).agg(pl.col("count").sum())
+        if sort:
+            dist = dist.sort(["variable", "value"])
+        grouped = dist.group_by("variable", maintain_order=True).agg([pl.col("value"), pl.col("count")])
+        return {
+            variable: [
+                {"level": str(level) if level is not None else "Unknown", "count": count}
+                for level, count in zip(levels, counts)
+            ]
+            for variable, levels, counts in grouped.iter_rows()
+        }
+    
+    @staticmethod
+    def _weighted_mean(counts: pl.DataFrame, score: pl.Expr) -> Optional[float]:
+        """Mean `score` of the answers in a (value, count) frame; None when no answer has a score"""
+        scored = counts.select([score.alias("score"), pl.col("count")]).drop_nulls("score")
+        total = scored["count"].sum()
+        return (scored["score"] * scored["count"]).sum() / total if total else None
 
-    def get_mental_health_government_data(self) -> dict:
+    def get_mental_health_government_data(self, filters: Optional[DataFilter] = None) -> dict:
         """Get comprehensive mental health and government response data"""
+        lf = self._scan(filters)
         
         # Define systematic ordinal scales for categorical data
         # These are ordered from worst/least to best/most
@@ -282,179 +349,99 @@ class CovidDataProcessor:
             "I am very scared that I will contract the Coronavirus (COVID-19)": 4
         }
         
-        # Cantril Ladder summary (life satisfaction 0-10)
-        cantril_avg = self._df.select(
-            pl.col("cantril_ladder").cast(pl.Float64, strict=False).mean()
-        ).item()
+        # PHQ4 metrics (mental health indicators)
+        phq_cols = ["PHQ4_1", "PHQ4_2", "PHQ4_3", "PHQ4_4"]
+        phq_labels = [
+            "Nervous/Anxious",
+            "Can't Stop Worrying", 
+            "Little Interest",
+            "Feeling Down"
+        ]
         
-        # Filter valid cantril_ladder values (numeric and in range 0-10)
-        cantril_filtered = self._df.filter(
-            pl.col("cantril_ladder").cast(pl.Float64, strict=False).is_between(0, 10, closed="both")
-        )
+        # Every distribution and average below comes from one long-format count
+        family = [
+            col for col in ["cantril_ladder", *phq_cols, "WCRex2", "WCRex1", "WCRV_4"]
+            if col in self._df.columns
+        ]
+        answers_query = self._answer_counts(lf, family)
         
-        cantril_dist = cantril_filtered.group_by("cantril_ladder").agg([
-            pl.count().alias("count")
-        ]).sort("cantril_ladder")
+        # Correlation data (mental health vs government response)
+        # Use same systematic ordinal scale as pandemic_handling for consistency
+        has_correlation = all(col in self._df.columns for col in ["cantril_ladder", "WCRex1"])
+        if has_correlation:
+            # Filter valid cantril_ladder values (0-10) and valid WCRex1 responses,
+            # then group by WCRex1 and calculate average cantril_ladder
+            correlation_query = lf.filter(
+                pl.col("cantril_ladder").is_in([str(i) for i in range(11)]) &
+                pl.col("WCRex1").is_in(list(handling_scale.keys()))
+            ).group_by("WCRex1").agg([
+                pl.col("cantril_ladder").cast(pl.Int64).mean().alias("avg_mental_health"),
+                pl.len().alias("count")
+            ])
+            answers, grouped = pl.collect_all([answers_query, correlation_query])
+        else:
+            answers = answers_query.collect()
+        
+        distributions = self._distributions(answers, sort=True)
+        
+        def answers_of(col: str) -> pl.DataFrame:
+            return answers.filter(pl.col("variable") == col).group_by("value").agg(pl.col("count").sum())
+        
+        # Cantril Ladder summary (life satisfaction 0-10), valid values are numeric and in range 0-10
+        cantril = answers_of("cantril_ladder").with_columns(
+            pl.col("value").cast(pl.Float64, strict=False).alias("score")
+        )
+        cantril_avg = self._weighted_mean(cantril, pl.col("score"))
+        cantril_dist = cantril.filter(pl.col("score").is_between(0, 10, closed="both")).sort("value")
         
         cantril_summary = {
             "average": round(cantril_avg, 2) if cantril_avg else 0,
             "distribution": [
-                {
-                    "score": int(float(row[0])) if row[0] is not None else 0, 
-                    "count": row[1]
-                }
-                for row in cantril_dist.iter_rows()
+                {"score": int(score), "count": count}
+                for score, count in zip(cantril_dist["score"], cantril_dist["count"])
             ]
         }
         
-        # PHQ4 metrics (mental health indicators)
-        phq_cols = ["PHQ4_1", "PHQ4_2", "PHQ4_3", "PHQ4_4"]
-        phq_labels = [
-            "Nervous/Anxious",
-            "Can't Stop Worrying", 
-            "Little Interest",
-            "Feeling Down"
+        phq4_metrics = [
+            {"metric": label, "column": col, "distribution": distributions.get(col, [])}
+            for col, label in zip(phq_cols, phq_labels)
+            if col in self._df.columns
         ]
         
-        phq4_metrics = []
-        for col, label in zip(phq_cols, phq_labels):
-            if col in self._df.columns:
-                dist = self._df.group_by(col).agg([
-                    pl.count().alias("count")
-                ]).sort(col)
-                
-                phq4_metrics.append({
-                    "metric": label,
-                    "column": col,
-                    "distribution": [
-                        {"level": str(row[0]) if row[0] is not None else "Unknown", "count": row[1]}
-                        for row in dist.iter_rows()
-                    ]
-                })
-        
-        # Government trust (WCRex2 - trust in health system)
-        gov_trust = {"average": 0, "distribution": []}
-        if "WCRex2" in self._df.columns:
-            # Map text to numeric and calculate average
-            valid_trust = self._df.filter(
-                pl.col("WCRex2").is_in(list(trust_scale.keys()))
+        def scale_summary(col: str, scale: dict) -> dict:
+            """Average of the answers on `scale`, normalized to 0-10, plus the raw distribution"""
+            if col not in self._df.columns:
+                return {"average": 0, "distribution": []}
+            avg = self._weighted_mean(
+                answers_of(col),
+                pl.col("value").replace_strict(scale, default=None, return_dtype=pl.Int64)
             )
-            
-            if len(valid_trust) > 0:
-                # Create numeric mapping with casting to Int64
-                trust_mapped = valid_trust.with_columns(
-                    pl.col("WCRex2").replace(trust_scale).cast(pl.Int64).alias("trust_score")
-                )
-                trust_avg = trust_mapped.select(pl.col("trust_score").mean()).item()
+            return {
                 # Normalize to 0-10 scale: (score-1)/(4-1) * 10
-                normalized_avg = round((trust_avg - 1) / 3 * 10, 1) if trust_avg else 0
-            else:
-                normalized_avg = 0
-            
-            trust_dist = self._df.group_by("WCRex2").agg([
-                pl.count().alias("count")
-            ]).sort("WCRex2")
-            
-            gov_trust = {
-                "average": normalized_avg,
-                "distribution": [
-                    {"level": str(row[0]) if row[0] is not None else "Unknown", "count": row[1]}
-                    for row in trust_dist.iter_rows()
-                ]
+                "average": round((avg - 1) / 3 * 10, 1) if avg else 0,
+                "distribution": distributions.get(col, [])
             }
         
+        # Government trust (WCRex2 - trust in health system)
+        gov_trust = scale_summary("WCRex2", trust_scale)
         # Pandemic handling (WCRex1 - gov't handling of pandemic)
-        pandemic_handling = {"average": 0, "distribution": []}
-        if "WCRex1" in self._df.columns:
-            # Map text to numeric and calculate average
-            valid_handling = self._df.filter(
-                pl.col("WCRex1").is_in(list(handling_scale.keys()))
-            )
-            
-            if len(valid_handling) > 0:
-                handling_mapped = valid_handling.with_columns(
-                    pl.col("WCRex1").replace(handling_scale).cast(pl.Int64).alias("handling_score")
-                )
-                handling_avg = handling_mapped.select(pl.col("handling_score").mean()).item()
-                # Normalize to 0-10 scale: (score-1)/(4-1) * 10
-                normalized_avg = round((handling_avg - 1) / 3 * 10, 1) if handling_avg else 0
-            else:
-                normalized_avg = 0
-            
-            handling_dist = self._df.group_by("WCRex1").agg([
-                pl.count().alias("count")
-            ]).sort("WCRex1")
-            
-            pandemic_handling = {
-                "average": normalized_avg,
-                "distribution": [
-                    {"level": str(row[0]) if row[0] is not None else "Unknown", "count": row[1]}
-                    for row in handling_dist.iter_rows()
-                ]
-            }
-        
+        pandemic_handling = scale_summary("WCRex1", handling_scale)
         # Fear level (WCRV_4 - fear of getting COVID)
-        fear_level = {"average": 0, "distribution": []}
-        if "WCRV_4" in self._df.columns:
-            # Map text to numeric and calculate average
-            valid_fear = self._df.filter(
-                pl.col("WCRV_4").is_in(list(fear_scale.keys()))
-            )
-            
-            if len(valid_fear) > 0:
-                fear_mapped = valid_fear.with_columns(
-                    pl.col("WCRV_4").replace(fear_scale).cast(pl.Int64).alias("fear_score")
-                )
-                fear_avg = fear_mapped.select(pl.col("fear_score").mean()).item()
-                # Normalize to 0-10 scale: (score-1)/(4-1) * 10
-                normalized_avg = round((fear_avg - 1) / 3 * 10, 1) if fear_avg else 0
-            else:
-                normalized_avg = 0
-            
-            fear_dist = self._df.group_by("WCRV_4").agg([
-                pl.count().alias("count")
-            ]).sort("WCRV_4")
-            
-            fear_level = {
-                "average": normalized_avg,
-                "distribution": [
-                    {"level": str(row[0]) if row[0] is not None else "Unknown", "count": row[1]}
-                    for row in fear_dist.iter_rows()
-                ]
-            }
+        fear_level = scale_summary("WCRV_4", fear_scale)
         
-        # Correlation data (mental health vs government response)
-        # Use same systematic ordinal scale as pandemic_handling for consistency
         correlation_data = []
-        if all(col in self._df.columns for col in ["cantril_ladder", "WCRex1"]):
-            # Filter valid cantril_ladder values (0-10) and valid WCRex1 responses
-            valid_df = self._df.filter(
-                pl.col("cantril_ladder").is_in([str(i) for i in range(11)]) &
-                pl.col("WCRex1").is_in(list(handling_scale.keys()))
-            )
-            
-            # Group by WCRex1 and calculate average cantril_ladder
-            if len(valid_df) > 0:
-                grouped = valid_df.group_by("WCRex1").agg([
-                    pl.col("cantril_ladder").cast(pl.Int64).mean().alias("avg_mental_health"),
-                    pl.count().alias("count")
-                ])
+        if has_correlation:
+            for gov_response_text, avg_mental_health, count in grouped.iter_rows():
+                # Map using systematic ordinal scale (1-4)
+                gov_response_score = handling_scale.get(gov_response_text)
                 
-                for row in grouped.iter_rows():
-                    gov_response_text = row[0]
-                    avg_mental_health = row[1]
-                    count = row[2]
-                    
-                    # Map using systematic ordinal scale (1-4)
-                    gov_response_score = handling_scale.get(gov_response_text)
-                    
-                    if avg_mental_health is not None and gov_response_score is not None and count > 10:
-                        correlation_data.append({
-                            "mental_health": round(avg_mental_health, 2),
-                            "gov_response": gov_response_score,  # Now 1-4 scale
-                            "category": gov_response_text,
-                            "count": count
-                        })
+                if avg_mental_health is not None and gov_response_score is not None and count > 10:
+                    correlation_data.append({
+                        "mental_health": round(avg_mental_health, 2),
+                        "gov_response": gov_response_score,  # Now 1-4 scale
+                        "category": gov_response_text,
+                        "count": count
+                    })
         
         return {
             "cantril_summary": cantril_summary,
@@ -465,8 +452,9 @@ class CovidDataProcessor:
             "correlation_data": correlation_data[:500]  # Limit to 500 points
         }
 
-    def get_compliance_knowledge_data(self) -> dict:
+    def get_compliance_knowledge_data(self, filters: Optional[DataFilter] = None) -> dict:
         """Get compliance behaviors and COVID knowledge data - OPTIMIZED"""
+        lf = self._scan(filters)
         
         # i12_health behaviors (1-20)
         i12_cols = [f"i12_health_{i}" for i in range(1, 21)]
@@ -495,94 +483,127 @@ class CovidDataProcessor:
             "i12_health_20": "Follow quarantine"
         }
         
-        # OPTIMIZATION: Vectorized operations to minimize dataframe scans
-        total_records = self._df.height
+        # Knowledge scores (r1_1 to r1_7)
+        r1_cols = [f"r1_{i}" for i in range(1, 8)]
+        existing_r1 = [col for col in r1_cols if col in self._df.columns]
+        
+        knowledge_labels = {
+            "r1_1": "COVID is very dangerous for me",
+            "r1_2": "Likely to catch COVID in future",
+            "r1_3": "Mask will protect me",
+            "r1_4": "Mask will protect others",
+            "r1_5": "Mask protection not possible for me",
+            "r1_6": "Important to improve health",
+            "r1_7": "Life greatly affected by COVID"
+        }
+        
+        # Define knowledge questions and their correct answers
+        # Only r1_3, r1_4, r1_5 are true knowledge questions
+        # r1_1, r1_2, r1_6, r1_7 are attitudes/perceptions - excluded
+        knowledge_questions = {
+            'r1_3': 'positive',  # "Mask protects ME" → Agree (5-7) = correct
+            'r1_4': 'positive',  # "Mask protects OTHERS" → Agree (5-7) = correct
+            'r1_5': 'negative'   # "Mask NOT POSSIBLE for me" → Disagree (1-3) = correct
+        }
+        existing_knowledge = [col for col in knowledge_questions.keys() if col in self._df.columns]
+        
+        # Per-respondent measures need the wide rows: one select for all of them
+        row_stats = [pl.len().alias("total")]
+        if existing_i12:
+            # High compliance: "Always" on any of the first 10 behaviors
+            row_stats.append(
+                pl.any_horizontal([pl.col(col) == "Always" for col in existing_i12[:10]]).sum().alias("high_compliance")
+            )
+        if existing_knowledge:
+            # Count correct answers per person
+            correct_answer_exprs = []
+            for col in existing_knowledge:
+                if knowledge_questions[col] == 'positive':
+                    # Positive: Agree (5-7) = correct
+                    correct_expr = pl.col(col).is_in(['5', '6', '7 - Agree']).cast(pl.Int32)
+                else:
+                    # Negative (r1_5): Disagree (1-3) = correct
+                    correct_expr = pl.col(col).is_in(['1 – Disagree', '2', '3']).cast(pl.Int32)
+                correct_answer_exprs.append(correct_expr)
+            correct_answers = sum(correct_answer_exprs)
+            total_knowledge_questions = len(existing_knowledge)
+            row_stats += [
+                # High awareness: >= 2/3 questions correct (66.7%)
+                (correct_answers >= total_knowledge_questions * 2/3).sum().alias("high_awareness"),
+                # Low awareness: < 1/3 questions correct (33.3%)
+                (correct_answers < total_knowledge_questions * 1/3).sum().alias("low_awareness")
+            ]
+        
+        # Three scans whatever the number of questions, run concurrently
+        behavior_answers, knowledge_answers, stats = pl.collect_all([
+            self._answer_counts(lf, existing_i12),
+            self._answer_counts(lf, existing_r1),
+            lf.select(row_stats)
+        ])
+        stats = stats.row(0, named=True)
+        total_records = stats["total"]
+        
+        # Compliant and total answers per behavior and week
+        is_compliant_answer = pl.col("value").is_in(COMPLIANT_ANSWERS)
+        weekly = behavior_answers.group_by(["variable", "qweek"]).agg([
+            pl.col("count").sum().alias("total"),
+            pl.col("count").filter(is_compliant_answer).sum().alias("compliant")
+        ])
+        compliant_counts = dict(
+            weekly.group_by("variable").agg(pl.col("compliant").sum()).iter_rows()
+        )
+        
+        # Heatmap: behaviors x 12 weeks of compliance %, 0 for weeks without answers
+        week_names = [f"week {week}" for week in range(1, 13)]
+        heatmap = weekly.with_columns(
+            (pl.col("compliant") / pl.col("total") * 100).alias("rate")
+        ).pivot(on="qweek", index="variable", values="rate")
+        heatmap_rows = {
+            row[0]: list(row[1:])
+            for row in heatmap.select([
+                pl.col("variable"),
+                *[pl.col(week).fill_null(0) if week in heatmap.columns else pl.lit(0).alias(week) for week in week_names]
+            ]).iter_rows()
+        }
+        
+        behavior_distributions = self._distributions(behavior_answers)
         top_behaviors = []
         compliance_matrix = []
-        
-        for col in existing_i12[:20]:
-            # Vectorized compliance calculation
-            is_compliant = pl.col(col).is_in(["Always", "Frequently"])
-            
+        for col in existing_i12:
             # Overall compliance rate
-            compliance_count = self._df.select(is_compliant.sum()).item()
+            compliance_count = compliant_counts.get(col, 0)
             compliance_rate = (compliance_count / total_records * 100) if total_records > 0 else 0
             
-            # Distribution using single group_by
-            dist = self._df.group_by(col).agg([pl.count().alias("count")])
-            distribution = [
-                {"level": str(row[0]) if row[0] is not None else "Unknown", "count": row[1]}
-                for row in dist.iter_rows()
-            ]
-            
             top_behaviors.append({
                 "behavior": behavior_labels.get(col, col),
                 "compliance_rate": round(compliance_rate, 1),
-                "distribution": distribution
+                "distribution": behavior_distributions.get(col, [])
             })
-            
-            # Heatmap: single group_by per behavior instead of 12 filters
-            week_stats = self._df.group_by("qweek").agg([
-                pl.count().alias("total"),
-                is_compliant.sum().alias("compliant")
-            ])
-            
-            # Create lookup dict for O(1) access
-            week_lookup = {
-                row[0]: (row[2] / row[1] * 100) if row[1] > 0 else 0
-                for row in week_stats.iter_rows()
-            }
-            
-            # Build week_compliance array (12 weeks)
-            week_compliance = [
-                week_lookup.get(f"week {week}", 0)
-                for week in range(1, 13)
-            ]
-            compliance_matrix.append(week_compliance)
+            compliance_matrix.append(heatmap_rows.get(col, [0] * len(week_names)))
         
         # Sort by compliance rate
         top_behaviors.sort(key=lambda x: x["compliance_rate"], reverse=True)
         
         # Overall compliance overview
-        total_records = self._df.height
-        high_compliance = self._df.filter(
-            pl.any_horizontal([
-                pl.col(col) == "Always"
-                for col in existing_i12[:10]  # Check first 10 behaviors
-            ])
-        ).height
-        
+        high_compliance = stats.get("high_compliance", 0)
         compliance_overview = {
             "overall_rate": round((high_compliance / total_records * 100), 1) if total_records > 0 else 0,
             "total_behaviors_tracked": len(existing_i12),
             "high_compliance_count": high_compliance
         }
         
-        # Knowledge scores (r1_1 to r1_7)
-        r1_cols = [f"r1_{i}" for i in range(1, 8)]
-        existing_r1 = [col for col in r1_cols if col in self._df.columns]
-        
-        knowledge_labels = {
-            "r1_1": "COVID is very dangerous for me",
-            "r1_2": "Likely to catch COVID in future",
-            "r1_3": "Mask will protect me",
-            "r1_4": "Mask will protect others",
-            "r1_5": "Mask protection not possible for me",
-            "r1_6": "Important to improve health",
-            "r1_7": "Life greatly affected by COVID"
-        }
-        
         knowledge_scores = []
         # Define all 7 Likert scale levels
         all_levels = ['1 – Disagree', '2', '3', '4', '5', '6', '7 - Agree']
         
+        knowledge_distributions = self._distributions(knowledge_answers)
         for col in existing_r1:
-            dist = self._df.group_by(col).agg([
-                pl.count().alias("count")
-            ])
-            
             # Create dictionary for lookup
-            count_dict = {str(row[0]): row[1] for row in dist.iter_rows() if row[0] is not None}
+            count_dict = {
+                entry["level"]: entry["count"]
+                for entry in knowledge_distributions.get(col, [])
+                if entry["level"] != "Unknown"
+            }
             
             # Ensure all 7 levels are present (fill missing with 0)
             full_distribution = [
@@ -596,56 +617,16 @@ class CovidDataProcessor:
             })
         
         # Awareness level: calculate % based on ACTUAL knowledge questions only
-        # Only r1_3, r1_4, r1_5 are true knowledge questions
-        # r1_1, r1_2, r1_6, r1_7 are attitudes/perceptions - excluded
         awareness_level = {
             "high_awareness": 0,
             "medium_awareness": 0,
             "low_awareness": 0
         }
         
-        # Define knowledge questions and their correct answers
-        knowledge_questions = {
-            'r1_3': 'positive',  # "Mask protects ME" → Agree (5-7) = correct
-            'r1_4': 'positive',  # "Mask protects OTHERS" → Agree (5-7) = correct
-            'r1_5': 'negative'   # "Mask NOT POSSIBLE for me" → Disagree (1-3) = correct
-        }
-        
-        # Filter to only existing knowledge columns
-        existing_knowledge = [col for col in knowledge_questions.keys() if col in self._df.columns]
-        
         if existing_knowledge:
-            # Create expressions for correct answers per question
-            correct_answer_exprs = []
-            for col in existing_knowledge:
-                if knowledge_questions[col] == 'positive':
-                    # Positive: Agree (5-7) = correct
-                    correct_expr = pl.col(col).is_in(['5', '6', '7 - Agree']).cast(pl.Int32)
-                else:
-                    # Negative (r1_5): Disagree (1-3) = correct
-                    correct_expr = pl.col(col).is_in(['1 – Disagree', '2', '3']).cast(pl.Int32)
-                correct_answer_exprs.append(correct_expr)
-            
-            # Count correct answers per person
-            df_with_awareness = self._df.select([
-                sum(correct_answer_exprs).alias("correct_answers")
-            ])
-            
-            total = df_with_awareness.height
-            total_knowledge_questions = len(existing_knowledge)
-            
-            # High awareness: >= 2/3 questions correct (66.7%)
-            high = df_with_awareness.filter(
-                pl.col("correct_answers") >= total_knowledge_questions * 2/3
-            ).height
-            
-            # Low awareness: < 1/3 questions correct (33.3%)
-            low = df_with_awareness.filter(
-                pl.col("correct_answers") < total_knowledge_questions * 1/3
-            ).height
-            
-            # Medium awareness: 1/3 to 2/3 correct
-            medium = total - high - low
+            total = total_records
+            high = stats["high_awareness"]
+            low = stats["low_awareness"]
             
             # Calculate percentages ensuring they sum to 100
             high_pct = round((high / total * 100), 1) if total > 0 else 0